@@ -3,23 +3,184 @@ ORION-EYE Web Server
 Flask backend for debris avoidance dashboard
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from flask_cors import CORS
-from orion_eye import OrionEyeSystem
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import gzip
+import hashlib
 import json
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
+try:
+    from flask_sock import Sock
+except ImportError:  # WebSocket channel is optional
+    Sock = None
+
+try:
+    import brotli
+except ImportError:  # gzip only without the brotli package
+    brotli = None
+
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app) if Sock else None
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/plain', 'text/css',
+                      'application/javascript')
+
+# Heavy modules (NumPy via orion_eye, cv2/ultralytics via camera_inference) are
+# imported on first use or by the background warm-up, so /api/health and
+# /api/scenarios answer as soon as the process starts.
+_orion = None
+_detection_service = None
+_history = None
+_init_lock = threading.Lock()
+_warmup_thread = None
+
+
+def get_orion():
+    """Shared ORION-EYE system, created on first use"""
+    global _orion
+    if _orion is None:
+        with _init_lock:
+            if _orion is None:
+                from orion_eye import OrionEyeSystem
+                _orion = OrionEyeSystem()
+    return _orion
+
+
+def get_detection_service():
+    """Shared YOLO detection service; its model is loaded by warm_up()"""
+    global _detection_service
+    if _detection_service is None:
+        with _init_lock:
+            if _detection_service is None:
+                from camera_inference import DetectionService
+                _detection_service = DetectionService()
+    return _detection_service
+
+
+def get_history():
+    """Shared run history store (SQLite at ORION_HISTORY_DB)"""
+    global _history
+    if _history is None:
+        with _init_lock:
+            if _history is None:
+                from run_history import RunHistory
+                _history = RunHistory()
+    return _history
+
+
+def record_history(result, started, logs):
+    """Queue a simulation result and its own XAI log entries; never blocks"""
+    from run_history import HistoryQueueFull
+    try:
+        get_history().record(result, created_at=started, logs=logs)
+    except HistoryQueueFull:
+        pass  # counted in RunHistory.dropped
+
+
+def warm_up():
+    """Import the ORION pipeline, then load and warm the YOLO model"""
+    get_orion()
+    get_detection_service().start()
+
+
+def start_warmup():
+    """Run warm_up() once in a background thread"""
+    global _warmup_thread
+    if _warmup_thread is None:
+        with _init_lock:
+            if _warmup_thread is None:
+                _warmup_thread = threading.Thread(target=warm_up, name='orion-warmup', daemon=True)
+                _warmup_thread.start()
+
+
+# Set ORION_WARMUP=0 to load everything lazily on first request instead
+if os.environ.get('ORION_WARMUP', '1') == '1':
+    start_warmup()
+
+
+def negotiate_encoding():
+    """Best content coding the client accepts: 'br', 'gzip' or None"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+@app.after_request
+def compress_response(response):
+    """Compress large text responses with the negotiated encoding"""
+    if (response.direct_passthrough or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    encoding = negotiate_encoding() if len(data) >= COMPRESS_MIN_BYTES else None
+    if encoding:
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+class StaticPayload:
+    """Immutable response body, serialized once
+    
+    The ETag is a hash of the body (suffixed per content coding) and each
+    compressed variant is built on first use, so repeat requests cost a
+    header comparison and, with If-None-Match, return 304 without a body.
+    """
+    
+    def __init__(self, body, mimetype):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self._encoded = {None: body}
+    
+    def response(self):
+        encoding = negotiate_encoding() if len(self.body) >= COMPRESS_MIN_BYTES else None
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding)
+        response = Response(self._encoded[encoding], mimetype=self.mimetype)
+        response.set_etag(self.etag if encoding is None else f'{self.etag}-{encoding}')
+        response.cache_control.no_cache = True  # revalidate with the ETag
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response.make_conditional(request)
 
-# Initialize ORION-EYE system
-orion = OrionEyeSystem()
+
+_index_payload = None
 
 
 @app.route('/')
 def index():
-    """Main dashboard page"""
-    return render_template('index.html')
+    """Main dashboard page (rendered once unless templates auto-reload)"""
+    global _index_payload
+    if app.debug or app.config.get('TEMPLATES_AUTO_RELOAD'):
+        return render_template('index.html')
+    if _index_payload is None:
+        _index_payload = StaticPayload(render_template('index.html').encode('utf-8'), 'text/html')
+    return _index_payload.response()
 
 
 def convert_numpy(obj):
@@ -37,45 +198,204 @@ def convert_numpy(obj):
         return obj
 
 
+# Dashboard clients whose last snapshot is kept for delta updates (least recently used evicted)
+MAX_DASHBOARD_CLIENTS = 64
+
+
+def index_rows(rows):
+    """Map rows by 'id', or None when ids are not unique (no delta possible)"""
+    index = {row['id']: row for row in rows}
+    return index if len(index) == len(rows) else None
+
+
+def diff_rows(previous, current):
+    """Added, changed and removed rows between two id -> row maps"""
+    added, changed = [], []
+    for key, row in current.items():
+        old = previous.get(key)
+        if old is None:
+            added.append(row)
+        elif old != row:
+            changed.append(row)
+    removed = [key for key in previous if key not in current]
+    return {'added': added, 'changed': changed, 'removed': removed}
+
+
+class DashboardDeltas:
+    """Last dashboard snapshot per client, for delta-encoded updates
+    
+    A client sends back the version it last applied. If that is the stored
+    snapshot, the reply carries only the added, changed and removed objects,
+    the visualization sections that differ and this run's log entries. The
+    log cursor counts the entries sent to this client since its last full
+    dashboard, so other clients and camera frames never advance it.
+    Otherwise the full dashboard is sent and becomes the new base.
+    """
+    
+    def __init__(self, max_clients=MAX_DASHBOARD_CLIENTS):
+        self.max_clients = max_clients
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def encode(self, client_id, since, dashboard):
+        """Return ('dashboard_data', full) or ('dashboard_delta', patch)
+        
+        dashboard must already be converted to native Python types.
+        """
+        visualization = dict(dashboard.get('visualization', {}))
+        snapshot = {
+            'objects': index_rows(dashboard['objects']),
+            'visual': index_rows(visualization.pop('objects', [])),
+            'visualization': visualization
+        }
+        logs = dashboard['logs']
+        with self._lock:
+            previous = self._clients.pop(client_id, None)
+            full = (previous is None or since != previous['version']
+                    or previous['objects'] is None or snapshot['objects'] is None
+                    or previous['visual'] is None or snapshot['visual'] is None)
+            snapshot['version'] = previous['version'] + 1 if previous else 1
+            snapshot['log_count'] = len(logs) if full else previous['log_count'] + len(logs)
+            self._clients[client_id] = snapshot
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        
+        version = snapshot['version']
+        if full:
+            return 'dashboard_data', dict(dashboard, version=version)
+        
+        changed_sections = {key: value for key, value in visualization.items()
+                            if previous['visualization'].get(key) != value}
+        return 'dashboard_delta', {
+            'base_version': since,
+            'version': version,
+            'summary': dashboard['summary'],
+            'objects': diff_rows(previous['objects'], snapshot['objects']),
+            'visualization': dict(changed_sections,
+                                  objects=diff_rows(previous['visual'], snapshot['visual'])),
+            'logs': {
+                'cursor': previous['log_count'],
+                'entries': logs
+            }
+        }
+
+
+dashboard_deltas = DashboardDeltas()
+
+
 @app.route('/api/simulate', methods=['POST'])
 def simulate():
-    """Run simulation with specified scenario"""
+    """Run simulation with specified scenario
+    
+    With a 'client' id the reply is delta-encoded against the dashboard
+    version given in 'since' (see DashboardDeltas). The raw per-object
+    'objects' list, with every predicted trajectory, is never sent: the
+    level-of-detail dashboard_data is the only trajectory payload. Run
+    history still stores the full list.
+    """
     data = request.json
     scenario = data.get('scenario', 'safe')
+    # Optional time budget; enables the anytime risk/decision pipeline
+    deadline_ms = data.get('deadline_ms')
     
     try:
-        result = orion.run_simulation(scenario)
+        # Optional dashboard level of detail
+        view = {'viewport': data.get('viewport'), 'zoom': float(data.get('zoom', 1.0))}
+        deadline = float(deadline_ms) / 1000.0 if deadline_ms is not None else None
+        started = time.time()
+        result = get_orion().run_simulation(scenario, deadline=deadline, view=view)
         # Convert numpy arrays to native types for JSON serialization
         result_clean = convert_numpy(result)
+        record_history(result_clean, started, result_clean['logs'])
+        result_clean.pop('objects', None)
+        client_id = data.get('client')
+        if client_id:
+            key, dashboard = dashboard_deltas.encode(str(client_id), data.get('since'),
+                                                     result_clean.pop('dashboard_data'))
+            result_clean[key] = dashboard
         return jsonify(result_clean)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _optional(args, key, cast):
+    value = args.get(key)
+    return cast(value) if value not in (None, '') else None
+
+
+@app.route('/api/history/runs')
+def history_runs():
+    """Page through recorded runs, newest first
+    
+    Query parameters (all optional): since and until (epoch seconds),
+    outcome, object_id, limit (max 500) and before (the previous page's
+    next_before).
+    """
+    from run_history import DEFAULT_PAGE_SIZE
+    args = request.args
+    try:
+        page = get_history().runs(
+            since=_optional(args, 'since', float),
+            until=_optional(args, 'until', float),
+            outcome=args.get('outcome'),
+            object_id=args.get('object_id'),
+            before=_optional(args, 'before', int),
+            limit=_optional(args, 'limit', int) or DEFAULT_PAGE_SIZE
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
+
+@app.route('/api/history/runs/<int:run_id>')
+def history_run(run_id):
+    """One recorded run with its decision, maneuver, edge cases and XAI logs"""
+    run = get_history().run(run_id)
+    if run is None:
+        return jsonify({'error': f'Run {run_id} not found'}), 404
+    return jsonify(run)
+
+
+@app.route('/api/history/runs/<int:run_id>/objects')
+def history_run_objects(run_id):
+    """Page through a recorded run's objects (limit, after=next_after)"""
+    from run_history import DEFAULT_PAGE_SIZE
+    try:
+        page = get_history().objects(run_id,
+                                     after=_optional(request.args, 'after', int),
+                                     limit=_optional(request.args, 'limit', int) or DEFAULT_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
+
+SCENARIOS = [
+    {
+        'id': 'safe',
+        'name': 'Demo 1: Safe Passage',
+        'description': 'Nominal scenario with distant objects, no collision risk',
+        'expected_outcome': 'SAFE_PASSAGE'
+    },
+    {
+        'id': 'crash',
+        'name': 'Demo 2: Collision Course',
+        'description': 'Critical scenario with object on direct collision course',
+        'expected_outcome': 'AVOIDANCE_REQUIRED'
+    },
+    {
+        'id': 'multi',
+        'name': 'Demo 3: Multiple Objects',
+        'description': 'Complex scenario with multiple objects requiring prioritization',
+        'expected_outcome': 'COMPLEX_AVOIDANCE'
+    }
+]
+SCENARIOS_PAYLOAD = StaticPayload(json.dumps(SCENARIOS).encode('utf-8'), 'application/json')
+
+
 @app.route('/api/scenarios')
 def get_scenarios():
     """Get available demo scenarios"""
-    scenarios = [
-        {
-            'id': 'safe',
-            'name': 'Demo 1: Safe Passage',
-            'description': 'Nominal scenario with distant objects, no collision risk',
-            'expected_outcome': 'SAFE_PASSAGE'
-        },
-        {
-            'id': 'crash',
-            'name': 'Demo 2: Collision Course',
-            'description': 'Critical scenario with object on direct collision course',
-            'expected_outcome': 'AVOIDANCE_REQUIRED'
-        },
-        {
-            'id': 'multi',
-            'name': 'Demo 3: Multiple Objects',
-            'description': 'Complex scenario with multiple objects requiring prioritization',
-            'expected_outcome': 'COMPLEX_AVOIDANCE'
-        }
-    ]
-    return jsonify(scenarios)
+    return SCENARIOS_PAYLOAD.response()
 
 
 @app.route('/api/health')
@@ -84,52 +404,237 @@ def health():
     return jsonify({'status': 'operational', 'system': 'ORION-EYE'})
 
 
+@app.route('/api/ready')
+def ready():
+    """Readiness check: 200 once the ORION pipeline is loaded
+    
+    'detection' reports the YOLO path separately: idle, loading, ready or
+    unavailable (no model or missing cv2/ultralytics).
+    """
+    pipeline_ready = _orion is not None
+    service = _detection_service
+    body = {
+        'ready': pipeline_ready,
+        'pipeline': 'ready' if pipeline_ready else 'loading',
+        'detection': service.status if service else 'idle'
+    }
+    if service and service.error:
+        body['detection_error'] = service.error
+    return jsonify(body), 200 if pipeline_ready else 503
+
+
+# Constants for camera coordinate transformation
+MAX_DISTANCE_KM = 50  # Maximum simulated distance (matches frontend)
+COORD_SCALE = 100     # Scale factor for normalized coordinates
+COORD_OFFSET = -50    # Offset to center coordinates
+Z_VELOCITY = -2       # Default Z-axis velocity (approaching)
+
+# Upper bound on frames accepted by the batched camera endpoint
+MAX_BATCH_FRAMES = 100
+
+# Limits for encoded frames sent to /api/camera-frame
+MAX_FRAME_BYTES = 8 * 1024 * 1024
+INFERENCE_TIMEOUT_S = 5.0
+
+
+def detections_to_objects(detections):
+    """Convert camera detections to ORION-format objects
+    
+    This bridges the camera feed data to the existing simulation system.
+    Positions are in the camera frame, centred on the spacecraft.
+    """
+    objects = []
+    for det in detections:
+        # Extract distance for z-coordinate in 3D position
+        distance = det.get('distance', MAX_DISTANCE_KM)
+        obj = {
+            'id': det.get('id', 'CAM_OBJ'),
+            'position': [det.get('x', 0) * COORD_SCALE + COORD_OFFSET, 
+                       det.get('y', 0) * COORD_SCALE + COORD_OFFSET, 
+                       distance],
+            'velocity': [det.get('velocity', {}).get('x', 0) * COORD_SCALE, 
+                       det.get('velocity', {}).get('y', 0) * COORD_SCALE, 
+                       Z_VELOCITY],
+            'size': det.get('size', 0.1) * 10,
+            'type': det.get('type', 'debris'),
+            'detection_confidence': det.get('confidence', 0.9),
+            'timestamp': datetime.now().isoformat()
+        }
+        objects.append(obj)
+    return objects
+
+
+def run_camera_pipeline(detections):
+    """Push one frame of camera detections through ORION Layers 3-10
+    
+    The Layer 1 sensor simulation is skipped; the spacecraft sits at the
+    camera frame origin. Returns a compact per-frame result for the dashboard.
+    """
+    import numpy as np
+    objects = detections_to_objects(detections)
+    result = get_orion().process_objects(objects, scenario='camera', spacecraft_pos=np.zeros(3))
+    dashboard = result['dashboard_data']
+    
+    return {
+        'status': 'success',
+        'objects_detected': len(objects),
+        'timestamp': datetime.now().isoformat(),
+        'outcome': result.get('outcome', result.get('result')),
+        'summary': dashboard['summary'],
+        'objects': dashboard['objects'],
+        'decision': dashboard['decision'],
+        'maneuver': dashboard['maneuver'],
+        'edge_cases': result.get('edge_cases', []),
+        'logs': dashboard['logs']
+    }
+
+
 @app.route('/api/camera-detection', methods=['POST'])
 def camera_detection():
     """Process camera detection data and return simulation results"""
-    # Constants for coordinate transformation
-    MAX_DISTANCE_KM = 50  # Maximum simulated distance (matches frontend)
-    COORD_SCALE = 100     # Scale factor for normalized coordinates
-    COORD_OFFSET = -50    # Offset to center coordinates
-    Z_VELOCITY = -2       # Default Z-axis velocity (approaching)
-    
     data = request.json
     detections = data.get('detections', [])
     
     try:
-        # Convert camera detections to ORION format
-        # This bridges the camera feed data to the existing simulation system
-        objects = []
-        for det in detections:
-            # Extract distance for z-coordinate in 3D position
-            distance = det.get('distance', MAX_DISTANCE_KM)
-            obj = {
-                'id': det.get('id', 'CAM_OBJ'),
-                'position': [det.get('x', 0) * COORD_SCALE + COORD_OFFSET, 
-                           det.get('y', 0) * COORD_SCALE + COORD_OFFSET, 
-                           distance],
-                'velocity': [det.get('velocity', {}).get('x', 0) * COORD_SCALE, 
-                           det.get('velocity', {}).get('y', 0) * COORD_SCALE, 
-                           Z_VELOCITY],
-                'size': det.get('size', 0.1) * 10,
-                'type': det.get('type', 'debris'),
-                'detection_confidence': det.get('confidence', 0.9),
-                'timestamp': datetime.now().isoformat()
-            }
-            objects.append(obj)
-        
-        # Calculate risk levels and generate response
-        result = {
+        return jsonify(convert_numpy(run_camera_pipeline(detections)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/camera-detection/batch', methods=['POST'])
+def camera_detection_batch():
+    """Process several frames of camera detections in one request
+    
+    Expects {'frames': [{'detections': [...]}, ...]} in capture order and
+    returns one result per frame, so the dashboard can post once per
+    dashboard update instead of once per detection interval.
+    """
+    data = request.json
+    frames = data.get('frames', [])
+    
+    if len(frames) > MAX_BATCH_FRAMES:
+        return jsonify({'error': f'Batch exceeds {MAX_BATCH_FRAMES} frames'}), 413
+    
+    try:
+        results = [run_camera_pipeline(frame.get('detections', [])) for frame in frames]
+        return jsonify(convert_numpy({
             'status': 'success',
-            'objects_detected': len(objects),
-            'timestamp': datetime.now().isoformat()
-        }
-        
+            'frames_processed': len(results),
+            'results': results
+        }))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def tracks_to_detections(tracks, width, height):
+    """Convert pixel-space Kalman tracks to normalized camera detections"""
+    detections = []
+    for track in tracks:
+        size = 2 * track['radius'] / max(width, height)
+        detections.append({
+            'id': f"TRK_{track['track_id']:03d}",
+            'type': track['type'],
+            'x': track['x'] / width,
+            'y': track['y'] / height,
+            'size': size,
+            'distance': max(0.0, 1 - size) * MAX_DISTANCE_KM,
+            'velocity': {'x': track['vx'] / width, 'y': track['vy'] / height},
+            'confidence': track['confidence']
+        })
+    return detections
+
+
+@app.route('/api/camera-frame', methods=['POST'])
+def camera_frame():
+    """Detect, track and assess one encoded camera frame
+    
+    The body is the raw JPEG or PNG image (not base64 JSON). Tracks are kept
+    per `stream` query parameter, so each camera should use its own id.
+    Returns the /api/camera-detection payload plus the pixel-space 'tracks'.
+    """
+    if request.content_length and request.content_length > MAX_FRAME_BYTES:
+        return jsonify({'error': f'Frame exceeds {MAX_FRAME_BYTES} bytes'}), 413
+    
+    data = request.get_data(cache=False)
+    if not data:
+        return jsonify({'error': 'Request body must be JPEG or PNG bytes'}), 400
+    
+    from camera_inference import InferenceQueueFull, InferenceUnavailable
+    service = get_detection_service()
+    if service.status == 'idle':
+        start_warmup()
+    try:
+        future = service.submit(data, request.args.get('stream', 'default'))
+    except InferenceUnavailable as e:
+        retry = {'Retry-After': '1'} if service.status in ('idle', 'loading') else {}
+        return jsonify({'error': str(e)}), 503, retry
+    except InferenceQueueFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+    
+    try:
+        tracks, (height, width) = future.result(timeout=INFERENCE_TIMEOUT_S)
+    except FutureTimeoutError:
+        future.cancel()
+        return jsonify({'error': 'Inference timed out'}), 504
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    try:
+        result = run_camera_pipeline(tracks_to_detections(tracks, width, height))
+        result['tracks'] = tracks
         return jsonify(convert_numpy(result))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def receive_latest_frame(ws):
+    """Block for the next stream frame, then coalesce any that queued behind it
+    
+    Returns the newest frame and how many older frames it superseded, so a
+    slow pipeline skips stale frames instead of falling further behind.
+    """
+    message = ws.receive()
+    coalesced = 0
+    while True:
+        newer = ws.receive(timeout=0)
+        if newer is None:
+            break
+        message = newer
+        coalesced += 1
+    return message, coalesced
+
+
+if sock:
+    @sock.route('/ws/camera-detection')
+    def camera_detection_stream(ws):
+        """Continuous camera detection stream
+        
+        Each client message is one frame: {'frame_id': n, 'detections': [...]}.
+        The server answers every processed frame with the same payload as
+        /api/camera-detection plus 'frame_id' and 'frames_coalesced'. After
+        the first frame, 'objects' is replaced by 'objects_delta' (added,
+        changed and removed rows since the previous reply on this socket).
+        """
+        rows = None
+        while True:
+            message, coalesced = receive_latest_frame(ws)
+            try:
+                frame = json.loads(message)
+                result = convert_numpy(run_camera_pipeline(frame.get('detections', [])))
+                result['frame_id'] = frame.get('frame_id')
+                result['frames_coalesced'] = coalesced
+                current = index_rows(result['objects'])
+                if rows is not None and current is not None:
+                    del result['objects']
+                    result['objects_delta'] = diff_rows(rows, current)
+                rows = current
+            except Exception as e:
+                result = {'error': str(e), 'frames_coalesced': coalesced}
+            ws.send(json.dumps(result))
+
+
 if __name__ == '__main__':
     import os
     
@@ -0,0 +1,191 @@
+"""
+AADES Server-Side Inference
+Shared YOLO model and per-stream tracking behind a bounded inference queue
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from camera_tracking import KalmanTrackBank
+
+
+# Default path - can be overridden via environment variable YOLO_MODEL_PATH
+MODEL_PATH = os.environ.get('YOLO_MODEL_PATH', 'best.pt')
+
+# Detection filters (same values as test_camera_api.py)
+CONFIDENCE_MIN = 0.25
+RATIO_MIN = 0.60
+RATIO_MAX = 1.60
+
+# Frames waiting for the model before new requests are turned away
+MAX_QUEUED_FRAMES = 8
+# Independent camera streams whose track state is kept (least recently used evicted)
+MAX_STREAMS = 32
+WARMUP_SIZE = (640, 640)
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference queue cannot accept another frame"""
+
+
+class InferenceUnavailable(Exception):
+    """Raised when the model or its dependencies could not be loaded"""
+
+
+def decode_frame(data: bytes) -> np.ndarray:
+    """Decode JPEG/PNG bytes into a BGR image
+
+    The request body is wrapped with np.frombuffer, so the encoded bytes are
+    handed to OpenCV without an intermediate copy.
+    """
+    import cv2
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    frame = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError('Could not decode image (expected JPEG or PNG bytes)')
+    return frame
+
+
+class DetectionService:
+    """YOLO detector shared by all requests
+
+    The model is loaded once and owned by a single worker thread. Requests
+    submit encoded frames to a bounded queue and wait on a Future, so
+    inference never runs inline on request threads and a burst of uploads is
+    rejected instead of piling up.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, max_queue: int = MAX_QUEUED_FRAMES):
+        self.model_path = model_path
+        self.model = None
+        self.class_names: Dict[int, str] = {}
+        self.status = 'idle'  # idle -> loading -> ready | unavailable
+        self.error: Optional[str] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        # stream id -> (track bank, {track id: (confidence, class name)})
+        self._streams: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == 'ready'
+
+    def start(self):
+        """Load the model, run one warm-up inference and start the worker"""
+        if self.status != 'idle':
+            return
+        self.status = 'loading'
+        try:
+            model = self._load_model()
+            model(np.zeros(WARMUP_SIZE + (3,), dtype=np.uint8), verbose=False)
+        except Exception as e:
+            self.error = f'{type(e).__name__}: {e}'
+            self.status = 'unavailable'
+            return
+
+        self.model = model
+        self.class_names = dict(getattr(model, 'names', {}) or {})
+        self._worker = threading.Thread(target=self._run, name='yolo-inference', daemon=True)
+        self._worker.start()
+        self.status = 'ready'
+
+    def submit(self, data: bytes, stream_id: str = 'default') -> Future:
+        """Queue an encoded frame; the Future resolves to (tracks, frame shape)"""
+        if not self.ready:
+            raise InferenceUnavailable(self.error or f'Detection model {self.status}')
+
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((data, stream_id, future))
+        except queue.Full:
+            raise InferenceQueueFull('Inference queue is full')
+        return future
+
+    def _load_model(self):
+        from ultralytics import YOLO
+        return YOLO(self.model_path)
+
+    def _run(self):
+        while True:
+            data, stream_id, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._process(data, stream_id))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _process(self, data: bytes, stream_id: str):
+        frame = decode_frame(data)
+        h, w = frame.shape[:2]
+
+        boxes, confidence, classes = self._detect(frame)
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        radii = (boxes[:, 2:] - boxes[:, :2]).max(axis=1) / 2
+        measurements = np.column_stack([centers, radii])
+
+        tracker, meta = self._stream(stream_id)
+        tracker.predict()
+        assigned = tracker.update(measurements)
+
+        # Remember the latest confidence and class of each live track
+        for track_id, conf, cls in zip(assigned.tolist(), confidence, classes):
+            meta[track_id] = (float(conf), self.class_names.get(int(cls), 'debris'))
+        for track_id in set(meta) - set(tracker.ids.tolist()):
+            del meta[track_id]
+
+        return self._tracks(tracker, meta), (h, w)
+
+    def _detect(self, frame: np.ndarray):
+        """Run the model and apply the confidence and aspect-ratio filters"""
+        results = self.model(frame, verbose=False, conf=CONFIDENCE_MIN)
+        boxes, confidence, classes = [], [], []
+        for r in results:
+            if r.boxes is None or len(r.boxes) == 0:
+                continue
+            boxes.append(r.boxes.xyxy.cpu().numpy())
+            confidence.append(r.boxes.conf.cpu().numpy())
+            classes.append(r.boxes.cls.cpu().numpy())
+
+        if not boxes:
+            return np.empty((0, 4)), np.empty(0), np.empty(0)
+        boxes = np.concatenate(boxes).astype(float)
+        confidence = np.concatenate(confidence)
+        classes = np.concatenate(classes)
+
+        wh = boxes[:, 2:] - boxes[:, :2]
+        aspect_ratio = wh[:, 0] / np.maximum(wh[:, 1], 1e-9)
+        keep = (confidence >= CONFIDENCE_MIN) & (aspect_ratio >= RATIO_MIN) & (aspect_ratio <= RATIO_MAX)
+        return boxes[keep], confidence[keep], classes[keep]
+
+    def _stream(self, stream_id: str):
+        if stream_id in self._streams:
+            self._streams.move_to_end(stream_id)
+        else:
+            self._streams[stream_id] = (KalmanTrackBank(), {})
+            if len(self._streams) > MAX_STREAMS:
+                self._streams.popitem(last=False)
+        return self._streams[stream_id]
+
+    @staticmethod
+    def _tracks(tracker: KalmanTrackBank, meta: Dict[int, tuple]) -> List[Dict]:
+        tracks = []
+        for i, track_id in enumerate(tracker.ids.tolist()):
+            confidence, cls = meta.get(track_id, (0.0, 'debris'))
+            x, y, r = tracker.position[i]
+            vx, vy, vr = tracker.velocity[i]
+            tracks.append({
+                'track_id': track_id,
+                'x': float(x), 'y': float(y), 'radius': float(r),
+                'vx': float(vx), 'vy': float(vy), 'vr': float(vr),
+                'confidence': confidence,
+                'type': cls,
+                'coasting': bool(tracker.coasting[i])
+            })
+        return tracks
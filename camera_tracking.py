@@ -0,0 +1,194 @@
+"""
+AADES Track Estimation
+Vectorized Kalman filter bank for camera-space object tracking
+"""
+
+import numpy as np
+from typing import Dict, Tuple
+
+
+# State layout per track: [x, y, r, vx, vy, vr] in pixels and pixels/frame
+STATE_DIM = 6
+MEAS_DIM = 3
+
+
+def _constant_velocity_model(process_noise_pos: float,
+                             process_noise_scale: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Build the one-frame transition matrix and white-acceleration process noise"""
+    F = np.eye(STATE_DIM)
+    F[:MEAS_DIM, MEAS_DIM:] = np.eye(MEAS_DIM)
+
+    q = np.array([process_noise_pos, process_noise_pos, process_noise_scale]) ** 2
+    Q = np.zeros((STATE_DIM, STATE_DIM))
+    for axis in range(MEAS_DIM):
+        vel = axis + MEAS_DIM
+        Q[axis, axis] = q[axis] / 4.0
+        Q[axis, vel] = Q[vel, axis] = q[axis] / 2.0
+        Q[vel, vel] = q[axis]
+    return F, Q
+
+
+class KalmanTrackBank:
+    """Constant-velocity (plus scale-rate) Kalman filters for all active tracks
+
+    Every track shares the same motion model, so state vectors and covariances
+    are stored as stacked arrays and each predict/update step is a handful of
+    batched matrix operations, independent of the number of tracks.
+    """
+
+    def __init__(self, process_noise_pos: float = 0.5, process_noise_scale: float = 0.1,
+                 measurement_noise: float = 3.0, initial_velocity_std: float = 10.0,
+                 gate_pixels: float = 100.0, max_coast_frames: int = 10):
+        self.F, self.Q = _constant_velocity_model(process_noise_pos, process_noise_scale)
+        self.R = np.eye(MEAS_DIM) * measurement_noise ** 2
+        self.initial_covariance = np.diag(
+            [measurement_noise ** 2] * MEAS_DIM + [initial_velocity_std ** 2] * MEAS_DIM
+        )
+        self.gate_pixels = gate_pixels
+        self.max_coast_frames = max_coast_frames
+
+        self.ids = np.empty(0, dtype=np.int64)
+        self.state = np.empty((0, STATE_DIM))
+        self.covariance = np.empty((0, STATE_DIM, STATE_DIM))
+        self.misses = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+        self._horizon_cache: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def position(self) -> np.ndarray:
+        """Smoothed (x, y, r) for every track"""
+        return self.state[:, :MEAS_DIM]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """Estimated (vx, vy, vr) per frame for every track"""
+        return self.state[:, MEAS_DIM:]
+
+    @property
+    def coasting(self) -> np.ndarray:
+        """Mask of tracks that were not matched to a measurement this frame"""
+        return self.misses > 0
+
+    def predict(self):
+        """Advance every track by one frame"""
+        if not len(self):
+            return
+        self.state = self.state @ self.F.T
+        self.covariance = self.F @ self.covariance @ self.F.T + self.Q
+
+    def update(self, measurements: np.ndarray) -> np.ndarray:
+        """Fuse one frame of (x, y, r) measurements into the bank
+
+        Call after predict(). Measurements are associated to tracks by gated
+        nearest neighbour; unmatched measurements start new tracks and tracks
+        unmatched for more than max_coast_frames are dropped.
+
+        Returns:
+            Track id assigned to each measurement row.
+        """
+        z = np.asarray(measurements, dtype=float).reshape(-1, MEAS_DIM)
+        track_idx, meas_idx = self._associate(z)
+
+        if len(track_idx):
+            P = self.covariance[track_idx]
+            S = P[:, :MEAS_DIM, :MEAS_DIM] + self.R
+            # K = P H^T S^-1, solved per track instead of forming the inverse
+            K = np.linalg.solve(S, P[:, :MEAS_DIM, :]).transpose(0, 2, 1)
+            innovation = z[meas_idx] - self.state[track_idx, :MEAS_DIM]
+            self.state[track_idx] += np.einsum('nij,nj->ni', K, innovation)
+            self.covariance[track_idx] = P - K @ P[:, :MEAS_DIM, :]
+
+        self.misses += 1
+        self.misses[track_idx] = 0
+
+        assigned = np.empty(len(z), dtype=np.int64)
+        assigned[meas_idx] = self.ids[track_idx]
+        unmatched = np.setdiff1d(np.arange(len(z)), meas_idx)
+        assigned[unmatched] = self._spawn(z[unmatched])
+
+        keep = self.misses <= self.max_coast_frames
+        if not keep.all():
+            self.ids = self.ids[keep]
+            self.state = self.state[keep]
+            self.covariance = self.covariance[keep]
+            self.misses = self.misses[keep]
+        return assigned
+
+    def extrapolate(self, frames: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Predict (x, y, r) and its covariance `frames` ahead for every track"""
+        Fk, Qk = self._horizon(frames)
+        state = self.state @ Fk.T
+        covariance = Fk @ self.covariance @ Fk.T + Qk
+        return state[:, :MEAS_DIM], covariance[:, :MEAS_DIM, :MEAS_DIM]
+
+    def intercept(self, center: Tuple[float, float], zone_radius: float, frames: int,
+                  n_sigma: float = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Uncertainty-aware intercept test against a circular collision zone
+
+        A track intercepts when its predicted centre, moved n_sigma standard
+        deviations (along the largest axis of the position covariance) towards
+        the zone, falls inside it.
+
+        Returns:
+            (is_intercept mask, predicted (x, y, r), 1-sigma position spread)
+        """
+        predicted, covariance = self.extrapolate(frames)
+        distance = np.linalg.norm(predicted[:, :2] - np.asarray(center, dtype=float), axis=1)
+
+        # Largest eigenvalue of each 2x2 position block in closed form
+        a = covariance[:, 0, 0]
+        b = covariance[:, 0, 1]
+        d = covariance[:, 1, 1]
+        sigma = np.sqrt((a + d) / 2.0 + np.sqrt(((a - d) / 2.0) ** 2 + b ** 2))
+
+        return distance - n_sigma * sigma < zone_radius, predicted, sigma
+
+    def _associate(self, z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Greedy gated nearest-neighbour assignment of measurements to tracks"""
+        if not len(self) or not len(z):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        cost = np.linalg.norm(self.state[:, None, :2] - z[None, :, :2], axis=2)
+        cost[cost > self.gate_pixels] = np.inf
+
+        track_idx, meas_idx = [], []
+        for _ in range(min(cost.shape)):
+            flat = np.argmin(cost)
+            t, m = divmod(flat, cost.shape[1])
+            if not np.isfinite(cost[t, m]):
+                break
+            track_idx.append(t)
+            meas_idx.append(m)
+            cost[t, :] = np.inf
+            cost[:, m] = np.inf
+        return np.array(track_idx, dtype=np.int64), np.array(meas_idx, dtype=np.int64)
+
+    def _spawn(self, z: np.ndarray) -> np.ndarray:
+        """Start new tracks at rest on unmatched measurements"""
+        n = len(z)
+        new_ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+        self._next_id += n
+
+        state = np.zeros((n, STATE_DIM))
+        state[:, :MEAS_DIM] = z
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.state = np.concatenate([self.state, state])
+        self.covariance = np.concatenate(
+            [self.covariance, np.broadcast_to(self.initial_covariance, (n, STATE_DIM, STATE_DIM))]
+        )
+        self.misses = np.concatenate([self.misses, np.zeros(n, dtype=np.int64)])
+        return new_ids
+
+    def _horizon(self, frames: int) -> Tuple[np.ndarray, np.ndarray]:
+        """k-step transition and accumulated process noise, cached per horizon"""
+        if frames not in self._horizon_cache:
+            Fk = np.eye(STATE_DIM)
+            Qk = np.zeros((STATE_DIM, STATE_DIM))
+            for _ in range(frames):
+                Fk = self.F @ Fk
+                Qk = self.F @ Qk @ self.F.T + self.Q
+            self._horizon_cache[frames] = (Fk, Qk)
+        return self._horizon_cache[frames]
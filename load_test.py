@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+ORION-EYE Load and Soak Test
+Drives the Flask API at a fixed concurrency and request mix, reporting
+latency percentiles, throughput and RSS over time
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Default request mix: name -> weight (see parse_mix)
+DEFAULT_MIX = 'simulate:safe=4,simulate:crash=1,simulate:multi=2,camera:5=3'
+
+# Latency histogram: log-spaced bins from 0.1 ms to 60 s (bounded memory for long soaks)
+LATENCY_BINS_MS = np.geomspace(0.1, 60000.0, 241)
+
+# Memory growth above this rate (after warm-up) is flagged
+DEFAULT_GROWTH_MB_PER_MIN = 1.0
+
+
+def parse_mix(spec: str) -> List[Tuple[str, Optional[str], float]]:
+    """Parse 'kind[:arg]=weight,...' into (kind, arg, weight) entries
+
+    Kinds: simulate:<scenario>, camera:<objects per frame>, scenarios, health.
+    """
+    mix = []
+    for part in spec.split(','):
+        name, _, weight = part.strip().partition('=')
+        kind, _, arg = name.partition(':')
+        if kind not in ('simulate', 'camera', 'scenarios', 'health'):
+            raise ValueError(f'Unknown request kind: {kind}')
+        mix.append((kind, arg or None, float(weight or 1)))
+    return mix
+
+
+def build_request(kind: str, arg: Optional[str], rng: random.Random) -> Tuple[str, str, Optional[Dict]]:
+    """(method, path, JSON body) for one request of the mix"""
+    if kind == 'simulate':
+        return 'POST', '/api/simulate', {'scenario': arg or 'safe'}
+    if kind == 'camera':
+        detections = [{
+            'id': f'LOAD_{i:03d}',
+            'type': 'debris',
+            'x': rng.random(), 'y': rng.random(),
+            'size': rng.uniform(0.05, 0.4),
+            'distance': rng.uniform(5, 50),
+            'velocity': {'x': rng.uniform(-0.01, 0.01), 'y': rng.uniform(-0.01, 0.01)},
+            'confidence': rng.uniform(0.5, 1.0)
+        } for i in range(int(arg or 5))]
+        return 'POST', '/api/camera-detection', {'detections': detections}
+    if kind == 'scenarios':
+        return 'GET', '/api/scenarios', None
+    return 'GET', '/api/health', None
+
+
+def read_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Resident set size of a process in MB (Linux /proc), None if unavailable"""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    if pid is None:
+        import resource  # peak RSS only, in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    return None
+
+
+class InProcessTarget:
+    """Flask test client per worker thread; no sockets involved"""
+
+    def __init__(self):
+        # No model warm-up, and keep load-test runs out of the real run history
+        os.environ.setdefault('ORION_WARMUP', '0')
+        os.environ.setdefault('ORION_HISTORY_DB', os.path.join(tempfile.mkdtemp(), 'history.db'))
+        import app
+        self.app_module = app
+        self._local = threading.local()
+
+    def send(self, method: str, path: str, body: Optional[Dict]) -> int:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app_module.app.test_client()
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+    def diagnostics(self) -> Dict:
+        orion = self.app_module._orion
+        return {'xai_log_entries': len(orion.layer8.logs)} if orion is not None else {}
+
+
+class HttpTarget:
+    """Real HTTP requests to a running server"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def send(self, method: str, path: str, body: Optional[Dict]) -> int:
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def diagnostics(self) -> Dict:
+        return {}
+
+
+class LoadStats:
+    """Thread-safe latency histograms: one for the current interval, one overall"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = np.zeros(len(LATENCY_BINS_MS) + 1, dtype=np.int64)
+        self.interval = np.zeros_like(self.total)
+        self.errors = 0
+        self.interval_errors = 0
+        self.latency_sum_ms = 0.0
+
+    def add(self, latency_ms: float, ok: bool):
+        b = int(np.searchsorted(LATENCY_BINS_MS, latency_ms))
+        with self._lock:
+            self.interval[b] += 1
+            self.latency_sum_ms += latency_ms
+            if not ok:
+                self.interval_errors += 1
+
+    def take_interval(self) -> Tuple[np.ndarray, int]:
+        with self._lock:
+            counts, errors = self.interval.copy(), self.interval_errors
+            self.total += counts
+            self.errors += errors
+            self.interval[:] = 0
+            self.interval_errors = 0
+        return counts, errors
+
+
+def percentiles(counts: np.ndarray, qs=(50, 95, 99)) -> Dict[str, float]:
+    """Percentiles from a latency histogram (upper bin edge, ms)"""
+    n = counts.sum()
+    if not n:
+        return {f'p{q}': 0.0 for q in qs}
+    cumulative = np.cumsum(counts)
+    edges = np.append(LATENCY_BINS_MS, np.inf)
+    return {f'p{q}': float(edges[min(np.searchsorted(cumulative, q / 100.0 * n), len(edges) - 1)])
+            for q in qs}
+
+
+def memory_growth(samples: List[Tuple[float, float]], warmup_s: float,
+                  threshold_mb_per_min: float) -> Dict:
+    """Fit RSS against time after warm-up and flag sustained growth"""
+    points = [(t, rss) for t, rss in samples if t >= warmup_s and rss is not None]
+    if len(points) < 3:
+        return {'samples': len(points), 'slope_mb_per_min': None, 'growth_flagged': False}
+    t, rss = np.array(points).T
+    slope = np.polyfit(t / 60.0, rss, 1)[0]
+    quarter = max(1, len(rss) // 4)
+    rising = np.median(rss[-quarter:]) > np.median(rss[:quarter])
+    return {
+        'samples': len(points),
+        'slope_mb_per_min': float(slope),
+        'growth_mb': float(rss[-1] - rss[0]),
+        'growth_flagged': bool(slope > threshold_mb_per_min and rising)
+    }
+
+
+def run_load(target, mix: List[Tuple[str, Optional[str], float]], concurrency: int = 4,
+             duration: float = 30.0, requests: Optional[int] = None, interval: float = 5.0,
+             warmup: float = 0.0, growth_threshold: float = DEFAULT_GROWTH_MB_PER_MIN,
+             rss_pid: Optional[int] = None, seed: int = 0, verbose: bool = True) -> Dict:
+    """Run the load test and return the report
+
+    Workers send requests back to back until `duration` seconds have passed
+    (or `requests` have been sent). Every `interval` seconds the throughput,
+    latency percentiles and RSS of the interval are recorded; RSS is read
+    from this process, or from rss_pid when testing a separate server.
+    """
+    kinds = [(kind, arg) for kind, arg, _ in mix]
+    weights = [weight for _, _, weight in mix]
+    stats = LoadStats()
+    stop = threading.Event()
+    sent = [0]
+    sent_lock = threading.Lock()
+
+    def worker(index: int):
+        rng = random.Random(seed + index)
+        while not stop.is_set():
+            if requests is not None:
+                with sent_lock:
+                    if sent[0] >= requests:
+                        return
+                    sent[0] += 1
+            kind, arg = rng.choices(kinds, weights)[0]
+            method, path, body = build_request(kind, arg, rng)
+            start = time.perf_counter()
+            try:
+                ok = target.send(method, path, body) < 400
+            except Exception:
+                ok = False
+            stats.add((time.perf_counter() - start) * 1000.0, ok)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    timeline = []
+    rss_samples = [(0.0, read_rss_mb(rss_pid))]
+    last = start
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=max(0.0, interval - (time.perf_counter() - last)))
+        now = time.perf_counter()
+        if now - last < interval and any(thread.is_alive() for thread in threads):
+            continue
+        if requests is None and now - start >= duration:
+            stop.set()
+        counts, errors = stats.take_interval()
+        elapsed = now - start
+        rss = read_rss_mb(rss_pid)
+        rss_samples.append((elapsed, rss))
+        entry = dict(t=round(elapsed, 2), requests=int(counts.sum()), errors=errors,
+                     rps=counts.sum() / max(now - last, 1e-9), rss_mb=rss, **percentiles(counts),
+                     **target.diagnostics())
+        timeline.append(entry)
+        if verbose:
+            rss_text = f"{rss:.1f} MB" if rss is not None else 'n/a'
+            print(f"  t={elapsed:7.1f}s  {entry['rps']:7.1f} req/s  p50 {entry['p50']:8.2f} ms  "
+                  f"p95 {entry['p95']:8.2f} ms  p99 {entry['p99']:8.2f} ms  "
+                  f"errors {errors:4d}  RSS {rss_text}"
+                  + (f"  XAI log {entry['xai_log_entries']}" if 'xai_log_entries' in entry else ''),
+                  flush=True)
+        last = now
+    stats.take_interval()
+
+    total_s = time.perf_counter() - start
+    completed = int(stats.total.sum())
+    return {
+        'requests': completed,
+        'errors': stats.errors,
+        'duration_s': total_s,
+        'throughput_rps': completed / total_s if total_s > 0 else 0.0,
+        'mean_ms': stats.latency_sum_ms / max(completed, 1),
+        'latency_ms': percentiles(stats.total),
+        'timeline': timeline,
+        'memory': memory_growth(rss_samples, warmup, growth_threshold),
+        'concurrency': concurrency,
+        'mix': [{'kind': kind, 'arg': arg, 'weight': weight} for kind, arg, weight in mix]
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Load and soak test the ORION-EYE API')
+    parser.add_argument('--url', help='Base URL of a running server (default: in-process test client)')
+    parser.add_argument('--pid', type=int, help='Server process id for RSS sampling with --url')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f'Weighted request mix (default: {DEFAULT_MIX})')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests instead')
+    parser.add_argument('--interval', type=float, default=5.0, help='Report interval in seconds')
+    parser.add_argument('--warmup', type=float, default=10.0,
+                        help='Seconds excluded from the memory growth fit')
+    parser.add_argument('--growth-threshold', type=float, default=DEFAULT_GROWTH_MB_PER_MIN,
+                        help='Flag RSS growth above this many MB/min')
+    parser.add_argument('--json', help='Write the full report to this file')
+    args = parser.parse_args(argv)
+
+    target = HttpTarget(args.url) if args.url else InProcessTarget()
+    mix = parse_mix(args.mix)
+
+    print("=" * 70)
+    print("ORION-EYE LOAD TEST")
+    print(f"Target: {args.url or 'in-process Flask test client'}  concurrency {args.concurrency}")
+    print(f"Mix: {args.mix}")
+    print("=" * 70)
+    report = run_load(target, mix, concurrency=args.concurrency, duration=args.duration,
+                      requests=args.requests, interval=args.interval, warmup=args.warmup,
+                      growth_threshold=args.growth_threshold, rss_pid=args.pid)
+
+    latency = report['latency_ms']
+    print("-" * 70)
+    print(f"{report['requests']} requests, {report['errors']} errors in {report['duration_s']:.1f} s "
+          f"-> {report['throughput_rps']:.1f} req/s")
+    print(f"Latency: mean {report['mean_ms']:.2f} ms, p50 {latency['p50']:.2f} ms, "
+          f"p95 {latency['p95']:.2f} ms, p99 {latency['p99']:.2f} ms")
+    memory = report['memory']
+    if memory['slope_mb_per_min'] is None:
+        print("Memory: not enough samples after warm-up for a growth estimate")
+    else:
+        verdict = 'GROWTH FLAGGED' if memory['growth_flagged'] else 'stable'
+        print(f"Memory: {memory['slope_mb_per_min']:+.2f} MB/min "
+              f"({memory['growth_mb']:+.1f} MB after warm-up) - {verdict}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
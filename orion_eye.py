@@ -6,7 +6,59 @@ ORION-EYE: Simulated Onboard AI for Debris Avoidance
 import numpy as np
 from datetime import datetime
 import json
-from typing import Dict, List, Tuple, Optional
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Tuple, Optional
+
+
+class SpatialGrid:
+    """Uniform grid over 3D points for radius queries
+    
+    Points are sorted by the linear index of their cell, so each cell is a
+    contiguous slice found by binary search. A radius query visits only the
+    cells overlapping the query cube and tests the points in them, so its
+    cost follows the local density rather than the total number of points.
+    """
+    
+    def __init__(self, points: np.ndarray, cell_size: float):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+        keys = self._keys(np.floor(self.points / self.cell_size).astype(np.int64))
+        self.order = np.argsort(keys, kind='stable')
+        self.cell_keys, self.cell_start, counts = np.unique(keys[self.order], return_index=True,
+                                                            return_counts=True)
+        self.cell_end = self.cell_start + counts
+    
+    def __len__(self) -> int:
+        return len(self.points)
+    
+    @staticmethod
+    def _keys(cells: np.ndarray) -> np.ndarray:
+        # 21 bits per axis, offset so negative cell coordinates stay positive
+        offset = cells + (1 << 20)
+        return (offset[..., 0] << 42) | (offset[..., 1] << 21) | offset[..., 2]
+    
+    def query_radius(self, center: np.ndarray, radius: float) -> np.ndarray:
+        """Indices of points within radius of center"""
+        center = np.asarray(center, dtype=float)
+        low = np.floor((center - radius) / self.cell_size).astype(np.int64)
+        high = np.floor((center + radius) / self.cell_size).astype(np.int64)
+        axes = [np.arange(lo, hi + 1) for lo, hi in zip(low, high)]
+        keys = self._keys(np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3))
+        
+        slot = np.searchsorted(self.cell_keys, keys)
+        found = slot < len(self.cell_keys)
+        found[found] = self.cell_keys[slot[found]] == keys[found]
+        slot = slot[found]
+        if not len(slot):
+            return np.empty(0, dtype=np.int64)
+        
+        candidates = self.order[np.concatenate([
+            np.arange(start, end) for start, end in zip(self.cell_start[slot], self.cell_end[slot])
+        ])]
+        offset = self.points[candidates] - center
+        return np.sort(candidates[np.einsum('ni,ni->n', offset, offset) <= radius * radius])
 
 
 class Layer1_SpaceSensorSimulator:
@@ -16,6 +68,49 @@ class Layer1_SpaceSensorSimulator:
         self.spacecraft_position = np.array(spacecraft_position)  # km from Earth center
         self.sensor_range = 100  # km
         self.sensor_accuracy = 0.95
+        # Field of view: full cone angle around the boresight (360 = all directions)
+        self.sensor_fov = 360.0  # degrees
+        self.sensor_boresight = np.array([1.0, 0.0, 0.0])
+        # Object catalog scanned through a spatial index (see load_catalog)
+        self.catalog: List[Dict] = []
+        self.catalog_index: Optional[SpatialGrid] = None
+        # 'safe' scenario objects stay at least this far away over the horizon
+        self.safe_clearance = 20.0  # km
+        self.safe_horizon = 300  # seconds, matches Layer 4
+        
+    def in_view(self, positions: np.ndarray) -> np.ndarray:
+        """Mask of (N, 3) positions inside sensor range and the FOV cone"""
+        offset = np.asarray(positions, dtype=float).reshape(-1, 3) - self.spacecraft_position
+        distance = np.sqrt(np.einsum('ni,ni->n', offset, offset))
+        visible = distance <= self.sensor_range
+        if self.sensor_fov < 360.0:
+            boresight = self.sensor_boresight / np.linalg.norm(self.sensor_boresight)
+            cos_half_angle = np.cos(np.radians(self.sensor_fov / 2.0))
+            visible &= offset @ boresight >= cos_half_angle * distance
+        return visible
+    
+    def load_catalog(self, objects: List[Dict]):
+        """Index a catalog of objects for scan_catalog
+        
+        The grid cell size is the sensor range at load time, so a scan
+        touches at most 27 cells.
+        """
+        self.catalog = list(objects)
+        positions = np.array([obj['position'] for obj in self.catalog], dtype=float).reshape(-1, 3)
+        self.catalog_index = SpatialGrid(positions, self.sensor_range)
+    
+    def scan_catalog(self) -> List[Dict]:
+        """Objects of the loaded catalog that the sensor can see
+        
+        Only objects in grid cells within sensor range are tested, and only
+        visible ones are copied, so a scan costs O(visible objects) rather
+        than O(catalog size).
+        """
+        if self.catalog_index is None:
+            return []
+        idx = self.catalog_index.query_radius(self.spacecraft_position, self.sensor_range)
+        idx = idx[self.in_view(self.catalog_index.points[idx])]
+        return [dict(self.catalog[i]) for i in idx.tolist()]
         
     def generate_debris_field(self, num_objects: int = 5) -> List[Dict]:
         """Generate simulated space objects in LEO"""
@@ -31,10 +126,53 @@ class Layer1_SpaceSensorSimulator:
             objects.append(obj)
         return objects
     
+    def clear_debris_field(self, objects: List[Dict], max_attempts: int = 100) -> List[Dict]:
+        """Redraw velocities until no object passes within safe_clearance
+        
+        Closest approach is for straight-line motion over safe_horizon;
+        objects starting inside the clearance are moved out along their
+        offset. Modifies and returns objects.
+        """
+        if not objects:
+            return objects
+        offset = np.array([obj['position'] for obj in objects], dtype=float) - self.spacecraft_position
+        distance = np.linalg.norm(offset, axis=1, keepdims=True)
+        offset = np.where(distance < self.safe_clearance,
+                          offset / np.maximum(distance, 1e-9) * self.safe_clearance * 1.01, offset)
+        velocity = np.array([obj['velocity'] for obj in objects], dtype=float)
+        
+        for _ in range(max_attempts):
+            speed2 = np.einsum('ij,ij->i', velocity, velocity)
+            t = np.clip(-np.einsum('ij,ij->i', offset, velocity) / np.maximum(speed2, 1e-12),
+                        0.0, self.safe_horizon)
+            miss = np.linalg.norm(offset + velocity * t[:, None], axis=1)
+            close = miss < self.safe_clearance
+            if not close.any():
+                break
+            velocity[close] = np.random.uniform(-8, 8, (int(close.sum()), 3))
+        
+        for obj, position, v in zip(objects, offset + self.spacecraft_position, velocity):
+            obj['position'] = position
+            obj['velocity'] = v
+        return objects
+    
     def scan_environment(self, scenario: str = 'safe') -> List[Dict]:
-        """Scan and return detected objects based on scenario"""
+        """Scan and return objects the sensor can see for a scenario
+        
+        The 'catalog' scenario scans the catalog given to load_catalog; the
+        others generate objects around the spacecraft.
+        """
+        if scenario == 'catalog':
+            return self.scan_catalog()
+        objects = self._scenario_objects(scenario)
+        if not objects:
+            return objects
+        visible = self.in_view([obj['position'] for obj in objects])
+        return [obj for obj, seen in zip(objects, visible.tolist()) if seen]
+    
+    def _scenario_objects(self, scenario: str) -> List[Dict]:
         if scenario == 'safe':
-            return self.generate_debris_field(2)
+            return self.clear_debris_field(self.generate_debris_field(2))
         elif scenario == 'crash':
             # Dangerous scenario with objects on collision course
             obj = {
@@ -57,50 +195,477 @@ class Layer2_ObjectDetector:
     def __init__(self):
         self.detection_threshold = 0.5
         self.confidence_model_accuracy = 0.92
+        self.confidence_noise = 0.05
+        # Beyond sensor range the return weakens like radar SNR, ~ (range / r)^4
+        self.range_falloff_exponent = 4.0
+        
+    def detect_batch(self, positions: np.ndarray, sensor_position: Optional[np.ndarray] = None,
+                     sensor_range: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Detection mask and confidence for (N, 3) object positions
+        
+        Both come from one uniform draw: confidence is the range-dependent
+        detection probability plus noise, and an object is detected when its
+        confidence clears detection_threshold. Without a sensor position and
+        range the detection probability is the same for every object.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        probability = np.full(len(positions), self.confidence_model_accuracy)
+        if sensor_position is not None and sensor_range:
+            offset = positions - np.asarray(sensor_position, dtype=float)
+            distance = np.sqrt(np.einsum('ni,ni->n', offset, offset))
+            beyond = distance > sensor_range
+            probability[beyond] *= (sensor_range / distance[beyond]) ** self.range_falloff_exponent
         
-    def detect_objects(self, sensor_data: List[Dict]) -> List[Dict]:
-        """Apply detection algorithm to sensor data"""
+        confidence = probability + np.random.uniform(-self.confidence_noise,
+                                                     self.confidence_noise, len(positions))
+        return confidence > self.detection_threshold, confidence
+        
+    def detect_objects(self, sensor_data: List[Dict], sensor_position: Optional[np.ndarray] = None,
+                       sensor_range: Optional[float] = None) -> List[Dict]:
+        """Apply detection algorithm to sensor data
+        
+        Returns shallow copies of the detected objects with detection_confidence
+        and an ISO timestamp added; sensor_data itself is left unchanged. The
+        timestamp is formatted once and shared by every object in the call.
+        """
+        if not sensor_data:
+            return []
+        
+        detected, confidence = self.detect_batch([obj['position'] for obj in sensor_data],
+                                                 sensor_position, sensor_range)
+        timestamp = datetime.now().isoformat()
         detected_objects = []
-        for obj in sensor_data:
-            confidence = self.confidence_model_accuracy + np.random.uniform(-0.05, 0.05)
-            if confidence > self.detection_threshold:
-                detected = obj.copy()
-                detected['detection_confidence'] = confidence
-                detected['timestamp'] = datetime.now().isoformat()
-                detected_objects.append(detected)
+        for obj, hit, conf in zip(sensor_data, detected.tolist(), confidence.tolist()):
+            if hit:
+                detected_objects.append(dict(obj, detection_confidence=conf, timestamp=timestamp))
         return detected_objects
 
 
+class RuleBasedClassifier:
+    """Size/velocity rules, applied to whole arrays with masks
+    
+    Small fast objects are debris and large slow ones satellites; anything
+    else keeps the type reported by the sensor with lower confidence.
+    """
+    
+    def classify(self, size: np.ndarray, speed: np.ndarray,
+                 reported_type: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        debris = (size < 1.0) & (speed > 5)
+        satellite = ~debris & (size > 3.0) & (speed < 5)
+        
+        predicted = reported_type.astype(object)
+        predicted[debris] = 'debris'
+        predicted[satellite] = 'satellite'
+        
+        # One uniform draw per object, scaled per branch
+        u = np.random.uniform(0, 1, len(size))
+        confidence = np.where(debris, 0.85 + 0.10 * u,
+                              np.where(satellite, 0.80 + 0.15 * u, 0.75 + 0.10 * u))
+        return predicted, confidence
+
+
+class LogisticClassifier:
+    """Logistic/softmax model over standardized [size, speed] features
+    
+    Parameters come from an .npz file with:
+        coef: (F,) for a binary model (probability of classes[1]) or (F, C)
+        intercept: scalar or (C,)
+        classes: class labels, e.g. ['debris', 'satellite']
+        mean, scale: optional feature standardization, (F,)
+    """
+    
+    def __init__(self, coef: np.ndarray, intercept, classes,
+                 mean: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None):
+        self.coef = np.asarray(coef, dtype=float)
+        self.intercept = np.asarray(intercept, dtype=float)
+        self.classes = np.asarray(classes, dtype=object)
+        self.mean = np.zeros(len(self.coef)) if mean is None else np.asarray(mean, dtype=float)
+        self.scale = np.ones(len(self.coef)) if scale is None else np.asarray(scale, dtype=float)
+    
+    @classmethod
+    def load(cls, path: str) -> 'LogisticClassifier':
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['coef'], data['intercept'], data['classes'].astype(str),
+                       data['mean'] if 'mean' in data else None,
+                       data['scale'] if 'scale' in data else None)
+    
+    def classify(self, size: np.ndarray, speed: np.ndarray,
+                 reported_type: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        features = (np.column_stack([size, speed]) - self.mean) / self.scale
+        logits = features @ self.coef + self.intercept
+        
+        if self.coef.ndim == 1:
+            p = 1.0 / (1.0 + np.exp(-logits))
+            positive = p >= 0.5
+            return self.classes[positive.astype(np.int64)], np.where(positive, p, 1.0 - p)
+        
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        p /= p.sum(axis=1, keepdims=True)
+        best = np.argmax(p, axis=1)
+        return self.classes[best], p[np.arange(len(p)), best]
+
+
 class Layer3_Classifier:
-    """Layer 3: Classify (Debris/Satellite) - Classifies detected objects"""
+    """Layer 3: Classify (Debris/Satellite) - Classifies detected objects
     
-    def __init__(self):
+    Classification is delegated to a backend with a classify(size, speed,
+    reported_type) method that labels whole arrays at once. The default is
+    the rule-based simulation; LogisticClassifier.load() provides a trained
+    model.
+    """
+    
+    def __init__(self, backend=None):
         self.classification_accuracy = 0.88
+        self.backend = backend if backend is not None else RuleBasedClassifier()
         
     def classify_object(self, obj: Dict) -> Dict:
         """Classify object as debris or satellite"""
-        # Simulated classification based on size and velocity patterns
-        size = obj['size']
-        velocity_magnitude = np.linalg.norm(obj['velocity'])
-        
-        # Classification logic (simulated intelligence)
-        if size < 1.0 and velocity_magnitude > 5:
-            predicted_type = 'debris'
-            confidence = 0.85 + np.random.uniform(0, 0.1)
-        elif size > 3.0 and velocity_magnitude < 5:
-            predicted_type = 'satellite'
-            confidence = 0.80 + np.random.uniform(0, 0.15)
-        else:
-            predicted_type = obj['type']
-            confidence = 0.75 + np.random.uniform(0, 0.1)
-            
-        obj['classified_type'] = predicted_type
-        obj['classification_confidence'] = confidence
-        return obj
+        return self.classify_all([obj])[0]
+    
+    def classify_batch(self, size: np.ndarray, velocity: np.ndarray,
+                       reported_type: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Classify arrays of sizes (N,), velocities (N, 3) and reported types (N,)
+        
+        Returns:
+            (predicted types, confidence), each of shape (N,)
+        """
+        size = np.asarray(size, dtype=float)
+        velocity = np.asarray(velocity, dtype=float).reshape(-1, 3)
+        speed = np.sqrt(np.einsum('ni,ni->n', velocity, velocity))
+        return self.backend.classify(size, speed, np.asarray(reported_type, dtype=object))
     
     def classify_all(self, objects: List[Dict]) -> List[Dict]:
         """Classify all detected objects"""
-        return [self.classify_object(obj) for obj in objects]
+        if not objects:
+            return objects
+        
+        predicted, confidence = self.classify_batch(
+            [obj['size'] for obj in objects],
+            [obj['velocity'] for obj in objects],
+            [obj['type'] for obj in objects]
+        )
+        for obj, predicted_type, conf in zip(objects, predicted.tolist(), confidence.tolist()):
+            obj['classified_type'] = predicted_type
+            obj['classification_confidence'] = conf
+        return objects
+
+
+# Earth constants for orbital propagation
+MU_EARTH = 398600.4418  # km^3/s^2
+R_EARTH = 6378.137  # km
+J2_EARTH = 1.08262668e-3
+
+
+class OrbitalPropagator:
+    """Vectorized two-body + J2 propagator for N objects
+    
+    Two-body motion uses Lagrange f and g coefficients with Kepler's equation
+    solved for the eccentric anomaly change by batched Newton iterations, which
+    avoids the singular element sets of circular and equatorial orbits. J2 is
+    added as a first-order perturbation: its acceleration is sampled once per
+    horizon along the two-body arc, fitted by a polynomial and integrated
+    twice in closed form, so the input (osculating) state is reproduced
+    exactly at t = 0 and J2 costs less than the two-body solve. That is
+    accurate for arcs of minutes, like the 300 s screening horizon, and
+    degrades over a large fraction of an orbit. Positions are Earth-centred
+    inertial (km), velocities km/s. Unbound or degenerate orbits fall back
+    to straight-line motion.
+    """
+    
+    def __init__(self, include_j2: bool = True, newton_iterations: int = 8,
+                 tolerance: float = 1e-10, j2_quadrature_nodes: int = 3):
+        self.include_j2 = include_j2
+        self.newton_iterations = newton_iterations
+        self.tolerance = tolerance  # radians of eccentric anomaly
+        self.j2_quadrature_nodes = j2_quadrature_nodes
+    
+    def propagate(self, positions: np.ndarray, velocities: np.ndarray,
+                  times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Propagate (N, 3) states to T times; returns (N, T, 3) arrays
+        
+        times is either shared by all objects (shape (T,)) or given per
+        object (shape (N, T)).
+        """
+        r0 = np.asarray(positions, dtype=float)
+        v0 = np.asarray(velocities, dtype=float)
+        dt = np.asarray(times, dtype=float)
+        dt = dt[None, :] if dt.ndim == 1 else dt
+        
+        r0_mag = np.linalg.norm(r0, axis=1)
+        v0_sq = np.einsum('ni,ni->n', v0, v0)
+        h_mag = np.linalg.norm(np.cross(r0, v0), axis=1)
+        inv_a = 2.0 / np.maximum(r0_mag, 1e-9) - v0_sq / MU_EARTH
+        bound = (inv_a > 0) & (h_mag > 1e-9) & (r0_mag > 0)
+        
+        pos = np.empty((len(r0), dt.shape[1], 3))
+        vel = np.empty_like(pos)
+        if not bound.all():
+            # Straight-line motion for unbound or degenerate states
+            free = ~bound
+            dt_free = dt if len(dt) == 1 else dt[free]
+            pos[free] = r0[free, None, :] + v0[free, None, :] * dt_free[..., None]
+            vel[free] = v0[free, None, :]
+        if not bound.any():
+            return pos, vel
+        
+        idx = np.flatnonzero(bound)
+        r0, v0 = r0[idx], v0[idx]
+        if len(dt) > 1:
+            dt = dt[idx]
+        r, v = self._two_body(r0, v0, dt)
+        if self.include_j2:
+            dr, dv = self._j2_perturbation(r0, v0, dt)
+            r += dr
+            v += dv
+        
+        if len(idx) == len(pos):
+            return r, v
+        pos[idx] = r
+        vel[idx] = v
+        return pos, vel
+    
+    def _two_body(self, r0: np.ndarray, v0: np.ndarray,
+                  dt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Kepler propagation of bound states; dt is (1, T) or (N, T)"""
+        r0_mag = np.linalg.norm(r0, axis=1)
+        h = np.cross(r0, v0)
+        h_mag = np.linalg.norm(h, axis=1)
+        a = 1.0 / (2.0 / r0_mag - np.einsum('ni,ni->n', v0, v0) / MU_EARTH)
+        n = np.sqrt(MU_EARTH / a ** 3)
+        sigma0 = np.einsum('ni,ni->n', r0, v0) / np.sqrt(MU_EARTH)
+        
+        # Kepler's equation in terms of the eccentric anomaly change dE:
+        # M = dE + (sigma0 / sqrt(a)) (1 - cos dE) - (1 - r0 / a) sin dE
+        M = n[:, None] * dt
+        c1 = (sigma0 / np.sqrt(a))[:, None]
+        c2 = (1.0 - r0_mag / a)[:, None]
+        dE = M.copy()
+        for _ in range(self.newton_iterations):
+            sin_dE, cos_dE = np.sin(dE), np.cos(dE)
+            step = (dE + c1 * (1.0 - cos_dE) - c2 * sin_dE - M) / (1.0 + c1 * sin_dE - c2 * cos_dE)
+            dE -= step
+            if np.abs(step).max() < self.tolerance:
+                break
+        sin_dE, cos_dE = np.sin(dE), np.cos(dE)
+        
+        a_ = a[:, None]
+        r0_ = r0_mag[:, None]
+        r_mag = a_ + (r0_ - a_) * cos_dE + np.sqrt(a_) * sigma0[:, None] * sin_dE
+        f = 1.0 - a_ / r0_ * (1.0 - cos_dE)
+        g = dt - np.sqrt(a_ ** 3 / MU_EARTH) * (dE - sin_dE)
+        f_dot = -np.sqrt(MU_EARTH * a_) / (r_mag * r0_) * sin_dE
+        g_dot = 1.0 - a_ / r_mag * (1.0 - cos_dE)
+        
+        # Work in the orbit plane basis (e1 along r0, e2 = h x e1) so each
+        # state is two coordinates until the final projection to 3D
+        e1 = r0 / r0_
+        e2 = np.cross(h / h_mag[:, None], e1)
+        v0_e1 = np.einsum('ni,ni->n', v0, e1)[:, None]
+        v0_e2 = np.einsum('ni,ni->n', v0, e2)[:, None]
+        basis = np.stack([e1, e2], axis=1)
+        r = np.stack([f * r0_ + g * v0_e1, g * v0_e2], axis=2) @ basis
+        v = np.stack([f_dot * r0_ + g_dot * v0_e1, g_dot * v0_e2], axis=2) @ basis
+        return r, v
+    
+    def _j2_perturbation(self, r0: np.ndarray, v0: np.ndarray,
+                         dt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Position and velocity change due to J2 along the two-body arc
+        
+        The acceleration is sampled once per horizon, at Gauss-Legendre nodes
+        s = S u on [0, S] where S is the longest time requested, and fitted by
+        a polynomial in u. dv(t) = int_0^t a(s) ds and dr(t) = int_0^t (t - s)
+        a(s) ds then follow in closed form for every requested time, so the
+        cost is one extra Kepler solve per node rather than per node and step.
+        """
+        x, _ = np.polynomial.legendre.leggauss(self.j2_quadrature_nodes)
+        u = (x + 1.0) / 2.0
+        span = np.take_along_axis(dt, np.abs(dt).argmax(axis=1)[:, None], axis=1)
+        span = np.where(span == 0.0, 1.0, span)
+        arc, _ = self._two_body(r0, v0, span * u)
+        acc = j2_acceleration(arc)
+        # Coefficients of a(S u) = sum_j c_j u^j, shared solve for all objects
+        coeffs = np.linalg.inv(np.vander(u, increasing=True)) @ acc
+        powers = np.arange(1, len(u) + 1)
+        tau = dt / span
+        dv_terms = tau[..., None] ** powers / powers
+        dr_terms = tau[..., None] ** (powers + 1) / (powers * (powers + 1))
+        dv = span[..., None] * (dv_terms @ coeffs)
+        dr = (span ** 2)[..., None] * (dr_terms @ coeffs)
+        return dr, dv
+
+def j2_acceleration(positions: np.ndarray) -> np.ndarray:
+    """J2 perturbing acceleration (km/s^2) at Earth-centred positions (..., 3)"""
+    r_sq = np.einsum('...i,...i->...', positions, positions)[..., None]
+    z_sq = positions[..., 2:3] ** 2 / r_sq
+    k = -1.5 * J2_EARTH * MU_EARTH * R_EARTH ** 2 / r_sq ** 2.5
+    factor = np.concatenate([1.0 - 5.0 * z_sq, 1.0 - 5.0 * z_sq, 3.0 - 5.0 * z_sq], axis=-1)
+    return k * positions * factor
+
+
+class EphemerisCache:
+    """Propagated states at fixed time nodes, interpolated on demand
+    
+    Each object's position and velocity are stored at nodes spaced
+    node_spacing seconds apart from its epoch, in one float32 slab of shape
+    (slots, K, 6). Queries at any time within the covered span use cubic
+    Hermite interpolation between neighbouring nodes, which matches position
+    and velocity at both ends. Entries are keyed by the exact epoch state, so
+    a changed state is simply a miss, and evicted least recently used once
+    the slab would exceed memory_budget bytes. A query beyond the covered
+    span widens it and drops the stored entries.
+    
+    Lookups may run from several threads; the slab is only touched under a
+    lock, and propagation of the misses happens outside it.
+    
+    float32 keeps Earth-centred positions to about a metre.
+    """
+    
+    def __init__(self, node_spacing: float = 60.0, memory_budget: int = 64 * 1024 ** 2):
+        self.node_spacing = node_spacing
+        self.memory_budget = memory_budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.node_count = 0
+        self._slots: 'OrderedDict[bytes, int]' = OrderedDict()
+        self._nodes = np.empty((0, 0, 6), dtype=np.float32)
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    @property
+    def memory_used(self) -> int:
+        return self._nodes.nbytes
+    
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+            self._nodes = np.empty((0, self.node_count, 6), dtype=np.float32)
+    
+    def lookup(self, positions: np.ndarray, velocities: np.ndarray, times: np.ndarray,
+               propagate: Callable, tag: str = '') -> Tuple[np.ndarray, np.ndarray]:
+        """States of N objects at T times, shape (N, T, 3) each
+        
+        times is shared (T,) or per object (N, T), in seconds from the epoch
+        state. Objects without an entry are propagated to the nodes in one
+        batch with propagate(positions, velocities, node_times) and stored.
+        tag separates entries made by different motion models.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        velocities = np.asarray(velocities, dtype=float).reshape(-1, 3)
+        times = np.asarray(times, dtype=float)
+        needed = int(np.ceil(max(times.max(), 0.0) / self.node_spacing)) + 2
+        
+        states = np.ascontiguousarray(np.hstack([positions, velocities]))
+        row_bytes = states.shape[1] * states.itemsize
+        raw = states.tobytes()
+        prefix = tag.encode()
+        keys = [prefix + raw[i:i + row_bytes] for i in range(0, len(raw), row_bytes)]
+        
+        with self._lock:
+            if needed > self.node_count:
+                self.node_count = needed
+                self.clear()
+            node_count = self.node_count
+            hit, hit_slots, missing = [], [], []
+            for i, key in enumerate(keys):
+                slot = self._slots.get(key)
+                if slot is None:
+                    missing.append(i)
+                else:
+                    self._slots.move_to_end(key)
+                    hit.append(i)
+                    hit_slots.append(slot)
+            self.hits += len(hit)
+            self.misses += len(missing)
+            # Copy the hits out first: storing the misses may evict and reuse
+            # their slots
+            if not missing:
+                nodes = self._nodes[hit_slots]
+            else:
+                nodes = np.empty((len(keys), node_count, 6), dtype=np.float32)
+                nodes[hit] = self._nodes[hit_slots]
+        if not missing:
+            return self._interpolate(nodes, times)
+        
+        node_times = np.arange(node_count) * self.node_spacing
+        pos, vel = propagate(positions[missing], velocities[missing], node_times)
+        nodes[missing] = np.concatenate([pos, vel], axis=2)
+        with self._lock:
+            # Another lookup may have widened the span or stored the same
+            # states meanwhile
+            fresh = {keys[i]: i for i in missing if keys[i] not in self._slots}
+            # More new objects than fit in the budget are served without storing
+            if node_count == self.node_count and fresh and len(fresh) <= self._capacity():
+                self._store(list(fresh), nodes[list(fresh.values())])
+        return self._interpolate(nodes, times)
+    
+    def _capacity(self) -> int:
+        return max(1, self.memory_budget // (self.node_count * 6 * 4))
+    
+    def _store(self, keys: List[bytes], fresh: np.ndarray) -> np.ndarray:
+        """Write new entries into free slots, evicting the oldest as needed
+        
+        Any slot may be reused, including ones read earlier in the same
+        lookup, so callers must copy what they need first.
+        """
+        used = len(self._slots)
+        capacity = self._capacity()
+        if used + len(keys) > len(self._nodes) and len(self._nodes) < capacity:
+            size = min(capacity, max(2 * len(self._nodes), used + len(keys)))
+            grown = np.empty((size, self.node_count, 6), dtype=np.float32)
+            grown[:len(self._nodes)] = self._nodes
+            self._nodes = grown
+        
+        free = list(range(used, min(len(self._nodes), used + len(keys))))
+        while len(free) < len(keys):
+            _, slot = self._slots.popitem(last=False)
+            free.append(slot)
+            self.evictions += 1
+        
+        slots = np.array(free, dtype=np.int64)
+        self._nodes[slots] = fresh
+        self._slots.update(zip(keys, free))
+        return slots
+    
+    def _interpolate(self, nodes: np.ndarray, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cubic Hermite interpolation of (N, K, 6) node states at times"""
+        h = self.node_spacing
+        if times.ndim == 1:
+            # Shared times: the interpolation is one fixed linear map of the nodes
+            k = np.clip(np.floor(times / h).astype(np.int64), 0, nodes.shape[1] - 2)
+            s = times / h - k
+            weights = np.zeros((4, len(times), nodes.shape[1]))
+            columns = np.arange(len(times))
+            for row, (w0, w1) in enumerate(self._hermite(s, h)):
+                weights[row, columns, k] = w0
+                weights[row, columns, k + 1] = w1
+            pos = weights[0] @ nodes[..., :3] + weights[1] @ nodes[..., 3:]
+            vel = weights[2] @ nodes[..., :3] + weights[3] @ nodes[..., 3:]
+            return pos, vel
+        
+        k = np.clip(np.floor(times / h).astype(np.int64), 0, nodes.shape[1] - 2)
+        s = (times / h - k)[..., None]
+        rows = np.arange(len(nodes))[:, None]
+        p0, v0 = nodes[rows, k, :3], nodes[rows, k, 3:]
+        p1, v1 = nodes[rows, k + 1, :3], nodes[rows, k + 1, 3:]
+        (a0, a1), (b0, b1), (c0, c1), (d0, d1) = self._hermite(s, h)
+        pos = a0 * p0 + a1 * p1 + b0 * v0 + b1 * v1
+        vel = c0 * p0 + c1 * p1 + d0 * v0 + d1 * v1
+        return pos.astype(float), vel.astype(float)
+    
+    @staticmethod
+    def _hermite(s: np.ndarray, h: float):
+        """Weights on (p0, p1), (v0, v1) for position, then for velocity"""
+        s2, s3 = s * s, s * s * s
+        return (
+            (2 * s3 - 3 * s2 + 1, 3 * s2 - 2 * s3),
+            ((s3 - 2 * s2 + s) * h, (s3 - s2) * h),
+            ((6 * s2 - 6 * s) / h, (6 * s - 6 * s2) / h),
+            (3 * s2 - 4 * s + 1, 3 * s2 - 2 * s),
+        )
 
 
 class Layer4_TrajectoryPredictor:
@@ -109,34 +674,183 @@ class Layer4_TrajectoryPredictor:
     def __init__(self):
         self.prediction_horizon = 300  # seconds
         self.time_steps = 10
+        # 'linear': position + velocity * t in any frame (default)
+        # 'orbital': two-body + J2, positions must be Earth-centred inertial km
+        self.motion_model = 'linear'
+        self.orbital_propagator = OrbitalPropagator()
+        # Closest-approach refinement: objects that may come within
+        # refine_distance between coarse samples get their TCA solved as
+        # the root of the range-rate
+        self.refine_distance = 50.0  # km
+        self.refine_tolerance = 1e-3  # seconds
+        self.refine_iterations = 30
+        # Orbital ephemerides are reused across screenings of the same
+        # catalog state; set to None to always propagate
+        self.ephemeris = EphemerisCache()
         
     def predict_trajectory(self, obj: Dict, spacecraft_pos: np.ndarray) -> Dict:
         """Predict object trajectory over time"""
-        position = np.array(obj['position'])
-        velocity = np.array(obj['velocity'])
+        return self.predict_all([obj], spacecraft_pos)[0]
+    
+    def propagate(self, positions: np.ndarray, velocities: np.ndarray,
+                  times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Propagate (N, 3) states to T times with the configured motion model
+        
+        Returns:
+            (positions, velocities), each of shape (N, T, 3)
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        velocities = np.asarray(velocities, dtype=float).reshape(-1, 3)
+        times = np.asarray(times, dtype=float)
+        if self.motion_model == 'orbital':
+            return self.orbital_propagator.propagate(positions, velocities, times)
+        
+        times = times[None, :] if times.ndim == 1 else times
+        future = positions[:, None, :] + velocities[:, None, :] * times[..., None]
+        return future, np.broadcast_to(velocities[:, None, :], future.shape)
+    
+    def states(self, positions: np.ndarray, velocities: np.ndarray,
+               times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Like propagate, but served from the ephemeris cache when enabled
+        
+        Linear motion is cheaper to evaluate than to interpolate, so only the
+        orbital model goes through the cache.
+        """
+        if self.ephemeris is None or self.motion_model != 'orbital':
+            return self.propagate(positions, velocities, times)
+        return self.ephemeris.lookup(positions, velocities, times, self.propagate,
+                                     tag=self.motion_model)
+    
+    def relative_state(self, positions: np.ndarray, velocities: np.ndarray,
+                       spacecraft_pos: np.ndarray, spacecraft_vel: Optional[np.ndarray],
+                       times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Object states relative to the spacecraft at the given times
+        
+        The spacecraft is held at spacecraft_pos when spacecraft_vel is None.
+        """
+        pos, vel = self.states(positions, velocities, times)
+        return self._relative_to_spacecraft(pos, vel, spacecraft_pos, spacecraft_vel, times)
+    
+    def _relative_to_spacecraft(self, pos: np.ndarray, vel: np.ndarray,
+                                spacecraft_pos: np.ndarray, spacecraft_vel: Optional[np.ndarray],
+                                times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if spacecraft_vel is None:
+            return pos - np.asarray(spacecraft_pos, dtype=float), vel
+        
+        times = np.asarray(times, dtype=float)
+        count = 1 if times.ndim == 1 else len(times)
+        sc_pos, sc_vel = self.states(np.tile(spacecraft_pos, (count, 1)),
+                                     np.tile(spacecraft_vel, (count, 1)), times)
+        return pos - sc_pos, vel - sc_vel
+    
+    def predict_all(self, objects: List[Dict], spacecraft_pos: np.ndarray,
+                    spacecraft_vel: Optional[np.ndarray] = None) -> List[Dict]:
+        """Predict trajectories for all objects
         
-        trajectory = []
+        All objects are propagated in one batch on a coarse time grid. The
+        spacecraft is held at spacecraft_pos unless spacecraft_vel is given,
+        in which case it is propagated with the same motion model. Close
+        approaches that fall between grid points are then refined by
+        refine_closest_approach.
+        """
+        if not objects:
+            return objects
+        
+        positions = np.array([obj['position'] for obj in objects], dtype=float)
+        velocities = np.array([obj['velocity'] for obj in objects], dtype=float)
         dt = self.prediction_horizon / self.time_steps
+        times = np.arange(self.time_steps) * dt
+        future, future_vel = self.states(positions, velocities, times)
+        rel_pos, rel_vel = self._relative_to_spacecraft(future, future_vel, spacecraft_pos,
+                                                        spacecraft_vel, times)
+        distances = np.linalg.norm(rel_pos, axis=2)
+        closest = np.argmin(distances, axis=1)
         
-        for i in range(self.time_steps):
-            t = i * dt
-            # Simple linear trajectory (simulated)
-            future_pos = position + velocity * t
-            distance_to_spacecraft = np.linalg.norm(future_pos - spacecraft_pos)
-            
-            trajectory.append({
-                'time': t,
-                'position': future_pos.tolist(),
-                'distance': distance_to_spacecraft
-            })
+        refined = self.refine_closest_approach(positions, velocities, spacecraft_pos,
+                                               spacecraft_vel, times, rel_pos, rel_vel)
         
-        obj['predicted_trajectory'] = trajectory
-        obj['closest_approach'] = min(trajectory, key=lambda x: x['distance'])
-        return obj
+        times = times.tolist()
+        for i, (obj, points, ranges, k) in enumerate(zip(objects, future.tolist(),
+                                                        distances.tolist(), closest.tolist())):
+            trajectory = [
+                {'time': t, 'position': p, 'distance': d}
+                for t, p, d in zip(times, points, ranges)
+            ]
+            obj['predicted_trajectory'] = trajectory
+            obj['closest_approach'] = trajectory[k]
+            if i in refined and refined[i]['distance'] < trajectory[k]['distance']:
+                obj['closest_approach'] = refined[i]
+        return objects
     
-    def predict_all(self, objects: List[Dict], spacecraft_pos: np.ndarray) -> List[Dict]:
-        """Predict trajectories for all objects"""
-        return [self.predict_trajectory(obj, spacecraft_pos) for obj in objects]
+    def refine_closest_approach(self, positions: np.ndarray, velocities: np.ndarray,
+                                spacecraft_pos: np.ndarray, spacecraft_vel: Optional[np.ndarray],
+                                times: np.ndarray, rel_pos: np.ndarray,
+                                rel_vel: np.ndarray) -> Dict[int, Dict]:
+        """Solve time of closest approach between coarse samples
+        
+        Between samples t_i and t_i+1 the range can be no smaller than
+        (d_i + d_i+1 - speed * dt) / 2, so only intervals where that bound is
+        under refine_distance and the range-rate changes sign are searched.
+        The root of r.v (zero range-rate) is found in each such window with
+        Illinois regula falsi, propagating only the objects being refined.
+        
+        Returns:
+            Object index -> closest approach dict, for refined objects only
+        """
+        if len(times) < 2:
+            return {}
+        
+        distances = np.linalg.norm(rel_pos, axis=2)
+        range_rate = np.einsum('ntk,ntk->nt', rel_pos, rel_vel)
+        speed = np.linalg.norm(rel_vel, axis=2)
+        step = np.diff(times)
+        lower = (distances[:, :-1] + distances[:, 1:]
+                 - step * np.maximum(speed[:, :-1], speed[:, 1:])) / 2
+        window = (range_rate[:, :-1] < 0) & (range_rate[:, 1:] > 0) & (lower < self.refine_distance)
+        lower = np.where(window, lower, np.inf)
+        interval = np.argmin(lower, axis=1)
+        idx = np.flatnonzero(np.isfinite(lower[np.arange(len(lower)), interval]))
+        if not len(idx):
+            return {}
+        
+        interval = interval[idx]
+        t_lo, t_hi = times[interval], times[interval + 1]
+        f_lo, f_hi = range_rate[idx, interval], range_rate[idx, interval + 1]
+        positions, velocities = positions[idx], velocities[idx]
+        t = t_lo.copy()
+        active = np.ones(len(idx), dtype=bool)
+        side = np.zeros(len(idx), dtype=np.int8)  # which end was kept last step
+        for _ in range(self.refine_iterations):
+            sel = np.flatnonzero(active)
+            t[sel] = (t_lo[sel] * f_hi[sel] - t_hi[sel] * f_lo[sel]) / (f_hi[sel] - f_lo[sel])
+            r, v = self.relative_state(positions[sel], velocities[sel], spacecraft_pos,
+                                       spacecraft_vel, t[sel, None])
+            f = np.einsum('nk,nk->n', r[:, 0], v[:, 0])
+            # Linearized time to closest approach from the current estimate
+            time_error = np.abs(f) / np.maximum(np.einsum('nk,nk->n', v[:, 0], v[:, 0]), 1e-12)
+            
+            # Illinois modification: halve the stale end when the same side
+            # is retained twice, so convergence stays superlinear
+            upper = f > 0
+            lo, hi = sel[~upper], sel[upper]
+            f_hi[lo] *= np.where(side[lo] == -1, 0.5, 1.0)
+            f_lo[hi] *= np.where(side[hi] == 1, 0.5, 1.0)
+            t_lo[lo], f_lo[lo], side[lo] = t[lo], f[~upper], -1
+            t_hi[hi], f_hi[hi], side[hi] = t[hi], f[upper], 1
+            
+            active[sel] = (t_hi[sel] - t_lo[sel] > self.refine_tolerance) & (time_error > self.refine_tolerance)
+            if not active.any():
+                break
+        
+        future, future_vel = self.states(positions, velocities, t[:, None])
+        r, _ = self._relative_to_spacecraft(future, future_vel, spacecraft_pos,
+                                            spacecraft_vel, t[:, None])
+        distance = np.linalg.norm(r[:, 0], axis=1)
+        return {
+            i: {'time': tca, 'position': point, 'distance': d}
+            for i, tca, point, d in zip(idx.tolist(), t.tolist(), future[:, 0].tolist(),
+                                        distance.tolist())
+        }
 
 
 class Layer5_RiskCalculator:
@@ -146,6 +860,26 @@ class Layer5_RiskCalculator:
         self.safe_distance = 5.0  # km
         self.warning_distance = 10.0  # km
         
+        # Probability of collision (Pc) engine
+        # 'tiered': analytic for all, Monte Carlo only inside pc_ambiguous_band
+        self.pc_mode = 'tiered'  # 'tiered', 'analytic', 'monte_carlo' or 'none'
+        self.pc_ambiguous_band = (1e-5, 1e-3)
+        self.pc_quadrature_nodes = (8, 16)  # radial x angular nodes over the hard-body disk
+        self.pc_cutoff_sigma = 8.0  # disks further than this many sigma away get Pc = 0
+        self.pc_max_batch_objects = 2_000  # objects per analytic quadrature batch
+        self.pc_maneuver_threshold = 1e-4  # Pc that requires a maneuver on its own
+        self.prediction_horizon = 300  # seconds, matches Layer 4
+        self.spacecraft_radius = 0.01  # km (10 m hard body)
+        self.position_sigma = 0.1  # km, 1-sigma per axis when no covariance given
+        self.velocity_sigma = 0.01  # km/s, 1-sigma per axis when no covariance given
+        self.mc_max_samples = 10000  # per object
+        self.mc_batch_size = 1000  # samples per object per vectorized batch
+        self.mc_max_batch_elements = 250_000  # object*sample pairs held in memory at once
+        self.mc_early_stop = True
+        self.mc_relative_tolerance = 0.1  # stop once the 95% CI half-width is below 10% of Pc...
+        self.mc_absolute_tolerance = 1e-3  # ...or below this absolute Pc ('monte_carlo' mode only)
+        self.rng = np.random.default_rng()
+        
     def calculate_risk(self, obj: Dict) -> Dict:
         """Calculate collision risk for an object
         
@@ -193,23 +927,428 @@ class Layer5_RiskCalculator:
         }
         return obj
     
-    def assess_all(self, objects: List[Dict]) -> List[Dict]:
-        """Assess risk for all objects"""
-        return [self.calculate_risk(obj) for obj in objects]
+    def assess_all(self, objects: List[Dict],
+                   spacecraft_pos: Optional[np.ndarray] = None) -> List[Dict]:
+        """Assess risk for all objects
+        
+        When spacecraft_pos is given and pc_mode is enabled, each
+        risk_assessment also gets a collision probability, and a Pc at or
+        above pc_maneuver_threshold requires a maneuver regardless of distance.
+        """
+        objects = [self.calculate_risk(obj) for obj in objects]
+        if self.pc_mode == 'none' or spacecraft_pos is None or not objects:
+            return objects
+        
+        pc = self.collision_probability(objects, spacecraft_pos)
+        for i, obj in enumerate(objects):
+            risk = obj['risk_assessment']
+            risk['collision_probability'] = float(pc['pc'][i])
+            risk['pc_method'] = pc['method'][i]
+            risk['pc_std_error'] = float(pc['std_error'][i])
+            risk['pc_samples'] = int(pc['samples'][i])
+            risk['pc_compute_ms'] = float(pc['compute_ms'][i])
+            if pc['pc'][i] >= self.pc_maneuver_threshold:
+                risk['requires_maneuver'] = True
+        return objects
+    
+    def collision_probability(self, objects: List[Dict],
+                              spacecraft_pos: np.ndarray) -> Dict[str, np.ndarray]:
+        """Pc for all objects using the configured pc_mode
+        
+        In 'tiered' mode every object gets the analytic encounter-plane Pc and
+        only those inside pc_ambiguous_band are re-estimated by Monte Carlo,
+        so cost scales with the number of hard cases, not the catalog size.
+        Plain sampling cannot resolve Pc this small in mc_max_samples, so
+        the tier uses importance sampling and stops on mc_relative_tolerance
+        alone; the analytic value is kept wherever the estimate does not
+        reach that tolerance.
+        
+        Returns:
+            Dict of per-object arrays: pc, method, std_error, samples, compute_ms
+        """
+        rel_pos, rel_vel, pos_cov, vel_cov, radius = self._state_arrays(objects, spacecraft_pos)
+        n = len(rel_pos)
+        result = {
+            'pc': np.zeros(n),
+            'method': np.full(n, self.pc_mode if self.pc_mode != 'tiered' else 'analytic', dtype=object),
+            'std_error': np.zeros(n),
+            'samples': np.zeros(n, dtype=np.int64),
+            'compute_ms': np.zeros(n)
+        }
+        
+        if self.pc_mode in ('analytic', 'tiered'):
+            t0 = time.perf_counter()
+            result['pc'] = self._analytic(rel_pos, rel_vel, pos_cov, vel_cov, radius)
+            result['compute_ms'] += (time.perf_counter() - t0) * 1000.0 / n
+        
+        if self.pc_mode == 'monte_carlo':
+            mc_idx = np.arange(n)
+        elif self.pc_mode == 'tiered':
+            low, high = self.pc_ambiguous_band
+            mc_idx = np.flatnonzero((result['pc'] >= low) & (result['pc'] <= high))
+        else:
+            mc_idx = np.empty(0, dtype=np.int64)
+        
+        if len(mc_idx):
+            tiered = self.pc_mode == 'tiered'
+            pc, std_error, samples, compute_ms = self._monte_carlo(
+                rel_pos[mc_idx], rel_vel[mc_idx], pos_cov[mc_idx], vel_cov[mc_idx], radius[mc_idx],
+                importance=tiered
+            )
+            result['compute_ms'][mc_idx] += compute_ms
+            if tiered:
+                resolved = (pc > 0) & (1.96 * std_error <= self.mc_relative_tolerance * pc)
+                mc_idx, pc, std_error, samples = (mc_idx[resolved], pc[resolved],
+                                                  std_error[resolved], samples[resolved])
+            result['pc'][mc_idx] = pc
+            result['method'][mc_idx] = 'monte_carlo'
+            result['std_error'][mc_idx] = std_error
+            result['samples'][mc_idx] = samples
+        return result
+    
+    def analytic_pc(self, objects: List[Dict], spacecraft_pos: np.ndarray) -> np.ndarray:
+        """Closed-form 2D encounter-plane Pc for all objects
+        
+        Assumes a short, straight-line encounter: the combined position
+        covariance at the time of closest approach (TCA) is projected onto the
+        plane normal to the relative velocity, and the resulting 2D Gaussian
+        is integrated over the hard-body disk around the spacecraft.
+        """
+        rel_pos, rel_vel, pos_cov, vel_cov, radius = self._state_arrays(objects, spacecraft_pos)
+        return self._analytic(rel_pos, rel_vel, pos_cov, vel_cov, radius)
+    
+    def _analytic(self, rel_pos, rel_vel, pos_cov, vel_cov, radius) -> np.ndarray:
+        vv = np.einsum('ni,ni->n', rel_vel, rel_vel)
+        t_ca = np.clip(-np.einsum('ni,ni->n', rel_pos, rel_vel) / np.maximum(vv, 1e-12),
+                       0.0, self.prediction_horizon)
+        miss = rel_pos + rel_vel * t_ca[:, None]
+        cov = pos_cov + vel_cov * (t_ca ** 2)[:, None, None]
+        
+        basis = self._encounter_basis(rel_vel)
+        miss_2d = np.einsum('nij,nj->ni', basis, miss)
+        cov_2d = basis @ cov @ basis.transpose(0, 2, 1)
+        a, b, c = cov_2d[:, 0, 0], cov_2d[:, 0, 1], cov_2d[:, 1, 1]
+        det = a * c - b ** 2
+        
+        # Skip the quadrature where the whole disk lies far out in the tail
+        sigma_max = np.sqrt((a + c) / 2 + np.sqrt(((a - c) / 2) ** 2 + b ** 2))
+        gap = np.linalg.norm(miss_2d, axis=1) - radius
+        idx = np.flatnonzero(gap < self.pc_cutoff_sigma * sigma_max)
+        pc = np.zeros(len(rel_pos))
+        
+        # Gauss-Legendre in radius, uniform in angle: nodes on the unit disk
+        nr, nt = self.pc_quadrature_nodes
+        x, w = np.polynomial.legendre.leggauss(nr)
+        rho = (x + 1) / 2
+        theta = np.arange(nt) * (2 * np.pi / nt)
+        ux = (rho[:, None] * np.cos(theta)).ravel()
+        uy = (rho[:, None] * np.sin(theta)).ravel()
+        unit_weight = np.repeat(w / 2 * rho * (2 * np.pi / nt), nt)
+        
+        for start in range(0, len(idx), self.pc_max_batch_objects):
+            k = idx[start:start + self.pc_max_batch_objects]
+            R = radius[k][:, None]
+            dx = R * ux - miss_2d[k, 0][:, None]
+            dy = R * uy - miss_2d[k, 1][:, None]
+            mahal = (c[k, None] * dx * dx - 2 * b[k, None] * dx * dy + a[k, None] * dy * dy) / det[k, None]
+            density = np.exp(-0.5 * mahal)
+            pc[k] = (density @ unit_weight) * radius[k] ** 2 / (2 * np.pi * np.sqrt(det[k]))
+        return np.clip(pc, 0.0, 1.0)
+    
+    @staticmethod
+    def _encounter_basis(rel_vel: np.ndarray) -> np.ndarray:
+        """Encounter plane basis orthogonal to the relative velocity, shape (n, 2, 3)"""
+        v_hat = rel_vel / np.maximum(np.linalg.norm(rel_vel, axis=1), 1e-12)[:, None]
+        helper = np.where(np.abs(v_hat[:, [0]]) < 0.9, [[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]])
+        e1 = np.cross(v_hat, helper)
+        e1 /= np.linalg.norm(e1, axis=1)[:, None]
+        return np.stack([e1, np.cross(v_hat, e1)], axis=1)
+    
+    def _state_arrays(self, objects: List[Dict], spacecraft_pos: np.ndarray):
+        """Relative states, covariances and hard-body radii as stacked arrays"""
+        rel_pos = np.array([obj['position'] for obj in objects], dtype=float) - spacecraft_pos
+        rel_vel = np.array([obj['velocity'] for obj in objects], dtype=float)
+        pos_cov = self._covariances(objects, 'position_covariance', self.position_sigma)
+        vel_cov = self._covariances(objects, 'velocity_covariance', self.velocity_sigma)
+        # 'size' is the object diameter in meters
+        radius = np.array([obj['size'] for obj in objects], dtype=float) / 2000.0 + self.spacecraft_radius
+        return rel_pos, rel_vel, pos_cov, vel_cov, radius
+    
+    @staticmethod
+    def _covariances(objects: List[Dict], key: str, default_sigma: float) -> np.ndarray:
+        """Per-object 3x3 covariances, isotropic default where none is given"""
+        cov = np.zeros((len(objects), 3, 3))
+        cov[:, [0, 1, 2], [0, 1, 2]] = default_sigma ** 2
+        for i, obj in enumerate(objects):
+            if key in obj:
+                cov[i] = obj[key]
+        return cov
+    
+    def monte_carlo_pc(self, objects: List[Dict],
+                       spacecraft_pos: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Monte Carlo probability of collision for all objects at once
+        
+        Samples position/velocity errors from each object's covariance in
+        batches of (objects x mc_batch_size), propagates relative motion
+        linearly to the sample's own closest approach within the prediction
+        horizon, and counts approaches inside the combined hard-body radius.
+        With mc_early_stop, an object stops sampling once its 95% confidence
+        interval is within tolerance.
+        
+        Returns:
+            (pc, std_error, samples_used, compute_ms) arrays, one entry per object
+        """
+        rel_pos, rel_vel, pos_cov, vel_cov, radius = self._state_arrays(objects, spacecraft_pos)
+        return self._monte_carlo(rel_pos, rel_vel, pos_cov, vel_cov, radius)
+    
+    def _monte_carlo(self, rel_pos, rel_vel, pos_cov, vel_cov, radius, importance: bool = False):
+        """Monte Carlo Pc; with importance, samples come from _importance_proposal
+        
+        Importance-sampled hits are weighted by the likelihood ratio, which
+        keeps the estimate unbiased while most samples land near the hard
+        body, and stopping is on relative tolerance only.
+        """
+        n = len(rel_pos)
+        pos_chol = np.linalg.cholesky(pos_cov)
+        vel_chol = np.linalg.cholesky(vel_cov)
+        proposal = self._importance_proposal(rel_pos, rel_vel, pos_chol, vel_chol, radius) \
+            if importance else None
+        weight_sum = np.zeros(n)
+        weight_sq_sum = np.zeros(n)
+        samples = np.zeros(n, dtype=np.int64)
+        compute_ms = np.zeros(n)
+        active = np.ones(n, dtype=bool)
+        chunk = max(1, self.mc_max_batch_elements // self.mc_batch_size)
+        
+        while active.any():
+            for start in range(0, n, chunk):
+                idx = np.flatnonzero(active[start:start + chunk]) + start
+                if not len(idx):
+                    continue
+                t0 = time.perf_counter()
+                s1, s2 = self._sample_hits(rel_pos[idx], rel_vel[idx], pos_chol[idx],
+                                           vel_chol[idx], radius[idx],
+                                           None if proposal is None else [a[idx] for a in proposal])
+                weight_sum[idx] += s1
+                weight_sq_sum[idx] += s2
+                samples[idx] += self.mc_batch_size
+                compute_ms[idx] += (time.perf_counter() - t0) * 1000.0 / len(idx)
+            
+            active &= samples < self.mc_max_samples
+            if self.mc_early_stop and importance:
+                p = weight_sum / samples
+                half_width = 1.96 * np.sqrt(np.maximum(weight_sq_sum / samples - p * p, 0.0) / samples)
+                active &= ~((p > 0) & (half_width <= self.mc_relative_tolerance * p))
+            elif self.mc_early_stop:
+                # Laplace-smoothed estimate keeps the interval non-zero at 0 hits
+                hits = weight_sum
+                p = (hits + 1) / (samples + 2)
+                half_width = 1.96 * np.sqrt(p * (1 - p) / samples)
+                confident = half_width <= np.maximum(self.mc_relative_tolerance * hits / samples,
+                                                     self.mc_absolute_tolerance)
+                active &= ~confident
+        
+        pc = weight_sum / samples
+        # Equals sqrt(pc (1 - pc) / samples) for unweighted hits
+        std_error = np.sqrt(np.maximum(weight_sq_sum / samples - pc * pc, 0.0) / samples)
+        return np.clip(pc, 0.0, 1.0), std_error, samples, compute_ms
+    
+    def _importance_proposal(self, rel_pos, rel_vel, pos_chol, vel_chol, radius):
+        """Shifted and narrowed normal proposal over the whitened state errors
+        
+        With z the six standard normal draws (position, velocity), the
+        linearized encounter-plane miss at the nominal TCA is m0 + B z. The
+        proposal is centred on the smallest z with zero miss and narrowed
+        along the two directions of B, so that the misses it produces spread
+        about one hard-body radius. The other four directions keep unit
+        variance (narrowing them would make the weight variance infinite).
+        
+        Returns:
+            (mean (n, 6), directions (n, 6, 2), scales (n, 2))
+        """
+        vv = np.einsum('ni,ni->n', rel_vel, rel_vel)
+        t_ca = np.clip(-np.einsum('ni,ni->n', rel_pos, rel_vel) / np.maximum(vv, 1e-12),
+                       0.0, self.prediction_horizon)
+        basis = self._encounter_basis(rel_vel)
+        miss = np.einsum('nij,nj->ni', basis, rel_pos + rel_vel * t_ca[:, None])
+        jacobian = basis @ np.concatenate([pos_chol, vel_chol * t_ca[:, None, None]], axis=2)
+        left, sigma, right = np.linalg.svd(jacobian, full_matrices=False)
+        sigma = np.maximum(sigma, 1e-12)
+        mean = -np.einsum('nki,nk->ni', right, np.einsum('nik,ni->nk', left, miss) / sigma)
+        scales = np.minimum(1.0, radius[:, None] / sigma)
+        return mean, right.transpose(0, 2, 1), scales
+    
+    def _sample_hits(self, rel_pos, rel_vel, pos_chol, vel_chol, radius,
+                     proposal=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Weighted hit sums and sums of squared weights for one batch per object
+        
+        Without a proposal every hit weighs 1, so both sums are the hit count.
+        """
+        z = self.rng.standard_normal((2, len(rel_pos), self.mc_batch_size, 3))
+        if proposal is not None:
+            mean, directions, scales = proposal
+            eps = np.concatenate([z[0], z[1]], axis=2)
+            along = eps @ directions
+            x = eps + (along * (scales[:, None, :] - 1.0)) @ directions.transpose(0, 2, 1)
+            x += mean[:, None, :]
+            # Likelihood ratio of the nominal to the proposal density
+            log_weight = (np.log(scales).sum(axis=1)[:, None]
+                          + 0.5 * (np.einsum('nsi,nsi->ns', eps, eps) - np.einsum('nsi,nsi->ns', x, x)))
+            z = np.stack([x[..., :3], x[..., 3:]])
+        r = np.matmul(z[0], pos_chol.transpose(0, 2, 1))
+        r += rel_pos[:, None, :]
+        v = np.matmul(z[1], vel_chol.transpose(0, 2, 1))
+        v += rel_vel[:, None, :]
+        
+        # Closest approach of straight-line relative motion, limited to the horizon
+        vv = np.einsum('nsi,nsi->ns', v, v)
+        t_ca = np.clip(-np.einsum('nsi,nsi->ns', r, v) / np.maximum(vv, 1e-12),
+                       0.0, self.prediction_horizon)
+        r += v * t_ca[..., None]
+        miss_sq = np.einsum('nsi,nsi->ns', r, r)
+        hit = miss_sq < radius[:, None] ** 2
+        if proposal is None:
+            hits = np.count_nonzero(hit, axis=1).astype(float)
+            return hits, hits
+        weight = np.where(hit, np.exp(log_weight), 0.0)
+        return weight.sum(axis=1), np.einsum('ns,ns->n', weight, weight)
+
+
+class ThreatQueue:
+    """Risk-ordered view of the current objects, kept as columnar arrays
+    
+    Objects are upserted by id, so a tick can update only the objects whose
+    risk changed and remove the ones that left. Each object's score, flags,
+    time to closest approach and confidence are held in parallel arrays
+    (compacted on removal), and top_k uses argpartition, so picking the k
+    worst threats costs O(N + k log k) instead of a full sort.
+    """
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self._slots: Dict[str, int] = {}
+        self._objects: List[Dict] = []
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in (
+            ('score', float), ('distance', float), ('time_to_closest', float),
+            ('confidence', float), ('requires', bool), ('high', bool))}
+    
+    def __len__(self) -> int:
+        return len(self._objects)
+    
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Column views over the active objects: score, distance,
+        # time_to_closest, confidence, requires (maneuver), high (HIGH/CRITICAL)
+        columns = self.__dict__.get('_columns', {})
+        if name in columns:
+            return columns[name][:len(self._objects)]
+        raise AttributeError(name)
+    
+    def update(self, objects: List[Dict]):
+        """Insert or replace risk-assessed objects, keyed by 'id'"""
+        if not objects:
+            return
+        n = len(self._objects)
+        ids = [obj['id'] for obj in objects]
+        fresh = dict(zip(ids, range(n, n + len(ids)))) if not n else None
+        if fresh is not None and len(fresh) == len(ids):
+            # Bulk load into an empty queue
+            self._slots = fresh
+            self._objects = list(objects)
+            slots = np.arange(len(ids))
+        else:
+            slots = np.empty(len(objects), dtype=np.int64)
+            for i, (object_id, obj) in enumerate(zip(ids, objects)):
+                slot = self._slots.get(object_id)
+                if slot is None:
+                    slot = self._slots[object_id] = len(self._objects)
+                    self._objects.append(obj)
+                else:
+                    self._objects[slot] = obj
+                slots[i] = slot
+        
+        if len(self._objects) > len(self._columns['score']):
+            capacity = max(2 * len(self._columns['score']), len(self._objects))
+            for name, column in self._columns.items():
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:n] = column[:n]
+                self._columns[name] = grown
+        
+        risk = [obj['risk_assessment'] for obj in objects]
+        count = len(risk)
+        columns = self._columns
+        columns['score'][slots] = np.fromiter((r['score'] for r in risk), float, count)
+        columns['distance'][slots] = np.fromiter((r['distance_at_closest'] for r in risk), float, count)
+        columns['time_to_closest'][slots] = np.fromiter((r['time_to_closest'] for r in risk), float, count)
+        columns['requires'][slots] = np.fromiter((r['requires_maneuver'] for r in risk), bool, count)
+        columns['high'][slots] = np.fromiter((r['level'] in ('CRITICAL', 'HIGH') for r in risk),
+                                             bool, count)
+        columns['confidence'][slots] = np.fromiter(
+            (obj.get('classification_confidence', 1.0) for obj in objects), float, count)
+    
+    def remove(self, ids: List[str]):
+        """Drop objects by id, moving the last object into each freed slot"""
+        for object_id in ids:
+            slot = self._slots.pop(object_id, None)
+            if slot is None:
+                continue
+            last = len(self._objects) - 1
+            if slot != last:
+                moved = self._objects[last]
+                self._objects[slot] = moved
+                self._slots[moved['id']] = slot
+                for column in self._columns.values():
+                    column[slot] = column[last]
+            self._objects.pop()
+    
+    def count(self, mask: np.ndarray) -> int:
+        return int(np.count_nonzero(mask))
+    
+    def top_k(self, k: int, mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Up to k objects with the highest risk scores, highest first"""
+        candidates = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        if not len(candidates) or k <= 0:
+            return []
+        score = self.score[candidates]
+        if len(candidates) > k:
+            part = np.argpartition(-score, k - 1)[:k]
+            candidates, score = candidates[part], score[part]
+        order = candidates[np.argsort(-score, kind='stable')]
+        return [self._objects[i] for i in order.tolist()]
 
 
 class Layer6_AutonomousDecision:
-    """Layer 6: Autonomous Decision (Avoidance) - Makes avoidance decisions"""
+    """Layer 6: Autonomous Decision (Avoidance) - Makes avoidance decisions
+    
+    Threats are held in a ThreatQueue, which Layers 7 and 10 read instead of
+    rescanning the objects. The queue belongs to the run and is passed in,
+    so one Layer 6 can serve concurrent runs.
+    """
     
     def __init__(self):
         self.decision_threshold = 0.5
+        self.top_k = 10  # threats listed in priority_objects
+        
+    def make_decision(self, objects: List[Dict], threats: Optional[ThreatQueue] = None) -> Dict:
+        """Make autonomous avoidance decision
+        
+        threats, when given, is filled with the objects so the caller can
+        hand the same queue to Layers 7 and 10.
+        """
+        if threats is None:
+            threats = ThreatQueue()
+        threats.update(objects)
+        return self.decide(threats)
+    
+    def decide(self, threats: ThreatQueue) -> Dict:
+        """Decide from the objects currently in the threat queue
         
-    def make_decision(self, objects: List[Dict]) -> Dict:
-        """Make autonomous avoidance decision"""
-        high_risk_objects = [
-            obj for obj in objects 
-            if obj['risk_assessment']['requires_maneuver']
-        ]
+        Use threats.update()/remove() followed by decide() to refine a
+        decision incrementally.
+        """
+        queue = threats
+        high_risk_objects = queue.top_k(self.top_k, queue.requires)
         
         if not high_risk_objects:
             return {
@@ -219,8 +1358,6 @@ class Layer6_AutonomousDecision:
                 'priority_objects': []
             }
         
-        # Sort by risk score
-        high_risk_objects.sort(key=lambda x: x['risk_assessment']['score'], reverse=True)
         highest_risk = high_risk_objects[0]
         
         decision = {
@@ -229,21 +1366,70 @@ class Layer6_AutonomousDecision:
             'maneuver_required': True,
             'priority_objects': [obj['id'] for obj in high_risk_objects],
             'primary_threat': highest_risk['id'],
-            'risk_score': highest_risk['risk_assessment']['score']
+            'risk_score': highest_risk['risk_assessment']['score'],
+            'threat_count': queue.count(queue.requires)
         }
         
         return decision
 
 
+def _fibonacci_sphere(count: int) -> np.ndarray:
+    """Roughly uniform unit vectors on the sphere, shape (count, 3)"""
+    i = np.arange(count) + 0.5
+    z = 1.0 - 2.0 * i / count
+    azimuth = np.pi * (1.0 + 5.0 ** 0.5) * i
+    r = np.sqrt(1.0 - z * z)
+    return np.column_stack([r * np.cos(azimuth), r * np.sin(azimuth), z])
+
+
 class Layer7_ManeuverSimulator:
-    """Layer 7: Maneuver Simulation - Simulates avoidance maneuvers"""
+    """Layer 7: Maneuver Simulation - Simulates avoidance maneuvers
+    
+    The burn is chosen by a batched search over candidate delta-v vectors.
+    Each candidate is scored against every threat at once, assuming an
+    impulsive burn now and straight-line relative motion over the
+    prediction horizon. The cheapest burn that keeps every threat at least
+    required_miss_distance away (or its current range, when that is
+    closer) wins. If none does, the burn with the largest worst-case miss
+    relative to that requirement is used. Search stops at the time budget.
+    
+    When no burn is needed because every threat already clears the
+    requirement, the result is a zero-delta-v MONITOR maneuver, never an
+    AVOIDANCE_BURN.
+    """
     
     def __init__(self):
         self.delta_v_capacity = 2.0  # km/s available for maneuvers
+        # km, post-burn miss for every threat; OrionEyeSystem passes Layer 5's
+        # warning_distance so a successful burn leaves no threat needing a maneuver
+        self.required_miss_distance = 10.0
+        self.screening_distance = 20.0  # km, objects closer than this are threats
+        self.max_threats = 64  # highest-risk threats scored per candidate burn
+        self.prediction_horizon = 300  # seconds, matches Layer 4
+        self.time_budget = 0.05  # seconds of search per maneuver
+        self.search_directions = 256
+        self.search_magnitudes = 24
+        self.refine_samples = 512
+        self.max_batch_pairs = 200_000  # candidate x threat pairs per evaluation
+        self.success_probability = 0.95
+        
+    def calculate_maneuver(self, decision: Dict, objects: List[Dict],
+                           spacecraft_pos: np.ndarray, deadline: Optional[float] = None,
+                           threats: Optional[ThreatQueue] = None,
+                           required_miss_distance: Optional[float] = None) -> Dict:
+        """Calculate optimal avoidance maneuver
         
-    def calculate_maneuver(self, decision: Dict, objects: List[Dict], 
-                          spacecraft_pos: np.ndarray) -> Dict:
-        """Calculate optimal avoidance maneuver"""
+        Args:
+            decision: Layer 6 decision
+            objects: Risk-assessed objects
+            spacecraft_pos: Spacecraft position
+            deadline: Optional time.perf_counter() value the search must end by,
+                      in addition to time_budget
+            threats: Layer 6 threat queue; when given, threats are taken from
+                     it instead of scanning objects
+            required_miss_distance: Post-burn miss for every threat (km);
+                                    defaults to self.required_miss_distance
+        """
         if not decision['maneuver_required']:
             return {
                 'maneuver_type': 'NONE',
@@ -252,90 +1438,187 @@ class Layer7_ManeuverSimulator:
                 'fuel_cost': 0
             }
         
-        # Find primary threat
-        threat = next((obj for obj in objects if obj['id'] == decision['primary_threat']), None)
-        
-        if not threat:
+        if threats is None:
+            threats = ThreatQueue()
+            threats.update(objects)
+        threats = threats.top_k(self.max_threats,
+                                threats.requires | (threats.distance < self.screening_distance))
+        if not threats:
             return {'maneuver_type': 'NONE', 'delta_v': [0, 0, 0], 'burn_duration': 0, 'fuel_cost': 0}
         
-        # Calculate avoidance vector (perpendicular to threat trajectory)
-        threat_velocity = np.array(threat['velocity'])
-        threat_position = np.array(threat['position'])
+        rel_pos = np.array([obj['position'] for obj in threats], dtype=float) - spacecraft_pos
+        rel_vel = np.array([obj['velocity'] for obj in threats], dtype=float)
         
-        # Calculate perpendicular vector
-        relative_pos = threat_position - spacecraft_pos
-        perpendicular = np.cross(threat_velocity, relative_pos)
+        # A burn cannot change the present separation, so a threat already
+        # inside the requirement only has to stay at least as far as it is now
+        if required_miss_distance is None:
+            required_miss_distance = self.required_miss_distance
+        required = np.minimum(required_miss_distance, np.linalg.norm(rel_pos, axis=1))
         
-        perp_magnitude = np.linalg.norm(perpendicular)
-        if perp_magnitude > 0:
-            perpendicular = perpendicular / perp_magnitude
-        else:
-            perpendicular = np.array([0, 0, 1])
+        stop = time.perf_counter() + self.time_budget
+        if deadline is not None:
+            stop = min(stop, deadline)
+        delta_v, min_miss, evaluated, elapsed = self.optimize_burn(rel_pos, rel_vel, stop, required)
         
-        # Maneuver magnitude based on risk
-        maneuver_magnitude = 0.5 * decision['risk_score']  # km/s
-        delta_v = perpendicular * maneuver_magnitude
+        margin = float((self.miss_distances(delta_v[None, :], rel_pos, rel_vel)[0]
+                        / np.maximum(required, 1e-6)).min())
+        maneuver_magnitude = float(np.linalg.norm(delta_v))
+        direction = delta_v / maneuver_magnitude if maneuver_magnitude > 0 else np.array([0.0, 0.0, 1.0])
+        constraint_met = margin >= 1.0
+        success = self.success_probability * min(1.0, margin)
         
         maneuver = {
-            'maneuver_type': 'AVOIDANCE_BURN',
+            'maneuver_type': 'AVOIDANCE_BURN' if maneuver_magnitude > 0 else 'MONITOR',
             'delta_v': delta_v.tolist(),
             'delta_v_magnitude': maneuver_magnitude,
             'burn_duration': maneuver_magnitude * 10,  # seconds
             'fuel_cost': maneuver_magnitude * 100,  # kg
-            'direction': perpendicular.tolist(),
-            'success_probability': 0.95
+            'direction': direction.tolist(),
+            'success_probability': success,
+            'min_miss_distance': min_miss,
+            'constraint_met': bool(constraint_met),
+            'threats_considered': [obj['id'] for obj in threats],
+            'candidates_evaluated': evaluated,
+            'search_ms': elapsed * 1000
         }
         
         return maneuver
+    
+    def miss_distances(self, delta_v: np.ndarray, rel_pos: np.ndarray,
+                       rel_vel: np.ndarray) -> np.ndarray:
+        """Closest approach within the horizon for (C, 3) burns x (M,) threats
+        
+        Returns:
+            (C, M) miss distances in km
+        """
+        v = rel_vel[None, :, :] - delta_v[:, None, :]
+        v_sq = np.einsum('cmi,cmi->cm', v, v)
+        t = -np.einsum('mi,cmi->cm', rel_pos, v) / np.maximum(v_sq, 1e-12)
+        t = np.clip(t, 0.0, self.prediction_horizon)
+        closest = rel_pos[None, :, :] + v * t[..., None]
+        return np.sqrt(np.einsum('cmi,cmi->cm', closest, closest))
+    
+    def optimize_burn(self, rel_pos: np.ndarray, rel_vel: np.ndarray, stop: float,
+                      required: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, int, float]:
+        """Cheapest burn meeting the miss constraint, searched until stop
+        
+        required is the miss distance per threat (required_miss_distance for
+        all when omitted). The zero burn is always a candidate, so it wins
+        when every threat already clears its requirement.
+        
+        A global grid of directions x magnitudes (up to delta_v_capacity) is
+        evaluated first, in shuffled chunks of at most max_batch_pairs
+        candidate-threat pairs so that any prefix covers the whole grid. Then
+        random candidates are drawn around the best burn with a shrinking
+        spread. The search ends when time.perf_counter() reaches stop; at
+        least one chunk is always evaluated.
+        
+        Returns:
+            (delta-v vector, worst-case miss distance, candidates evaluated, seconds)
+        """
+        start = time.perf_counter()
+        if required is None:
+            required = np.full(len(rel_pos), self.required_miss_distance)
+        required = np.maximum(required, 1e-6)
+        rng = np.random.default_rng(0)
+        magnitudes = np.geomspace(0.01, self.delta_v_capacity, self.search_magnitudes)
+        grid = (_fibonacci_sphere(self.search_directions)[:, None, :]
+                * magnitudes[None, :, None]).reshape(-1, 3)
+        grid = np.concatenate([np.zeros((1, 3)), grid[rng.permutation(len(grid))]])
+        chunk = max(1, self.max_batch_pairs // len(rel_pos))
+        batches = [grid[i:i + chunk] for i in range(0, len(grid), chunk)]
+        
+        best, best_key, best_miss = None, np.inf, -np.inf
+        evaluated = 0
+        spread = 0.5
+        while True:
+            candidates = batches.pop(0) if batches else None
+            if candidates is None:
+                if spread < 1e-4:
+                    break
+                # Local refinement around the incumbent
+                scale = max(np.linalg.norm(best), 0.01)
+                candidates = best + rng.normal(0.0, spread * scale, (min(self.refine_samples, chunk), 3))
+                norm = np.linalg.norm(candidates, axis=1, keepdims=True)
+                candidates *= np.minimum(1.0, self.delta_v_capacity / np.maximum(norm, 1e-12))
+                spread *= 0.7
+            
+            miss = self.miss_distances(candidates, rel_pos, rel_vel)
+            margin = (miss / required).min(axis=1)
+            miss = miss.min(axis=1)
+            evaluated += len(candidates)
+            cost = np.linalg.norm(candidates, axis=1)
+            # Feasible burns rank by fuel; infeasible ones after, by worst-case
+            # miss as a fraction of the requirement
+            feasible = margin >= 1.0
+            key = np.where(feasible, cost, self.delta_v_capacity + 1.0 / (1.0 + margin))
+            i = int(np.argmin(key))
+            if key[i] < best_key:
+                best, best_key, best_miss = candidates[i], key[i], float(miss[i])
+            
+            if time.perf_counter() >= stop:
+                break
+        
+        return best, best_miss, evaluated, time.perf_counter() - start
 
 
 class Layer8_XAILogger:
-    """Layer 8: Explainable AI Logs - Generates interpretable logs"""
+    """Layer 8: Explainable AI Logs - Generates interpretable logs
     
-    def __init__(self):
-        self.logs = []
+    Every entry goes to the shared log, which keeps only the most recent
+    max_logs entries; the log_* methods also append it to an optional
+    per-run list, so concurrent runs can tell their entries apart.
+    """
+    
+    def __init__(self, max_logs: int = 1000):
+        self.logs = deque(maxlen=max_logs)
+    
+    def _append(self, phase: str, msg: str, logs: Optional[List[Dict]]) -> str:
+        entry = {'phase': phase, 'message': msg, 'timestamp': datetime.now().isoformat()}
+        self.logs.append(entry)
+        if logs is not None:
+            logs.append(entry)
+        return msg
         
-    def log_detection(self, objects: List[Dict]) -> str:
+    def log_detection(self, objects: List[Dict], logs: Optional[List[Dict]] = None) -> str:
         """Log detection phase"""
         msg = f"DETECTION: Identified {len(objects)} objects in sensor range"
-        self.logs.append({'phase': 'detection', 'message': msg, 'timestamp': datetime.now().isoformat()})
-        return msg
+        return self._append('detection', msg, logs)
     
-    def log_classification(self, objects: List[Dict]) -> str:
+    def log_classification(self, objects: List[Dict], logs: Optional[List[Dict]] = None) -> str:
         """Log classification phase"""
         debris_count = sum(1 for obj in objects if obj.get('classified_type') == 'debris')
         satellite_count = len(objects) - debris_count
         msg = f"CLASSIFICATION: {debris_count} debris, {satellite_count} satellites"
-        self.logs.append({'phase': 'classification', 'message': msg, 'timestamp': datetime.now().isoformat()})
-        return msg
+        return self._append('classification', msg, logs)
     
-    def log_risk(self, objects: List[Dict]) -> str:
+    def log_risk(self, objects: List[Dict], logs: Optional[List[Dict]] = None) -> str:
         """Log risk assessment"""
         risk_levels = [obj['risk_assessment']['level'] for obj in objects]
         critical = risk_levels.count('CRITICAL')
         high = risk_levels.count('HIGH')
         msg = f"RISK ASSESSMENT: {critical} CRITICAL, {high} HIGH risk objects"
-        self.logs.append({'phase': 'risk', 'message': msg, 'timestamp': datetime.now().isoformat()})
-        return msg
+        return self._append('risk', msg, logs)
     
-    def log_decision(self, decision: Dict) -> str:
+    def log_decision(self, decision: Dict, logs: Optional[List[Dict]] = None) -> str:
         """Log autonomous decision"""
         msg = f"DECISION: {decision['decision']} - {decision['reason']}"
-        self.logs.append({'phase': 'decision', 'message': msg, 'timestamp': datetime.now().isoformat()})
-        return msg
+        return self._append('decision', msg, logs)
     
-    def log_maneuver(self, maneuver: Dict) -> str:
+    def log_maneuver(self, maneuver: Dict, logs: Optional[List[Dict]] = None) -> str:
         """Log maneuver execution"""
         if maneuver['maneuver_type'] == 'NONE':
             msg = "MANEUVER: No maneuver required"
+        elif maneuver['maneuver_type'] == 'MONITOR':
+            msg = (f"MANEUVER: MONITOR - no burn needed, closest threat passes at "
+                   f"{maneuver['min_miss_distance']:.2f}km")
         else:
             msg = f"MANEUVER: {maneuver['maneuver_type']} - ΔV={maneuver['delta_v_magnitude']:.3f} km/s"
-        self.logs.append({'phase': 'maneuver', 'message': msg, 'timestamp': datetime.now().isoformat()})
-        return msg
+        return self._append('maneuver', msg, logs)
     
     def get_logs(self) -> List[Dict]:
-        """Return all logs"""
-        return self.logs
+        """Return a snapshot of the most recent logs"""
+        return list(self.logs)
     
     def generate_explanation(self, objects: List[Dict], decision: Dict, maneuver: Dict) -> str:
         """Generate human-readable explanation"""
@@ -352,7 +1635,11 @@ class Layer8_XAILogger:
         explanation += f"\nDecision: {decision['decision']}\n"
         explanation += f"Reasoning: {decision['reason']}\n"
         
-        if maneuver['maneuver_type'] != 'NONE':
+        if maneuver['maneuver_type'] == 'MONITOR':
+            explanation += f"\nManeuver Details:\n"
+            explanation += f"  - Type: MONITOR (no burn needed)\n"
+            explanation += f"  - Closest Threat Pass: {maneuver['min_miss_distance']:.2f}km\n"
+        elif maneuver['maneuver_type'] != 'NONE':
             explanation += f"\nManeuver Details:\n"
             explanation += f"  - Type: {maneuver['maneuver_type']}\n"
             explanation += f"  - Delta-V: {maneuver['delta_v_magnitude']:.3f} km/s\n"
@@ -363,122 +1650,311 @@ class Layer8_XAILogger:
 
 
 class Layer9_WebDashboard:
-    """Layer 9: Web Dashboard - Prepares data for visualization"""
+    """Layer 9: Web Dashboard - Prepares data for visualization
+    
+    Visualization payloads use server-side level of detail. MEDIUM and
+    higher risk objects are sent with their full trajectories; the LOW-risk
+    background is clustered to one point per occupied grid cell, with the
+    cell size set by the zoom. Detailed objects, background points, table
+    rows and log entries are all capped, so the payload size is bounded
+    whatever the catalog size or log length.
+    """
+    
+    DETAIL_LEVELS = ('CRITICAL', 'HIGH', 'MEDIUM')
+    # Never culled by the viewport
+    THREAT_LEVELS = ('CRITICAL', 'HIGH')
+    
+    def __init__(self, max_detailed_objects: int = 200, max_background_points: int = 2000,
+                 max_table_rows: int = 500, background_cell_size: float = 50.0,
+                 max_log_entries: int = 100):
+        self.max_detailed_objects = max_detailed_objects
+        self.max_background_points = max_background_points
+        self.max_table_rows = max_table_rows
+        self.max_log_entries = max_log_entries  # most recent entries sent
+        self.background_cell_size = background_cell_size  # km at zoom 1
     
     def prepare_dashboard_data(self, objects: List[Dict], decision: Dict, 
                               maneuver: Dict, logs: List[Dict], 
-                              spacecraft_pos: np.ndarray) -> Dict:
-        """Prepare comprehensive data for web dashboard"""
+                              spacecraft_pos: np.ndarray,
+                              viewport: Optional[Dict] = None,
+                              zoom: float = 1.0) -> Dict:
+        """Prepare comprehensive data for web dashboard
+        
+        Args:
+            viewport: Optional {'center': [x, y, z], 'radius': km}; objects
+                      outside it are left out of the visualization (CRITICAL
+                      and HIGH threats are always kept). Defaults to
+                      everything, centred on the spacecraft.
+            zoom: Background detail; cluster cells shrink as zoom grows
+        """
+        levels = [obj['risk_assessment']['level'] for obj in objects]
+        scores = np.fromiter((obj['risk_assessment']['score'] for obj in objects),
+                             dtype=float, count=len(objects))
         
         # Summary statistics
         summary = {
             'total_objects': len(objects),
-            'critical_objects': sum(1 for obj in objects if obj['risk_assessment']['level'] == 'CRITICAL'),
-            'high_risk_objects': sum(1 for obj in objects if obj['risk_assessment']['level'] == 'HIGH'),
+            'critical_objects': levels.count('CRITICAL'),
+            'high_risk_objects': levels.count('HIGH'),
             'decision': decision['decision'],
             'maneuver_required': decision['maneuver_required']
         }
         
-        # Object list for table
+        # Object list for table (highest risk first once over the cap)
+        listed = range(len(objects))
+        if len(objects) > self.max_table_rows:
+            listed = self._highest(scores, np.arange(len(objects)), self.max_table_rows)
+            summary['objects_listed'] = self.max_table_rows
         object_list = []
-        for obj in objects:
+        for i in listed:
+            obj = objects[i]
             object_list.append({
                 'id': obj['id'],
                 'type': obj.get('classified_type', 'unknown'),
                 'distance': obj['risk_assessment']['distance_at_closest'],
                 'risk_level': obj['risk_assessment']['level'],
-                'risk_score': obj['risk_assessment']['score']
+                'risk_score': obj['risk_assessment']['score'],
+                'collision_probability': obj['risk_assessment'].get('collision_probability')
             })
         
-        # 3D visualization data
-        visualization = {
-            'spacecraft': spacecraft_pos.tolist(),
-            'objects': [
-                {
-                    'id': obj['id'],
-                    'position': obj['position'],
-                    'velocity': obj['velocity'],
-                    'trajectory': obj.get('predicted_trajectory', []),
-                    'risk_level': obj['risk_assessment']['level']
-                }
-                for obj in objects
-            ]
-        }
-        
         return {
             'summary': summary,
             'objects': object_list,
-            'visualization': visualization,
+            'visualization': self.visualization(objects, levels, scores, spacecraft_pos,
+                                                viewport, zoom),
             'decision': decision,
             'maneuver': maneuver,
-            'logs': logs
+            'logs': list(logs)[-self.max_log_entries:]
         }
+    
+    def visualization(self, objects: List[Dict], levels: List[str], scores: np.ndarray,
+                      spacecraft_pos: np.ndarray, viewport: Optional[Dict] = None,
+                      zoom: float = 1.0) -> Dict:
+        """Level-of-detail 3D visualization data"""
+        n = len(objects)
+        positions = np.array([obj['position'] for obj in objects], dtype=float).reshape(n, 3)
+        detail = np.fromiter((level in self.DETAIL_LEVELS for level in levels), dtype=bool, count=n)
+        threat = np.fromiter((level in self.THREAT_LEVELS for level in levels), dtype=bool, count=n)
+        
+        viewport = viewport or {}
+        center = np.asarray(viewport.get('center', spacecraft_pos), dtype=float)
+        visible = np.ones(n, dtype=bool)
+        if viewport.get('radius') is not None:
+            radius = float(viewport['radius'])
+            visible = np.einsum('ij,ij->i', positions - center, positions - center) <= radius ** 2
+            visible |= threat
+        
+        # Full detail for the highest-risk MEDIUM+ objects, the rest join the background
+        detailed = np.flatnonzero(detail & visible)
+        if len(detailed) > self.max_detailed_objects:
+            detailed = self._highest(scores, detailed, self.max_detailed_objects)
+        background = visible.copy()
+        background[detailed] = False
+        
+        cell_size = self.background_cell_size / max(float(zoom), 1e-6)
+        points, counts, cell_size = self._cluster(positions[background], cell_size)
+        
+        return {
+            'spacecraft': np.asarray(spacecraft_pos).tolist(),
+            'objects': [
+                {
+                    'id': objects[i]['id'],
+                    'position': objects[i]['position'],
+                    'velocity': objects[i]['velocity'],
+                    'trajectory': objects[i].get('predicted_trajectory', []),
+                    'risk_level': levels[i]
+                }
+                for i in detailed.tolist()
+            ],
+            'background': {
+                'positions': points.tolist(),
+                'counts': counts.tolist(),
+                'cell_size': cell_size
+            },
+            'lod': {
+                'total_objects': n,
+                'in_view': int(np.count_nonzero(visible)),
+                'detailed': len(detailed),
+                'background_objects': int(np.count_nonzero(background)),
+                'background_points': len(counts),
+                'center': center.tolist(),
+                'zoom': float(zoom)
+            }
+        }
+    
+    def _cluster(self, positions: np.ndarray, cell_size: float) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Centroid and count per occupied grid cell, coarsened until under the point cap"""
+        if len(positions) <= self.max_background_points:
+            return positions, np.ones(len(positions), dtype=np.int64), 0.0
+        while True:
+            cells = np.floor(positions / cell_size).astype(np.int64)
+            _, inverse, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+            if len(counts) <= self.max_background_points:
+                break
+            cell_size *= 2.0
+        inverse = inverse.reshape(-1)
+        centroids = np.column_stack([
+            np.bincount(inverse, weights=positions[:, axis], minlength=len(counts))
+            for axis in range(3)
+        ]) / counts[:, None]
+        return centroids, counts, cell_size
+    
+    @staticmethod
+    def _highest(scores: np.ndarray, indices: np.ndarray, k: int) -> np.ndarray:
+        """The k indices with the highest scores, highest first"""
+        top = indices[np.argpartition(-scores[indices], k - 1)[:k]]
+        return top[np.argsort(-scores[top], kind='stable')]
+
+
+class EdgeCaseRule:
+    """Declarative edge-case rule
+    
+    predicate(context) returns either a boolean mask over the threat queue
+    (per_object=True) or a single bool. A per-object rule fires when at
+    least min_count objects match. The description is a format string
+    with {count}, {first_id} (highest-risk matching object) and the
+    context fields {delta_v}.
+    """
+    
+    def __init__(self, type: str, severity: str, description: str, mitigation: str,
+                 predicate: Callable, per_object: bool = True, min_count: int = 1):
+        self.type = type
+        self.severity = severity
+        self.description = description
+        self.mitigation = mitigation
+        self.predicate = predicate
+        self.per_object = per_object
+        self.min_count = min_count
+
+
+class EdgeCaseContext:
+    """Inputs visible to edge-case predicates
+    
+    threats is the Layer 6 ThreatQueue; its columns (score, distance,
+    time_to_closest, confidence, requires, high) are the catalog columns
+    that per-object rules are written against.
+    """
+    
+    def __init__(self, threats: ThreatQueue, decision: Dict, maneuver: Dict,
+                 spacecraft_pos: np.ndarray, max_conflict_objects: int):
+        self.threats = threats
+        self.decision = decision
+        self.maneuver = maneuver
+        self.spacecraft_pos = spacecraft_pos
+        self.delta_v = maneuver.get('delta_v_magnitude', 0)
+        self.max_conflict_objects = max_conflict_objects
+
+
+def opposing_threats(context: EdgeCaseContext, max_cos: float = -0.5) -> bool:
+    """Whether any two high-risk threats approach from opposing directions
+    
+    Uses the full pairwise matrix of line-of-sight unit vectors from the
+    spacecraft (up to max_conflict_objects highest-risk threats); a pair
+    opposes when the angle between them exceeds 120 degrees.
+    """
+    threats = context.threats
+    high_risk = threats.top_k(context.max_conflict_objects, threats.high)
+    if len(high_risk) < 2:
+        return False
+    offset = np.array([obj['position'] for obj in high_risk], dtype=float) - context.spacecraft_pos
+    norm = np.linalg.norm(offset, axis=1, keepdims=True)
+    directions = offset / np.maximum(norm, 1e-12)
+    return bool((directions @ directions.T).min() < max_cos)
+
+
+EDGE_CASE_RULES: List[EdgeCaseRule] = [
+    EdgeCaseRule('MULTIPLE_THREATS', 'HIGH',
+                 '{count} high-risk objects detected simultaneously',
+                 'Prioritizing highest risk object, recommend ground station consultation',
+                 lambda ctx: ctx.threats.high, min_count=4),
+    EdgeCaseRule('HIGH_DELTA_V', 'MEDIUM',
+                 'Maneuver requires {delta_v:.3f} km/s',
+                 'High fuel consumption, may impact mission objectives',
+                 lambda ctx: ctx.delta_v > 1.5, per_object=False),
+    EdgeCaseRule('TIME_CRITICAL', 'CRITICAL',
+                 'Object {first_id} approaching in <60 seconds',
+                 'Immediate maneuver execution required',
+                 lambda ctx: ctx.threats.time_to_closest < 60),
+    EdgeCaseRule('LOW_CONFIDENCE', 'LOW',
+                 '{count} objects with low classification confidence',
+                 'Applying conservative risk assessment',
+                 lambda ctx: ctx.threats.confidence < 0.7),
+    EdgeCaseRule('CONFLICTING_THREATS', 'CRITICAL',
+                 'Multiple threats from opposing directions',
+                 'Complex maneuver required, reduced success probability',
+                 lambda ctx: (ctx.decision['decision'] == 'EXECUTE_AVOIDANCE'
+                              and opposing_threats(ctx)), per_object=False),
+]
+
+
+def register_edge_case_rule(rule: EdgeCaseRule):
+    """Add a rule for every Layer10_EdgeCaseHandler created afterwards"""
+    EDGE_CASE_RULES.append(rule)
 
 
 class Layer10_EdgeCaseHandler:
-    """Layer 10: Edge Cases - Handles unusual scenarios"""
+    """Layer 10: Edge Cases - Handles unusual scenarios
+    
+    Edge cases are EdgeCaseRule objects evaluated against the threat queue.
+    Per-object predicates are array expressions over its columns, and their
+    masks are stacked and counted together, so no rule loops over objects.
+    Rules come from EDGE_CASE_RULES at construction; add_rule() extends a
+    single handler.
+    """
     
     def __init__(self):
         self.edge_cases = []
+        self.max_conflict_objects = 1024  # highest-risk objects checked pairwise for opposing threats
+        self.rules: List[EdgeCaseRule] = list(EDGE_CASE_RULES)
+    
+    def add_rule(self, rule: EdgeCaseRule):
+        self.rules.append(rule)
         
-    def check_edge_cases(self, objects: List[Dict], decision: Dict, 
-                        maneuver: Dict) -> List[Dict]:
-        """Check for and handle edge cases"""
-        edge_cases = []
-        
-        # Edge Case 1: Multiple simultaneous high-risk objects
-        high_risk = [obj for obj in objects if obj['risk_assessment']['level'] in ['CRITICAL', 'HIGH']]
-        if len(high_risk) > 3:
-            edge_cases.append({
-                'type': 'MULTIPLE_THREATS',
-                'severity': 'HIGH',
-                'description': f'{len(high_risk)} high-risk objects detected simultaneously',
-                'mitigation': 'Prioritizing highest risk object, recommend ground station consultation'
-            })
+    def check_edge_cases(self, objects: List[Dict], decision: Dict,
+                        maneuver: Dict, threats: Optional[ThreatQueue] = None,
+                        spacecraft_pos: Optional[np.ndarray] = None) -> List[Dict]:
+        """Check for and handle edge cases
         
-        # Edge Case 2: Insufficient delta-v for maneuver
-        if maneuver.get('delta_v_magnitude', 0) > 1.5:
-            edge_cases.append({
-                'type': 'HIGH_DELTA_V',
-                'severity': 'MEDIUM',
-                'description': f'Maneuver requires {maneuver["delta_v_magnitude"]:.3f} km/s',
-                'mitigation': 'High fuel consumption, may impact mission objectives'
-            })
+        threats is the Layer 6 threat queue; when given, counts and the
+        highest-risk objects come from it instead of rescanning objects.
+        spacecraft_pos is the reference for threat directions (frame origin
+        when omitted).
+        """
+        if threats is None:
+            threats = ThreatQueue()
+            threats.update(objects)
+        if spacecraft_pos is None:
+            spacecraft_pos = np.zeros(3)
+        context = EdgeCaseContext(threats, decision, maneuver,
+                                  np.asarray(spacecraft_pos, dtype=float), self.max_conflict_objects)
         
-        # Edge Case 3: Very close approach time
-        for obj in objects:
-            if obj['risk_assessment']['time_to_closest'] < 60:
-                edge_cases.append({
-                    'type': 'TIME_CRITICAL',
-                    'severity': 'CRITICAL',
-                    'description': f'Object {obj["id"]} approaching in <60 seconds',
-                    'mitigation': 'Immediate maneuver execution required'
-                })
-                break
+        object_rules = [rule for rule in self.rules if rule.per_object]
+        counts = np.zeros(len(object_rules), dtype=np.int64)
+        masks = np.zeros((len(object_rules), len(threats)), dtype=bool)
+        if object_rules and len(threats):
+            masks = np.stack([np.asarray(rule.predicate(context), dtype=bool)
+                              for rule in object_rules])
+            counts = np.count_nonzero(masks, axis=1)
+        object_results = dict(zip(map(id, object_rules), zip(counts.tolist(), masks)))
         
-        # Edge Case 4: Low confidence classification
-        low_conf = [obj for obj in objects if obj.get('classification_confidence', 1.0) < 0.7]
-        if low_conf:
+        edge_cases = []
+        for rule in self.rules:
+            fields = {'count': 0, 'first_id': None, 'delta_v': context.delta_v}
+            if rule.per_object:
+                count, mask = object_results[id(rule)]
+                if count < rule.min_count:
+                    continue
+                fields['count'] = count
+                fields['first_id'] = threats.top_k(1, mask)[0]['id']
+            elif not rule.predicate(context):
+                continue
             edge_cases.append({
-                'type': 'LOW_CONFIDENCE',
-                'severity': 'LOW',
-                'description': f'{len(low_conf)} objects with low classification confidence',
-                'mitigation': 'Applying conservative risk assessment'
+                'type': rule.type,
+                'severity': rule.severity,
+                'description': rule.description.format(**fields),
+                'mitigation': rule.mitigation
             })
         
-        # Edge Case 5: No maneuver possible (conflicting threats)
-        if len(high_risk) > 1 and decision['decision'] == 'EXECUTE_AVOIDANCE':
-            positions = [np.array(obj['position']) for obj in high_risk]
-            if len(positions) > 1:
-                vectors = [pos - positions[0] for pos in positions[1:]]
-                if any(np.dot(vectors[0], v) < 0 for v in vectors[1:]):
-                    edge_cases.append({
-                        'type': 'CONFLICTING_THREATS',
-                        'severity': 'CRITICAL',
-                        'description': 'Multiple threats from opposing directions',
-                        'mitigation': 'Complex maneuver required, reduced success probability'
-                    })
-        
         self.edge_cases = edge_cases
         return edge_cases
 
@@ -489,6 +1965,8 @@ class OrionEyeSystem:
     # LEO Impact Constants
     FUEL_COST_THRESHOLD = 50  # kg - threshold for mission impact assessment
     LEO_SUSTAINABILITY_SCORE = 0.85  # Base sustainability score
+    # Objects risk-scored per step of the deadline-aware (anytime) pipeline
+    ANYTIME_BATCH = 64
     
     def __init__(self):
         self.layer1 = Layer1_SpaceSensorSimulator()
@@ -501,76 +1979,156 @@ class OrionEyeSystem:
         self.layer8 = Layer8_XAILogger()
         self.layer9 = Layer9_WebDashboard()
         self.layer10 = Layer10_EdgeCaseHandler()
+        # Optional pipeline_replay.PipelineRecorder; records every process_objects
+        # input. Not thread-safe: only attach it to a single-threaded driver
+        self.recorder = None
         
-    def run_simulation(self, scenario: str = 'safe') -> Dict:
-        """Run complete ORION-EYE simulation"""
+    def run_simulation(self, scenario: str = 'safe', deadline: Optional[float] = None,
+                       on_provisional: Optional[Callable[[Dict], None]] = None,
+                       view: Optional[Dict] = None) -> Dict:
+        """Run complete ORION-EYE simulation
+        
+        Args:
+            scenario: Scenario name for Layer 1
+            deadline: Optional time budget in seconds; see process_objects
+            on_provisional: Optional callback for provisional decisions
+            view: Optional dashboard 'viewport' and 'zoom'; see process_objects
+        """
+        start = time.perf_counter()
         
         # Layer 1: Scan environment
         sensor_data = self.layer1.scan_environment(scenario)
         
         # Layer 2: Detect objects
-        detected_objects = self.layer2.detect_objects(sensor_data)
-        self.layer8.log_detection(detected_objects)
+        detected_objects = self.layer2.detect_objects(sensor_data,
+                                                      self.layer1.spacecraft_position,
+                                                      self.layer1.sensor_range)
+        
+        if deadline is not None:
+            deadline -= time.perf_counter() - start
+        return self.process_objects(detected_objects, scenario, deadline=deadline,
+                                    on_provisional=on_provisional, view=view)
+    
+    def process_objects(self, detected_objects: List[Dict], scenario: str = 'external',
+                        spacecraft_pos: Optional[np.ndarray] = None,
+                        deadline: Optional[float] = None,
+                        on_provisional: Optional[Callable[[Dict], None]] = None,
+                        view: Optional[Dict] = None) -> Dict:
+        """Run Layers 3-10 on already detected objects
+        
+        Entry point for detections that do not come from the Layer 1 sensor
+        simulation (e.g. camera tracks). Objects must carry 'id', 'position',
+        'velocity', 'size' and 'type'.
+        
+        With a deadline, risk scoring runs anytime-style: objects are scored
+        in order of closest approach, a provisional Layer 6 decision is made
+        as soon as the most threatening batch is scored, and it is refined
+        batch by batch while time remains. Objects left when the deadline
+        passes get the distance-based risk only (no collision probability).
+        The deadline also bounds the Layer 7 burn search; the other layers
+        always run to completion.
+        
+        Per-run state (the Layer 6 threat queue and this run's Layer 8
+        entries, returned as 'logs' and shown in dashboard_data) is local to
+        the call, so concurrent calls are safe unless a recorder is attached.
+        
+        Args:
+            detected_objects: Detected objects in ORION format
+            scenario: Label echoed back in the result
+            spacecraft_pos: Spacecraft position in the objects' frame
+                            (defaults to the Layer 1 spacecraft position)
+            deadline: Optional time budget in seconds for this call
+            on_provisional: Called with each provisional decision as soon as
+                            it is made (deadline mode only)
+            view: Optional Layer 9 level-of-detail settings, 'viewport'
+                  ({'center', 'radius'}) and 'zoom'
+        """
+        stop = None if deadline is None else time.perf_counter() + deadline
+        if spacecraft_pos is None:
+            spacecraft_pos = self.layer1.spacecraft_position
+        if self.recorder is not None:
+            self.recorder.record(detected_objects, scenario, spacecraft_pos, self.layer5.rng,
+                                 deadline=deadline)
+        
+        threats = ThreatQueue()
+        run_logs: List[Dict] = []
+        self.layer8.log_detection(detected_objects, run_logs)
         
         if not detected_objects:
-            return {
+            result = {
                 'scenario': scenario,
                 'result': 'NO_OBJECTS_DETECTED',
+                'logs': run_logs,
                 'dashboard_data': self.layer9.prepare_dashboard_data(
                     [], 
                     {'decision': 'MAINTAIN_COURSE', 'reason': 'Clear space', 'maneuver_required': False},
                     {'maneuver_type': 'NONE', 'delta_v': [0,0,0], 'burn_duration': 0, 'fuel_cost': 0},
-                    self.layer8.get_logs(),
-                    self.layer1.spacecraft_position
+                    run_logs,
+                    spacecraft_pos,
+                    **(view or {})
                 )
             }
+            if self.recorder is not None:
+                self.recorder.record_outcome(result)
+            return result
         
         # Layer 3: Classify objects
         classified_objects = self.layer3.classify_all(detected_objects)
-        self.layer8.log_classification(classified_objects)
+        self.layer8.log_classification(classified_objects, run_logs)
         
         # Layer 4: Predict trajectories
-        predicted_objects = self.layer4.predict_all(classified_objects, self.layer1.spacecraft_position)
-        
-        # Layer 5: Calculate risks
-        risk_assessed_objects = self.layer5.assess_all(predicted_objects)
-        self.layer8.log_risk(risk_assessed_objects)
+        predicted_objects = self.layer4.predict_all(classified_objects, spacecraft_pos)
         
-        # Layer 6: Make decision
-        decision = self.layer6.make_decision(risk_assessed_objects)
-        self.layer8.log_decision(decision)
+        # Layers 5-6: Calculate risks and make decision
+        provisional = None
+        if stop is None:
+            risk_assessed_objects = self.layer5.assess_all(predicted_objects, spacecraft_pos)
+            decision = self.layer6.make_decision(risk_assessed_objects, threats)
+        else:
+            risk_assessed_objects, decision, provisional = self._assess_anytime(
+                predicted_objects, spacecraft_pos, stop, threats, on_provisional)
+        self.layer8.log_risk(risk_assessed_objects, run_logs)
+        self.layer8.log_decision(decision, run_logs)
         
         # Layer 7: Calculate maneuver
-        maneuver = self.layer7.calculate_maneuver(decision, risk_assessed_objects, 
-                                                   self.layer1.spacecraft_position)
-        self.layer8.log_maneuver(maneuver)
+        maneuver = self.layer7.calculate_maneuver(decision, risk_assessed_objects, spacecraft_pos,
+                                                  deadline=stop, threats=threats,
+                                                  required_miss_distance=self.layer5.warning_distance)
+        self.layer8.log_maneuver(maneuver, run_logs)
         
         # Layer 8: Generate explanation
         explanation = self.layer8.generate_explanation(risk_assessed_objects, decision, maneuver)
         
         # Layer 10: Check edge cases
-        edge_cases = self.layer10.check_edge_cases(risk_assessed_objects, decision, maneuver)
+        edge_cases = self.layer10.check_edge_cases(risk_assessed_objects, decision, maneuver,
+                                                   threats=threats,
+                                                   spacecraft_pos=spacecraft_pos)
         
         # Layer 9: Prepare dashboard data
         dashboard_data = self.layer9.prepare_dashboard_data(
             risk_assessed_objects,
             decision,
             maneuver,
-            self.layer8.get_logs(),
-            self.layer1.spacecraft_position
+            run_logs,
+            spacecraft_pos,
+            **(view or {})
         )
         
         # Determine outcome
         if decision['decision'] == 'MAINTAIN_COURSE':
             outcome = 'SAFE_PASSAGE'
-        elif decision['maneuver_required'] and maneuver['success_probability'] > 0.8:
+        elif maneuver['maneuver_type'] == 'MONITOR' and maneuver['constraint_met']:
+            # Every threat already clears the Layer 7 miss requirement without a burn
+            outcome = 'SAFE_PASSAGE'
+        elif (decision['maneuver_required'] and maneuver['maneuver_type'] == 'AVOIDANCE_BURN'
+              and maneuver['success_probability'] > 0.8):
             outcome = 'AVOIDANCE_SUCCESSFUL'
         elif decision['maneuver_required'] and decision['risk_score'] > 0.9:
             outcome = 'COLLISION_IMMINENT'
         else:
             outcome = 'UNCERTAIN'
         
-        return {
+        result = {
             'scenario': scenario,
             'outcome': outcome,
             'objects': risk_assessed_objects,
@@ -579,8 +2137,62 @@ class OrionEyeSystem:
             'explanation': explanation,
             'edge_cases': edge_cases,
             'dashboard_data': dashboard_data,
+            'logs': run_logs,
             'leo_impact': self._calculate_leo_impact(risk_assessed_objects, maneuver)
         }
+        if provisional is not None:
+            result['anytime'] = provisional
+            result['anytime']['deadline_met'] = time.perf_counter() <= stop
+        if self.recorder is not None:
+            self.recorder.record_outcome(result)
+        return result
+    
+    def _assess_anytime(self, objects: List[Dict], spacecraft_pos: np.ndarray, stop: float,
+                        threats: ThreatQueue,
+                        on_provisional: Optional[Callable[[Dict], None]] = None
+                        ) -> Tuple[List[Dict], Dict, Dict]:
+        """Score risk in descending-threat order until stop, refining the decision
+        
+        threats is the run's (empty) queue; it holds every object on return.
+        
+        Returns:
+            (risk-assessed objects in threat order, final decision, progress report
+             with the provisional decisions made along the way)
+        """
+        start = time.perf_counter()
+        distance = np.array([obj['closest_approach']['distance'] for obj in objects])
+        ordered = [objects[i] for i in np.argsort(distance, kind='stable').tolist()]
+        
+        provisional = []
+        scored = 0
+        decision = None
+        while scored < len(ordered) and (decision is None or time.perf_counter() < stop):
+            batch = ordered[scored:scored + self.ANYTIME_BATCH]
+            self.layer5.assess_all(batch, spacecraft_pos)
+            scored += len(batch)
+            threats.update(batch)
+            decision = self.layer6.decide(threats)
+            provisional.append({
+                'decision': decision['decision'],
+                'primary_threat': decision.get('primary_threat'),
+                'objects_scored': scored,
+                'elapsed_ms': (time.perf_counter() - start) * 1000
+            })
+            if on_provisional is not None:
+                on_provisional(dict(decision, objects_scored=scored))
+        
+        # Past the deadline: distance-based risk only for the rest
+        for obj in ordered[scored:]:
+            self.layer5.calculate_risk(obj)
+        if scored < len(ordered):
+            threats.update(ordered[scored:])
+            decision = self.layer6.decide(threats)
+        
+        return ordered, decision, {
+            'provisional_decisions': provisional,
+            'objects_fully_assessed': scored,
+            'objects_total': len(ordered)
+        }
     
     def _calculate_leo_impact(self, objects: List[Dict], maneuver: Dict) -> Dict:
         """Calculate impact on LEO environment"""
@@ -589,7 +2201,7 @@ class OrionEyeSystem:
         
         impact = {
             'debris_encountered': debris_count,
-            'collision_avoided': maneuver['maneuver_type'] != 'NONE',
+            'collision_avoided': maneuver['maneuver_type'] == 'AVOIDANCE_BURN',
             'fuel_consumed': fuel_cost,
             'orbital_debris_contribution': 0,  # No debris created by avoidance
             'mission_impact': 'MINIMAL' if fuel_cost < self.FUEL_COST_THRESHOLD else 'MODERATE',
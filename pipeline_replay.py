@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+ORION-EYE Record and Replay
+Snapshots the detected objects and RNG state of every pipeline cycle to
+memory-mappable .npy segments and feeds them back through OrionEyeSystem
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+# Cycles buffered in memory before a segment is written
+DEFAULT_SEGMENT_CYCLES = 256
+
+# Per-object arrays of a segment, concatenated over its cycles
+OBJECT_ARRAYS = ('ids', 'types', 'positions', 'velocities', 'sizes', 'confidence')
+
+
+class PipelineRecorder:
+    """Records the input of every process_objects call
+
+    Attach with OrionEyeSystem.recorder = PipelineRecorder(directory). Each
+    cycle stores the detected objects (as arrays), the spacecraft position,
+    the legacy NumPy RNG state used by Layers 2-3 and the Layer 5 Generator
+    state, so a replay reproduces the cycle's decision. Cycles are buffered
+    and written in segments of segment_cycles:
+
+        segment_NNNNN/<array>.npy  objects of all cycles, row-concatenated
+        segment_NNNNN/offsets.npy  first object row of each cycle (+ end)
+        segment_NNNNN/mt_keys.npy  (cycles, 624) MT19937 keys
+        segment_NNNNN/cycles.json  per-cycle scenario, deadline, RNG positions,
+                                   timestamp and recorded outcome
+
+    Segments load with np.load(mmap_mode='r'), so replay reads each cycle
+    as slices of the mapped files. Recording into a directory that already
+    holds segments appends after them instead of overwriting the first ones.
+    """
+
+    def __init__(self, directory: str, segment_cycles: int = DEFAULT_SEGMENT_CYCLES):
+        self.directory = directory
+        self.segment_cycles = segment_cycles
+        self.cycles = 0
+        os.makedirs(directory, exist_ok=True)
+        # Next segment number; continues after any existing segments
+        self.segments = max((int(name[len('segment_'):]) for name in os.listdir(directory)
+                             if name.startswith('segment_') and name[len('segment_'):].isdigit()),
+                            default=-1) + 1
+        self._reset()
+
+    def record(self, objects: List[Dict], scenario: str, spacecraft_pos: np.ndarray,
+               rng: np.random.Generator, deadline: Optional[float] = None):
+        """Snapshot one cycle's input before the pipeline modifies it"""
+        n = len(objects)
+        self._arrays['ids'].append(np.array([str(obj['id']) for obj in objects], dtype=str))
+        self._arrays['types'].append(np.array([str(obj.get('type', 'debris')) for obj in objects],
+                                              dtype=str))
+        self._arrays['positions'].append(
+            np.array([obj['position'] for obj in objects], dtype=float).reshape(n, 3))
+        self._arrays['velocities'].append(
+            np.array([obj['velocity'] for obj in objects], dtype=float).reshape(n, 3))
+        self._arrays['sizes'].append(
+            np.fromiter((obj.get('size', 0.0) for obj in objects), dtype=float, count=n))
+        self._arrays['confidence'].append(
+            np.fromiter((obj.get('detection_confidence', 1.0) for obj in objects),
+                        dtype=float, count=n))
+
+        _, key, pos, has_gauss, cached_gaussian = np.random.get_state()
+        self._mt_keys.append(key.copy())
+        self._cycles.append({
+            'scenario': scenario,
+            'deadline': deadline,
+            'spacecraft_pos': np.asarray(spacecraft_pos, dtype=float).tolist(),
+            'timestamp': objects[0]['timestamp'] if n and 'timestamp' in objects[0] else None,
+            'mt_pos': int(pos),
+            'mt_gauss': [int(has_gauss), float(cached_gaussian)],
+            'rng_state': _json_state(rng.bit_generator.state),
+            'outcome': None,
+            'decision': None
+        })
+
+    def record_outcome(self, result: Dict):
+        """Attach the pipeline outcome to the last recorded cycle"""
+        if not self._cycles:
+            return
+        self._cycles[-1]['outcome'] = result.get('outcome', result.get('result'))
+        self._cycles[-1]['decision'] = (result.get('decision') or {}).get('decision')
+        if len(self._cycles) >= self.segment_cycles:
+            self.flush()
+
+    def flush(self):
+        """Write buffered cycles as a new segment"""
+        if not self._cycles:
+            return
+        path = os.path.join(self.directory, f'segment_{self.segments:05d}')
+        os.makedirs(path, exist_ok=True)
+        counts = [len(ids) for ids in self._arrays['ids']]
+        np.save(os.path.join(path, 'offsets.npy'), np.concatenate([[0], np.cumsum(counts)]).astype(np.int64))
+        for name in OBJECT_ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), np.concatenate(self._arrays[name]))
+        np.save(os.path.join(path, 'mt_keys.npy'), np.stack(self._mt_keys).astype(np.uint32))
+        with open(os.path.join(path, 'cycles.json'), 'w') as f:
+            json.dump(self._cycles, f)
+        self.segments += 1
+        self.cycles += len(self._cycles)
+        self._reset()
+
+    def close(self):
+        self.flush()
+
+    def _reset(self):
+        self._arrays: Dict[str, List[np.ndarray]] = {name: [] for name in OBJECT_ARRAYS}
+        self._mt_keys: List[np.ndarray] = []
+        self._cycles: List[Dict] = []
+
+
+def _json_state(state):
+    """Bit generator state with large ints as strings (JSON-safe)"""
+    if isinstance(state, dict):
+        return {key: _json_state(value) for key, value in state.items()}
+    if isinstance(state, int) and abs(state) >= 2 ** 53:
+        return str(state)
+    return state
+
+
+def _restore_state(state, template):
+    if isinstance(template, dict):
+        return {key: _restore_state(state[key], value) for key, value in template.items()}
+    if isinstance(template, int):
+        return int(state)
+    return state
+
+
+def load_cycles(directory: str) -> Iterator[Dict]:
+    """Yield recorded cycles in order, objects sliced from memory-mapped segments"""
+    segments = sorted(name for name in os.listdir(directory) if name.startswith('segment_'))
+    for segment in segments:
+        path = os.path.join(directory, segment)
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                  for name in OBJECT_ARRAYS + ('offsets', 'mt_keys')}
+        with open(os.path.join(path, 'cycles.json')) as f:
+            cycles = json.load(f)
+        offsets = arrays['offsets']
+        for k, meta in enumerate(cycles):
+            rows = slice(int(offsets[k]), int(offsets[k + 1]))
+            cycle = dict(meta)
+            cycle['mt_key'] = arrays['mt_keys'][k]
+            for name in OBJECT_ARRAYS:
+                cycle[name] = arrays[name][rows]
+            yield cycle
+
+
+def cycle_objects(cycle: Dict) -> List[Dict]:
+    """Rebuild the ORION-format objects of a recorded cycle"""
+    timestamp = cycle['timestamp']
+    return [
+        {'id': oid, 'type': kind, 'position': position, 'velocity': velocity,
+         'size': size, 'detection_confidence': confidence, 'timestamp': timestamp}
+        for oid, kind, position, velocity, size, confidence in zip(
+            cycle['ids'].tolist(), cycle['types'].tolist(), cycle['positions'].tolist(),
+            cycle['velocities'].tolist(), cycle['sizes'].tolist(), cycle['confidence'].tolist())
+    ]
+
+
+def replay(directory: str, system=None,
+           on_result: Optional[Callable[[Dict, Dict], None]] = None) -> Dict:
+    """Feed a recording back through OrionEyeSystem.process_objects, back to back
+
+    RNG states are restored before every cycle, so each replayed decision
+    matches the recording unless the code under test changed it (or a
+    wall-clock budget such as the Layer 7 burn search cut work short).
+
+    Returns:
+        Cycle count, timing percentiles and the cycles whose outcome or
+        decision differs from the recording
+    """
+    if system is None:
+        from orion_eye import OrionEyeSystem
+        system = OrionEyeSystem()
+    generator_template = system.layer5.rng.bit_generator.state
+
+    elapsed_ms = []
+    mismatches = []
+    start = time.perf_counter()
+    for index, cycle in enumerate(load_cycles(directory)):
+        objects = cycle_objects(cycle)
+        np.random.set_state(('MT19937', np.array(cycle['mt_key'], dtype=np.uint32), cycle['mt_pos'],
+                             *cycle['mt_gauss']))
+        system.layer5.rng.bit_generator.state = _restore_state(cycle['rng_state'], generator_template)
+
+        t0 = time.perf_counter()
+        result = system.process_objects(objects, cycle['scenario'],
+                                        spacecraft_pos=np.array(cycle['spacecraft_pos']),
+                                        deadline=cycle['deadline'])
+        elapsed_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        outcome = result.get('outcome', result.get('result'))
+        decision = result.get('decision', {}).get('decision')
+        if cycle['outcome'] is not None and (outcome, decision) != (cycle['outcome'], cycle['decision']):
+            mismatches.append({'cycle': index, 'recorded': [cycle['outcome'], cycle['decision']],
+                               'replayed': [outcome, decision]})
+        if on_result:
+            on_result(cycle, result)
+
+    total = time.perf_counter() - start
+    times = np.array(elapsed_ms) if elapsed_ms else np.zeros(1)
+    return {
+        'cycles': len(elapsed_ms),
+        'total_s': total,
+        'cycles_per_s': len(elapsed_ms) / total if total > 0 else 0.0,
+        'p50_ms': float(np.percentile(times, 50)),
+        'p95_ms': float(np.percentile(times, 95)),
+        'max_ms': float(times.max()),
+        'mismatches': mismatches
+    }
+
+
+def record(directory: str, scenario: str, cycles: int, seed: Optional[int] = None,
+           segment_cycles: int = DEFAULT_SEGMENT_CYCLES) -> int:
+    """Run scenario `cycles` times with a recorder attached; returns cycles written"""
+    from orion_eye import OrionEyeSystem
+    if seed is not None:
+        np.random.seed(seed)
+    system = OrionEyeSystem()
+    if seed is not None:
+        system.layer5.rng = np.random.default_rng(seed)
+    recorder = PipelineRecorder(directory, segment_cycles)
+    system.recorder = recorder
+    for _ in range(cycles):
+        system.run_simulation(scenario)
+    recorder.close()
+    return recorder.cycles
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Record and replay ORION-EYE pipeline inputs')
+    commands = parser.add_subparsers(dest='command', required=True)
+    rec = commands.add_parser('record', help='Run a scenario repeatedly and record every cycle')
+    rec.add_argument('directory')
+    rec.add_argument('--scenario', default='multi')
+    rec.add_argument('--cycles', type=int, default=100)
+    rec.add_argument('--seed', type=int)
+    rec.add_argument('--segment-cycles', type=int, default=DEFAULT_SEGMENT_CYCLES)
+    rep = commands.add_parser('replay', help='Replay a recording as fast as possible')
+    rep.add_argument('directory')
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        written = record(args.directory, args.scenario, args.cycles, args.seed, args.segment_cycles)
+        print(f"Recorded {written} '{args.scenario}' cycles to {args.directory}/")
+        return
+
+    stats = replay(args.directory)
+    print(f"Replayed {stats['cycles']} cycles in {stats['total_s']:.2f} s "
+          f"({stats['cycles_per_s']:.0f} cycles/s)")
+    print(f"  per cycle: p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, "
+          f"max {stats['max_ms']:.2f} ms")
+    if stats['mismatches']:
+        print(f"  {len(stats['mismatches'])} cycle(s) differ from the recording:")
+        for mismatch in stats['mismatches'][:10]:
+            print(f"    cycle {mismatch['cycle']}: recorded {mismatch['recorded']}, "
+                  f"replayed {mismatch['replayed']}")
+    else:
+        print("  all outcomes and decisions match the recording")
+
+
+if __name__ == '__main__':
+    main()
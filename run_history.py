@@ -0,0 +1,238 @@
+"""
+ORION-EYE Run History
+SQLite store of simulation runs, written off the request path by a
+background thread and queried with keyset pagination
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
+
+# Default path - can be overridden via environment variable ORION_HISTORY_DB
+HISTORY_PATH = os.environ.get('ORION_HISTORY_DB', 'orion_history.db')
+
+# Runs waiting for the writer before new ones are dropped
+MAX_QUEUED_RUNS = 256
+# Runs written per transaction when the writer has a backlog
+WRITE_BATCH = 32
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    scenario TEXT,
+    outcome TEXT,
+    decision TEXT,
+    risk_score REAL,
+    maneuver_type TEXT,
+    fuel_cost REAL,
+    object_count INTEGER,
+    decision_json TEXT,
+    maneuver_json TEXT,
+    edge_cases_json TEXT,
+    explanation TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+CREATE INDEX IF NOT EXISTS runs_outcome ON runs (outcome, created_at);
+
+CREATE TABLE IF NOT EXISTS run_objects (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    object_id TEXT NOT NULL,
+    type TEXT,
+    risk_level TEXT,
+    risk_score REAL,
+    distance REAL,
+    time_to_closest REAL
+);
+CREATE INDEX IF NOT EXISTS run_objects_run ON run_objects (run_id);
+CREATE INDEX IF NOT EXISTS run_objects_object ON run_objects (object_id, run_id);
+
+CREATE TABLE IF NOT EXISTS run_logs (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    seq INTEGER NOT NULL,
+    phase TEXT,
+    message TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS run_logs_run ON run_logs (run_id, seq);
+"""
+
+RUN_COLUMNS = ('id', 'created_at', 'scenario', 'outcome', 'decision', 'risk_score',
+               'maneuver_type', 'fuel_cost', 'object_count')
+
+
+class HistoryQueueFull(Exception):
+    """Raised when the history writer cannot accept another run"""
+
+
+class RunHistory:
+    """Persistent store of simulation runs
+
+    record() only queues the result; a single writer thread owns the write
+    connection and commits queued runs in batches. Readers open their own
+    connection (WAL mode), so queries never wait for the writer and the
+    writer never waits for queries.
+    """
+
+    def __init__(self, path: str = HISTORY_PATH, max_queue: int = MAX_QUEUED_RUNS):
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        with closing(self._connect()) as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+            db.commit()
+        self._writer = threading.Thread(target=self._run, name='run-history', daemon=True)
+        self._writer.start()
+
+    def record(self, result: Dict, created_at: Optional[float] = None,
+               logs: Optional[List[Dict]] = None):
+        """Queue a run_simulation result (native Python types) for writing
+
+        logs are the run's own Layer 8 entries; none are stored when omitted.
+        """
+        created_at = time.time() if created_at is None else created_at
+        try:
+            self._queue.put_nowait((created_at, dict(result), list(logs or [])))
+        except queue.Full:
+            self.dropped += 1
+            raise HistoryQueueFull('Run history queue is full')
+
+    def flush(self):
+        """Block until every queued run has been written"""
+        self._queue.join()
+
+    def runs(self, since: Optional[float] = None, until: Optional[float] = None,
+             outcome: Optional[str] = None, object_id: Optional[str] = None,
+             before: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """One page of run summaries, newest first
+
+        Filters are combined. Pass the returned 'next_before' as before to
+        fetch the following page; it is None on the last page.
+        """
+        where, params = [], []
+        if since is not None:
+            where.append('created_at >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('created_at < ?')
+            params.append(until)
+        if outcome:
+            where.append('outcome = ?')
+            params.append(outcome)
+        if object_id:
+            where.append('id IN (SELECT run_id FROM run_objects WHERE object_id = ?)')
+            params.append(object_id)
+        if before is not None:
+            where.append('id < ?')
+            params.append(before)
+        limit = _page_size(limit)
+
+        sql = f"SELECT {', '.join(RUN_COLUMNS)} FROM runs"
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY id DESC LIMIT ?'
+        with closing(self._connect()) as db:
+            rows = db.execute(sql, params + [limit + 1]).fetchall()
+        page = [dict(zip(RUN_COLUMNS, row)) for row in rows[:limit]]
+        return {'runs': page, 'next_before': page[-1]['id'] if len(rows) > limit else None}
+
+    def run(self, run_id: int) -> Optional[Dict]:
+        """Full record of one run: decision, maneuver, edge cases, explanation, logs"""
+        with closing(self._connect()) as db:
+            row = db.execute(
+                f"SELECT {', '.join(RUN_COLUMNS)}, decision_json, maneuver_json, "
+                "edge_cases_json, explanation FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            logs = db.execute('SELECT phase, message, timestamp FROM run_logs '
+                              'WHERE run_id = ? ORDER BY seq', (run_id,)).fetchall()
+        run = dict(zip(RUN_COLUMNS, row))
+        n = len(RUN_COLUMNS)
+        run['decision'] = json.loads(row[n]) if row[n] else None
+        run['maneuver'] = json.loads(row[n + 1]) if row[n + 1] else None
+        run['edge_cases'] = json.loads(row[n + 2]) if row[n + 2] else []
+        run['explanation'] = row[n + 3]
+        run['logs'] = [{'phase': p, 'message': m, 'timestamp': t} for p, m, t in logs]
+        return run
+
+    def objects(self, run_id: int, after: Optional[int] = None,
+                limit: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """One page of a run's objects; pass 'next_after' back as after"""
+        limit = _page_size(limit)
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                'SELECT rowid, object_id, type, risk_level, risk_score, distance, time_to_closest '
+                'FROM run_objects WHERE run_id = ? AND rowid > ? ORDER BY rowid LIMIT ?',
+                (run_id, after or 0, limit + 1)).fetchall()
+        page = rows[:limit]
+        return {
+            'objects': [
+                {'id': oid, 'type': kind, 'risk_level': level, 'risk_score': score,
+                 'distance': distance, 'time_to_closest': ttc}
+                for _, oid, kind, level, score, distance, ttc in page
+            ],
+            'next_after': page[-1][0] if len(rows) > limit else None
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _run(self):
+        db = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with db:
+                    for created_at, result, logs in batch:
+                        _insert_run(db, created_at, result, logs)
+            except sqlite3.Error as e:
+                print(f'Run history write failed: {e}')
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+def _page_size(limit) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def _insert_run(db: sqlite3.Connection, created_at: float, result: Dict, logs: List[Dict]):
+    decision = result.get('decision') or {}
+    maneuver = result.get('maneuver') or {}
+    objects = result.get('objects') or []
+    cursor = db.execute(
+        'INSERT INTO runs (created_at, scenario, outcome, decision, risk_score, maneuver_type, '
+        'fuel_cost, object_count, decision_json, maneuver_json, edge_cases_json, explanation) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (created_at, result.get('scenario'), result.get('outcome', result.get('result')),
+         decision.get('decision'), decision.get('risk_score'), maneuver.get('maneuver_type'),
+         maneuver.get('fuel_cost'), len(objects), json.dumps(decision), json.dumps(maneuver),
+         json.dumps(result.get('edge_cases', [])), result.get('explanation')))
+    run_id = cursor.lastrowid
+
+    db.executemany(
+        'INSERT INTO run_objects (run_id, object_id, type, risk_level, risk_score, distance, '
+        'time_to_closest) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        ((run_id, str(obj['id']), obj.get('classified_type', obj.get('type')),
+          obj.get('risk_assessment', {}).get('level'), obj.get('risk_assessment', {}).get('score'),
+          obj.get('risk_assessment', {}).get('distance_at_closest'),
+          obj.get('risk_assessment', {}).get('time_to_closest'))
+         for obj in objects))
+
+    db.executemany(
+        'INSERT INTO run_logs (run_id, seq, phase, message, timestamp) VALUES (?, ?, ?, ?, ?)',
+        ((run_id, seq, log.get('phase'), log.get('message'), log.get('timestamp'))
+         for seq, log in enumerate(logs)))
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+ORION-EYE Scenario Sweep
+Runs grids of simulation parameters across a process pool and streams
+per-run results to columnar .npy files plus aggregated outcome statistics
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# Sweepable parameters -> (layer attribute, attribute name) on OrionEyeSystem
+SYSTEM_PARAMETERS = {
+    'safe_distance': ('layer5', 'safe_distance'),
+    'warning_distance': ('layer5', 'warning_distance'),
+    'delta_v_capacity': ('layer7', 'delta_v_capacity'),
+}
+# Other grid keys: 'scenario' (Layer 1 scenario name) and 'num_objects'
+# (size of a random debris field; replaces the scenario's own objects)
+RUN_PARAMETERS = ('scenario', 'num_objects')
+
+OUTCOMES = ('SAFE_PASSAGE', 'AVOIDANCE_SUCCESSFUL', 'COLLISION_IMMINENT',
+            'UNCERTAIN', 'NO_OBJECTS_DETECTED')
+
+# Per-run columns written to <output>/<name>.npy
+COLUMNS = (
+    ('run', np.int64),
+    ('group', np.int32),
+    ('seed', np.int64),
+    ('outcome', np.int8),            # index into OUTCOMES
+    ('objects_detected', np.int32),
+    ('critical_objects', np.int32),
+    ('high_risk_objects', np.int32),
+    ('max_risk_score', np.float64),
+    ('fuel_cost', np.float64),       # kg
+    ('delta_v', np.float64),         # km/s
+    ('min_miss_distance', np.float64),  # km (NaN without a maneuver)
+    ('edge_cases', np.int16),
+    ('elapsed_ms', np.float64),
+)
+
+# Fuel histogram per parameter group (kg); the last bin collects overflow
+FUEL_BINS = np.linspace(0.0, 500.0, 51)
+
+# Simulations per task sent to a worker, and tasks in flight per worker
+DEFAULT_CHUNK_SIZE = 32
+TASKS_IN_FLIGHT_PER_WORKER = 2
+# Rows buffered before they are appended to the column files
+DEFAULT_FLUSH_ROWS = 4096
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    """Cartesian product of a parameter grid, one dict per combination"""
+    unknown = set(grid) - set(SYSTEM_PARAMETERS) - set(RUN_PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unknown sweep parameters: {sorted(unknown)}')
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+class NpyColumnWriter:
+    """Append-only 1-D .npy file
+
+    The header is written with a fixed width and rewritten with the final
+    length on close, so rows stream to disk and the result loads with
+    np.load(..., mmap_mode='r').
+    """
+
+    HEADER_BYTES = 128
+
+    def __init__(self, path: str, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def append(self, values: np.ndarray):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self._file.write(values.tobytes())
+        self.length += len(values)
+
+    def close(self):
+        self._write_header()
+        self._file.close()
+
+    def _write_header(self):
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype),
+                       'fortran_order': False, 'shape': (self.length,)})
+        # magic (6) + version (2) + header length (2) + header, newline-terminated
+        body = header.ljust(self.HEADER_BYTES - 10 - 1) + '\n'
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(b'\x93NUMPY\x01\x00' + len(body).to_bytes(2, 'little') + body.encode('latin1'))
+        if position:
+            self._file.seek(position)
+
+
+class SweepStatistics:
+    """Streaming outcome counts and fuel statistics per parameter group
+
+    Memory is fixed per group (counters and a histogram), whatever the
+    number of runs.
+    """
+
+    def __init__(self, groups: List[Dict]):
+        self.groups = groups
+        n = len(groups)
+        self.runs = np.zeros(n, dtype=np.int64)
+        self.outcomes = np.zeros((n, len(OUTCOMES)), dtype=np.int64)
+        self.fuel_sum = np.zeros(n)
+        self.fuel_max = np.zeros(n)
+        self.fuel_hist = np.zeros((n, len(FUEL_BINS)), dtype=np.int64)
+        self.elapsed_ms = np.zeros(n)
+
+    def add(self, rows: Dict[str, np.ndarray]):
+        group = rows['group']
+        fuel = rows['fuel_cost']
+        np.add.at(self.runs, group, 1)
+        np.add.at(self.outcomes, (group, rows['outcome']), 1)
+        np.add.at(self.fuel_sum, group, fuel)
+        np.maximum.at(self.fuel_max, group, fuel)
+        bins = np.minimum(np.searchsorted(FUEL_BINS, fuel, side='right') - 1, len(FUEL_BINS) - 1)
+        np.add.at(self.fuel_hist, (group, bins), 1)
+        np.add.at(self.elapsed_ms, group, rows['elapsed_ms'])
+
+    def fuel_quantile(self, group: int, q: float) -> float:
+        """Quantile of fuel cost from the histogram (lower bin edge)"""
+        counts = self.fuel_hist[group]
+        if not counts.sum():
+            return 0.0
+        k = np.searchsorted(np.cumsum(counts), q * counts.sum())
+        return float(FUEL_BINS[min(k, len(FUEL_BINS) - 1)])
+
+    def summary(self) -> List[Dict]:
+        summary = []
+        for g, params in enumerate(self.groups):
+            runs = int(self.runs[g])
+            scale = 1.0 / max(runs, 1)
+            summary.append({
+                'group': g,
+                'parameters': params,
+                'runs': runs,
+                'outcome_rates': {name: float(self.outcomes[g, k] * scale)
+                                  for k, name in enumerate(OUTCOMES)},
+                'fuel': {
+                    'mean': float(self.fuel_sum[g] * scale),
+                    'max': float(self.fuel_max[g]),
+                    'p50': self.fuel_quantile(g, 0.5),
+                    'p95': self.fuel_quantile(g, 0.95),
+                    'histogram': self.fuel_hist[g].tolist()
+                },
+                'mean_elapsed_ms': float(self.elapsed_ms[g] * scale)
+            })
+        return summary
+
+
+# Worker-side system, created once per process by _init_worker
+_worker_system = None
+_worker_defaults: Dict[str, float] = {}
+
+
+def _init_worker():
+    global _worker_system
+    from orion_eye import OrionEyeSystem
+    _worker_system = OrionEyeSystem()
+    for key, (layer, attribute) in SYSTEM_PARAMETERS.items():
+        _worker_defaults[key] = getattr(getattr(_worker_system, layer), attribute)
+
+
+def _run_one(params: Dict, seed: int) -> tuple:
+    """One simulation with the given parameters; returns a row of COLUMNS[3:]"""
+    system = _worker_system
+    for key, (layer, attribute) in SYSTEM_PARAMETERS.items():
+        setattr(getattr(system, layer), attribute, params.get(key, _worker_defaults[key]))
+    np.random.seed(seed)
+    system.layer5.rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    scenario = params.get('scenario', 'safe')
+    if params.get('num_objects') is None:
+        result = system.run_simulation(scenario)
+    else:
+        layer1 = system.layer1
+        objects = layer1.generate_debris_field(int(params['num_objects']))
+        if objects:
+            visible = layer1.in_view([obj['position'] for obj in objects])
+            objects = [obj for obj, seen in zip(objects, visible.tolist()) if seen]
+        detected = system.layer2.detect_objects(objects, layer1.spacecraft_position,
+                                                layer1.sensor_range)
+        result = system.process_objects(detected, scenario)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    summary = result['dashboard_data']['summary']
+    maneuver = result['dashboard_data']['maneuver']
+    objects = result.get('objects', [])
+    return (
+        OUTCOMES.index(result.get('outcome', result.get('result'))),
+        summary['total_objects'],
+        summary['critical_objects'],
+        summary['high_risk_objects'],
+        max((obj['risk_assessment']['score'] for obj in objects), default=0.0),
+        float(maneuver.get('fuel_cost', 0.0)),
+        float(maneuver.get('delta_v_magnitude', 0.0)),
+        float(maneuver.get('min_miss_distance', np.nan)),
+        len(result.get('edge_cases', [])),
+        elapsed_ms,
+    )
+
+
+def _run_chunk(tasks: List[tuple]) -> List[tuple]:
+    """Run (run, group, seed, params) tasks; returns full COLUMNS rows"""
+    return [(run, group, seed) + _run_one(params, seed) for run, group, seed, params in tasks]
+
+
+def run_sweep(grid: Dict[str, Sequence], seeds: Sequence[int], output_dir: str,
+              workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              flush_rows: int = DEFAULT_FLUSH_ROWS,
+              on_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """Run every grid combination once per seed across a process pool
+
+    Tasks are generated lazily and at most TASKS_IN_FLIGHT_PER_WORKER
+    chunks per worker are outstanding, so memory is bounded by the flush
+    buffer and the per-group statistics, not by the number of runs.
+
+    Writes to output_dir:
+        <column>.npy: one value per run (see COLUMNS), in completion order
+        summary.json: parameter groups, outcome rates and fuel statistics;
+                      rewritten after every flush while the sweep runs
+
+    Returns:
+        The final summary.json content
+    """
+    groups = expand_grid(grid)
+    seeds = list(seeds)
+    total = len(groups) * len(seeds)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+
+    writers = {name: NpyColumnWriter(os.path.join(output_dir, f'{name}.npy'), dtype)
+               for name, dtype in COLUMNS}
+    stats = SweepStatistics(groups)
+    buffer: List[tuple] = []
+    done = 0
+    start = time.perf_counter()
+
+    def report(final: bool = False) -> Dict:
+        summary = {
+            'complete': final,
+            'runs_completed': done,
+            'runs_total': total,
+            'elapsed_s': time.perf_counter() - start,
+            'outcomes': list(OUTCOMES),
+            'fuel_bins': FUEL_BINS.tolist(),
+            'columns': [name for name, _ in COLUMNS],
+            'groups': stats.summary()
+        }
+        path = os.path.join(output_dir, 'summary.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(summary, f, indent=2)
+        os.replace(path + '.tmp', path)
+        return summary
+
+    def flush():
+        if not buffer:
+            return
+        columns = list(zip(*buffer))
+        rows = {name: np.array(values, dtype=dtype)
+                for (name, dtype), values in zip(COLUMNS, columns)}
+        for name, writer in writers.items():
+            writer.append(rows[name])
+        stats.add(rows)
+        buffer.clear()
+        report()
+
+    def tasks():
+        run = 0
+        for seed in seeds:
+            for group, params in enumerate(groups):
+                yield (run, group, int(seed), params)
+                run += 1
+
+    chunks = iter(lambda it=tasks(): list(itertools.islice(it, chunk_size)), [])
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending = set()
+            for chunk in itertools.islice(chunks, workers * TASKS_IN_FLIGHT_PER_WORKER):
+                pending.add(pool.submit(_run_chunk, chunk))
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    rows = future.result()
+                    buffer.extend(rows)
+                    done += len(rows)
+                    chunk = next(chunks, None)
+                    if chunk:
+                        pending.add(pool.submit(_run_chunk, chunk))
+                if len(buffer) >= flush_rows:
+                    flush()
+                if on_progress:
+                    on_progress(done, total)
+        flush()
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return report(final=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Run ORION-EYE scenario parameter sweeps')
+    parser.add_argument('--scenario', nargs='+', default=['safe'],
+                        help='Layer 1 scenario names (default: safe)')
+    parser.add_argument('--objects', nargs='+', type=int,
+                        help='Random debris field sizes (overrides the scenario objects)')
+    parser.add_argument('--seeds', type=int, default=100, help='Runs per combination')
+    parser.add_argument('--seed-start', type=int, default=0)
+    parser.add_argument('--safe-distance', nargs='+', type=float)
+    parser.add_argument('--warning-distance', nargs='+', type=float)
+    parser.add_argument('--delta-v-capacity', nargs='+', type=float)
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--output', default='sweep_results', help='Output directory')
+    args = parser.parse_args(argv)
+
+    grid = {'scenario': args.scenario}
+    for key, values in (('num_objects', args.objects),
+                        ('safe_distance', args.safe_distance),
+                        ('warning_distance', args.warning_distance),
+                        ('delta_v_capacity', args.delta_v_capacity)):
+        if values:
+            grid[key] = values
+    seeds = range(args.seed_start, args.seed_start + args.seeds)
+
+    def progress(done, total):
+        print(f'\r  {done}/{total} runs', end='', flush=True)
+
+    print("=" * 70)
+    print("ORION-EYE SCENARIO SWEEP")
+    print("=" * 70)
+    summary = run_sweep(grid, seeds, args.output, workers=args.workers,
+                        chunk_size=args.chunk_size, on_progress=progress)
+    print(f"\n\nCompleted {summary['runs_completed']} runs in {summary['elapsed_s']:.1f} s "
+          f"-> {args.output}/")
+    for group in summary['groups']:
+        rates = ', '.join(f'{name} {rate:.0%}' for name, rate in group['outcome_rates'].items() if rate)
+        print(f"  {group['parameters']}: {rates}; fuel mean {group['fuel']['mean']:.1f} kg, "
+              f"p95 {group['fuel']['p95']:.0f} kg")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Test script for the ORION-EYE web services
+Focused behavior checks for the camera endpoints and stream, readiness,
+response caching and compression, dashboard payloads, deltas and the run
+history store
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+os.environ.setdefault('ORION_WARMUP', '0')  # no background model loading
+
+import app
+from app import DashboardDeltas, convert_numpy, diff_rows
+from camera_inference import DetectionService
+from orion_eye import Layer9_WebDashboard
+from run_history import RunHistory
+
+
+def dashboard(rows, logs, summary=None):
+    """Minimal dashboard_data with table rows, visualization objects and logs"""
+    return {
+        'summary': summary or {'total_objects': len(rows)},
+        'objects': [dict(row) for row in rows],
+        'visualization': {'objects': [dict(row) for row in rows], 'lod': {'detailed': len(rows)}},
+        'logs': list(logs)
+    }
+
+CAMERA_RESULT_KEYS = {'status', 'objects_detected', 'timestamp', 'outcome', 'summary', 'objects',
+                      'decision', 'maneuver', 'edge_cases', 'logs'}
+
+
+def camera_detections(count):
+    """Normalized dashboard camera detections"""
+    return [{'id': f'CAM_{i}', 'type': 'debris', 'x': 0.2 + 0.1 * i, 'y': 0.5, 'size': 0.05,
+             'distance': 20.0, 'velocity': {'x': 0.01, 'y': 0.0}, 'confidence': 0.9}
+            for i in range(count)]
+
+
+def test_camera_endpoints():
+    """Single and batched camera frames return one assessment per frame"""
+    client = app.app.test_client()
+    response = client.post('/api/camera-detection', json={'detections': camera_detections(3)})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    result = response.get_json()
+    assert set(result) == CAMERA_RESULT_KEYS, f"Got {sorted(result)}"
+    assert result['objects_detected'] == 3 and len(result['objects']) == 3
+    assert [log['phase'] for log in result['logs']][0] == 'detection', "Frame's own XAI logs"
+
+    frames = [{'detections': camera_detections(n)} for n in (1, 2, 0)]
+    response = client.post('/api/camera-detection/batch', json={'frames': frames})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    batch = response.get_json()
+    assert batch['frames_processed'] == 3
+    assert [r['objects_detected'] for r in batch['results']] == [1, 2, 0]
+    assert all(set(r) == CAMERA_RESULT_KEYS for r in batch['results'])
+
+    too_many = [{'detections': []}] * (app.MAX_BATCH_FRAMES + 1)
+    response = client.post('/api/camera-detection/batch', json={'frames': too_many})
+    assert response.status_code == 413, f"Got {response.status_code}"
+
+
+def test_camera_frame_before_warmup():
+    """Encoded frames get 503 until the detection model is loaded"""
+    client = app.app.test_client()
+    response = client.post('/api/camera-frame', data=b'\xff\xd8\xff\xe0 not a real jpeg',
+                           content_type='image/jpeg')
+    assert response.status_code == 503, f"Got {response.status_code}"
+    assert 'error' in response.get_json()
+    response = client.post('/api/camera-frame', data=b'', content_type='image/jpeg')
+    assert response.status_code == 400, "Empty body is a client error"
+
+
+
+class FakeSocket:
+    """WebSocket stand-in: frames arrive in bursts, replies are collected
+
+    receive() blocks for the next burst; receive(timeout=0) only returns
+    frames already queued in the current burst. The socket closes once every
+    burst has been read.
+    """
+
+    def __init__(self, bursts):
+        self.bursts = [list(burst) for burst in bursts]
+        self.queued = []
+        self.sent = []
+
+    def receive(self, timeout=None):
+        if timeout == 0:
+            return self.queued.pop(0) if self.queued else None
+        if not self.bursts:
+            raise ConnectionError('closed')
+        self.queued = self.bursts.pop(0)
+        return self.queued.pop(0)
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+def stream_frame(frame_id, count):
+    return json.dumps({'frame_id': frame_id, 'detections': camera_detections(count)})
+
+
+def test_receive_latest_frame():
+    """Frames queued behind the next one are skipped in favour of the newest"""
+    ws = FakeSocket([['a'], ['b', 'c', 'd']])
+    assert app.receive_latest_frame(ws) == ('a', 0)
+    assert app.receive_latest_frame(ws) == ('d', 2)
+
+
+def test_camera_stream_coalescing():
+    """The stream answers only the newest queued frame, then sends row deltas"""
+    if app.sock is None:
+        return  # flask_sock not installed: no stream endpoint
+    handler = app.app.view_functions['camera_detection_stream'].__wrapped__
+    ws = FakeSocket([[stream_frame(1, 2)],
+                     [stream_frame(2, 1), stream_frame(3, 3)],
+                     ['not json']])
+    try:
+        handler(ws)
+    except ConnectionError:
+        pass
+    first, second, bad = ws.sent
+    assert (first['frame_id'], first['frames_coalesced']) == (1, 0)
+    assert len(first['objects']) == 2 and 'objects_delta' not in first
+    assert (second['frame_id'], second['frames_coalesced']) == (3, 1), "Frame 2 is superseded"
+    assert 'objects' not in second
+    assert second['objects_detected'] == 3 and second['objects_delta']['added']
+    assert set(bad) == {'error', 'frames_coalesced'}, "Bad frames answer with an error"
+
+class FakeBoxes:
+    """The slice of an ultralytics Boxes object DetectionService reads"""
+
+    class Column:
+        def __init__(self, values):
+            self.values = np.asarray(values, dtype=float)
+
+        def cpu(self):
+            return self
+
+        def numpy(self):
+            return self.values
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy, self.conf, self.cls = self.Column(xyxy), self.Column(conf), self.Column(cls)
+
+    def __len__(self):
+        return len(self.xyxy.values)
+
+
+class FakeModel:
+    """Stands in for YOLO: one square and one too-elongated box per frame"""
+    names = {0: 'debris', 1: 'satellite'}
+
+    def __call__(self, frame, verbose=False, conf=0.25):
+        result = type('Result', (), {})()
+        result.boxes = FakeBoxes([[100, 100, 140, 140], [10, 10, 110, 20]], [0.9, 0.8], [1, 0])
+        return [result]
+
+
+class FakeDetectionService(DetectionService):
+    def _load_model(self):
+        return FakeModel()
+
+
+def test_camera_frame_ingestion():
+    """Encoded frames are decoded, detected, filtered and tracked per stream"""
+    import cv2
+    ok, png = cv2.imencode('.png', np.zeros((240, 320, 3), dtype=np.uint8))
+    assert ok
+    service = FakeDetectionService(max_queue=4)
+    service.start()
+    assert service.status == 'ready', service.error
+
+    tracks, shape = service.submit(png.tobytes(), 'cam-a').result(timeout=10)
+    assert shape == (240, 320)
+    assert len(tracks) == 1, "The elongated box fails the aspect-ratio filter"
+    assert tracks[0]['type'] == 'satellite' and tracks[0]['confidence'] == 0.9
+    assert (tracks[0]['x'], tracks[0]['y'], tracks[0]['radius']) == (120.0, 120.0, 20.0)
+    again, _ = service.submit(png.tobytes(), 'cam-a').result(timeout=10)
+    assert again[0]['track_id'] == tracks[0]['track_id'], "Same stream keeps its track"
+
+    try:
+        service.submit(b'not an image').result(timeout=10)
+        raise AssertionError("Undecodable frames should fail")
+    except ValueError:
+        pass
+
+    saved = app._detection_service
+    app._detection_service = service
+    try:
+        response = app.app.test_client().post('/api/camera-frame?stream=cam-b', data=png.tobytes(),
+                                              content_type='image/png')
+    finally:
+        app._detection_service = saved
+    assert response.status_code == 200, response.get_data(as_text=True)
+    result = response.get_json()
+    assert set(result) == CAMERA_RESULT_KEYS | {'tracks'} and result['objects_detected'] == 1
+
+
+def test_warmup_starts_once():
+    """Concurrent first requests start a single warm-up thread"""
+    calls = []
+    saved_thread, saved_warm_up = app._warmup_thread, app.warm_up
+    app._warmup_thread = None
+    app.warm_up = lambda: (calls.append(1), time.sleep(0.05))
+    try:
+        threads = [threading.Thread(target=app.start_warmup) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        app._warmup_thread.join()
+    finally:
+        app._warmup_thread, app.warm_up = saved_thread, saved_warm_up
+    assert len(calls) == 1, f"warm_up ran {len(calls)} times"
+
+
+
+def test_ready_endpoint():
+    """/api/ready is 503 until the pipeline loads, then 200 with the detection status"""
+    client = app.app.test_client()
+    saved = app._orion, app._detection_service
+    try:
+        app._orion = app._detection_service = None
+        response = client.get('/api/ready')
+        assert response.status_code == 503, f"Got {response.status_code}"
+        assert response.get_json() == {'ready': False, 'pipeline': 'loading', 'detection': 'idle'}
+        assert client.get('/api/health').status_code == 200, "Health answers while loading"
+
+        app._orion = saved[0] or app.get_orion()
+        app._detection_service = FakeDetectionService()
+        response = client.get('/api/ready')
+        assert response.status_code == 200, f"Got {response.status_code}"
+        assert response.get_json() == {'ready': True, 'pipeline': 'ready', 'detection': 'idle'}
+
+        app._detection_service.status, app._detection_service.error = 'unavailable', 'no model'
+        body = client.get('/api/ready').get_json()
+        assert body['detection'] == 'unavailable' and body['detection_error'] == 'no model'
+    finally:
+        app._orion, app._detection_service = saved
+
+
+def test_index_etag():
+    """The dashboard page is served per encoding with its own ETag and revalidates to 304"""
+    client = app.app.test_client()
+    plain = client.get('/', headers={'Accept-Encoding': 'identity'})
+    packed = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert plain.status_code == packed.status_code == 200
+    assert 'Content-Encoding' not in plain.headers and packed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(packed.get_data()) == plain.get_data()
+    assert packed.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    assert 'no-cache' in packed.headers['Cache-Control']
+
+    revalidated = client.get('/', headers={'Accept-Encoding': 'gzip',
+                                           'If-None-Match': packed.headers['ETag']})
+    assert revalidated.status_code == 304 and revalidated.get_data() == b''
+    stale = client.get('/', headers={'Accept-Encoding': 'gzip',
+                                     'If-None-Match': plain.headers['ETag']})
+    assert stale.status_code == 200, "The identity ETag must not validate the gzip body"
+
+
+def test_response_compression():
+    """Large JSON is compressed with the best accepted encoding; small or refused bodies are not"""
+    client = app.app.test_client()
+    detections = {'detections': camera_detections(6)}
+    plain = client.post('/api/camera-detection', json=detections)
+    assert len(plain.get_data()) >= app.COMPRESS_MIN_BYTES
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    packed = client.post('/api/camera-detection', json=detections,
+                         headers={'Accept-Encoding': 'gzip, br'})
+    expected = 'br' if app.brotli is not None else 'gzip'
+    assert packed.headers['Content-Encoding'] == expected
+    refused = client.post('/api/camera-detection', json=detections,
+                          headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in refused.headers
+    small = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers, "Bodies under COMPRESS_MIN_BYTES stay plain"
+
+    # Brotli wins over gzip when the package is available and the client accepts it
+    saved = app.brotli
+    app.brotli = SimpleNamespace(compress=lambda data, quality: b'br:' + data)
+    try:
+        packed = client.post('/api/camera-detection', json=detections,
+                             headers={'Accept-Encoding': 'gzip, br'})
+        gzip_only = client.post('/api/camera-detection', json=detections,
+                                headers={'Accept-Encoding': 'gzip'})
+    finally:
+        app.brotli = saved
+    assert packed.headers['Content-Encoding'] == 'br' and packed.get_data().startswith(b'br:')
+    assert json.loads(packed.get_data()[3:])['objects_detected'] == 6
+    assert gzip_only.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(gzip_only.get_data()))['objects_detected'] == 6
+
+def catalog(count, rng):
+    """Risk-assessed objects with 30-point trajectories, mostly LOW risk"""
+    levels = rng.choice(['CRITICAL', 'HIGH', 'MEDIUM', 'LOW'], count, p=[0.001, 0.004, 0.045, 0.95])
+    positions = rng.uniform(-500, 500, (count, 3))
+    velocities = rng.uniform(-8, 8, (count, 3))
+    steps = np.arange(0, 300, 10)[:, None]
+    return [{'id': f'OBJ_{i}', 'position': positions[i], 'velocity': velocities[i],
+             'classified_type': 'debris',
+             'predicted_trajectory': positions[i] + velocities[i] * steps,
+             'risk_assessment': {'level': level, 'score': 0.5, 'distance_at_closest': 10.0,
+                                 'time_to_closest': 60.0}}
+            for i, level in enumerate(levels)]
+
+
+def test_dashboard_payload_bounded():
+    """Payload size stays bounded for a large catalog and a long log"""
+    layer9 = Layer9_WebDashboard()
+    logs = [{'phase': 'risk', 'message': f'entry {i}', 'timestamp': '2026-01-01T00:00:00'}
+            for i in range(10000)]
+    decision = {'decision': 'EXECUTE_AVOIDANCE', 'maneuver_required': True}
+    dashboard = layer9.prepare_dashboard_data(catalog(20000, np.random.default_rng(0)), decision,
+                                              {'maneuver_type': 'NONE'}, logs, np.zeros(3))
+
+    size = len(json.dumps(convert_numpy(dashboard)))
+    assert size < 1024 ** 2, f"Dashboard payload is {size / 1024:.0f} KB"
+    assert [log['message'] for log in dashboard['logs']] == \
+        [f'entry {i}' for i in range(10000 - layer9.max_log_entries, 10000)], \
+        "Only the most recent log entries are sent"
+    assert len(dashboard['objects']) == layer9.max_table_rows
+    lod = dashboard['visualization']['lod']
+    assert len(dashboard['visualization']['objects']) <= layer9.max_detailed_objects, lod
+
+
+def test_diff_rows():
+    """Rows are split into added, changed and removed by id"""
+    previous = {'A': {'id': 'A', 'risk': 1}, 'B': {'id': 'B', 'risk': 2}}
+    current = {'A': {'id': 'A', 'risk': 1}, 'B': {'id': 'B', 'risk': 3}, 'C': {'id': 'C', 'risk': 0}}
+    assert diff_rows(previous, current) == {
+        'added': [{'id': 'C', 'risk': 0}],
+        'changed': [{'id': 'B', 'risk': 3}],
+        'removed': []
+    }
+    assert diff_rows(current, previous)['removed'] == ['C']
+
+
+def test_dashboard_deltas():
+    """A client that sends back its version gets only what changed"""
+    deltas = DashboardDeltas(max_clients=2)
+    rows = [{'id': 'A', 'risk': 'LOW'}, {'id': 'B', 'risk': 'HIGH'}]
+
+    key, full = deltas.encode('c1', None, dashboard(rows, [{'message': 'one'}]))
+    assert key == 'dashboard_data' and full['version'] == 1
+
+    rows = [{'id': 'A', 'risk': 'MEDIUM'}, {'id': 'C', 'risk': 'LOW'}, {'id': 'D', 'risk': 'LOW'}]
+    key, delta = deltas.encode('c1', 1, dashboard(rows, [{'message': 'two'}, {'message': 'three'}]))
+    assert key == 'dashboard_delta' and delta['base_version'] == 1 and delta['version'] == 2
+    assert delta['objects'] == {'added': rows[1:], 'changed': rows[:1], 'removed': ['B']}
+    assert delta['logs'] == {'cursor': 1, 'entries': [{'message': 'two'}, {'message': 'three'}]}
+    assert 'lod' in delta['visualization'], "Changed visualization sections are sent"
+
+    # Another client's runs do not move this client's log cursor
+    deltas.encode('c2', None, dashboard(rows, [{'message': 'other'}] * 50))
+
+    # Unchanged sections are left out
+    key, delta = deltas.encode('c1', 2, dashboard(rows, [{'message': 'four'}]))
+    assert key == 'dashboard_delta' and set(delta['visualization']) == {'objects'}
+    assert delta['logs'] == {'cursor': 3, 'entries': [{'message': 'four'}]}
+
+    # A stale version, duplicate ids or an evicted client get the full dashboard,
+    # which restarts the log cursor
+    key, full = deltas.encode('c1', 1, dashboard(rows, [{'message': 'five'}]))
+    assert key == 'dashboard_data' and full['logs'] == [{'message': 'five'}]
+    assert deltas.encode('c1', 4, dashboard(rows, []))[1]['logs']['cursor'] == 1
+    duplicate = rows + [{'id': 'A', 'risk': 'LOW'}]
+    assert deltas.encode('c1', 5, dashboard(duplicate, []))[0] == 'dashboard_data'
+    deltas.encode('c2', None, dashboard(rows, []))
+    deltas.encode('c3', None, dashboard(rows, []))
+    assert deltas.encode('c1', 6, dashboard(rows, []))[0] == 'dashboard_data'
+
+
+def run_result(outcome, object_ids, dashboard_logs):
+    """run_simulation-shaped result in native Python types"""
+    return {
+        'scenario': 'multi',
+        'outcome': outcome,
+        'objects': [{'id': object_id, 'classified_type': 'debris',
+                     'risk_assessment': {'level': 'HIGH', 'score': 0.6, 'distance_at_closest': 8.0,
+                                         'time_to_closest': 30.0}}
+                    for object_id in object_ids],
+        'decision': {'decision': 'EXECUTE_AVOIDANCE', 'risk_score': 0.6},
+        'maneuver': {'maneuver_type': 'AVOIDANCE_BURN', 'fuel_cost': 12.0},
+        'edge_cases': [],
+        'explanation': 'test',
+        'dashboard_data': {'logs': dashboard_logs}
+    }
+
+
+def test_run_history():
+    """Runs are stored with their own log entries and queried by filter"""
+    with tempfile.TemporaryDirectory() as directory:
+        history = RunHistory(os.path.join(directory, 'history.db'), max_queue=8)
+        shared_log = [{'phase': 'detection', 'message': f'run {i}', 'timestamp': str(i)}
+                      for i in range(3)]
+        started = time.time()
+        history.record(run_result('SAFE_PASSAGE', ['A', 'B'], shared_log[:1]),
+                       created_at=started, logs=shared_log[:1])
+        history.record(run_result('COLLISION_IMMINENT', ['B', 'C', 'D'], shared_log),
+                       created_at=started + 1, logs=shared_log[1:])
+        history.flush()
+
+        page = history.runs()
+        assert [run['outcome'] for run in page['runs']] == ['COLLISION_IMMINENT', 'SAFE_PASSAGE']
+        assert [run['object_count'] for run in page['runs']] == [3, 2]
+        assert page['next_before'] is None
+
+        latest = history.run(page['runs'][0]['id'])
+        assert [log['message'] for log in latest['logs']] == ['run 1', 'run 2'], \
+            "A run must store only its own log entries"
+        assert latest['decision']['decision'] == 'EXECUTE_AVOIDANCE'
+
+        assert len(history.runs(outcome='SAFE_PASSAGE')['runs']) == 1
+        assert len(history.runs(object_id='B')['runs']) == 2
+        assert len(history.runs(since=started + 0.5)['runs']) == 1
+        first = history.runs(limit=1)
+        assert len(first['runs']) == 1 and first['next_before'] is not None
+        assert history.runs(before=first['next_before'])['runs'][0]['outcome'] == 'SAFE_PASSAGE'
+
+        objects = history.objects(latest['id'], limit=2)
+        assert [obj['id'] for obj in objects['objects']] == ['B', 'C']
+        rest = history.objects(latest['id'], after=objects['next_after'])
+        assert [obj['id'] for obj in rest['objects']] == ['D'] and rest['next_after'] is None
+
+
+TESTS = [
+    ("Camera single and batch endpoints", test_camera_endpoints),
+    ("Camera frame endpoint before model warm-up", test_camera_frame_before_warmup),
+    ("Camera frame decode, detect and track", test_camera_frame_ingestion),
+    ("WebSocket frame coalescing", test_receive_latest_frame),
+    ("Camera stream answers the newest frame with deltas", test_camera_stream_coalescing),
+    ("Model warm-up starts once", test_warmup_starts_once),
+    ("Readiness before and after warm-up", test_ready_endpoint),
+    ("Dashboard page ETag and 304 per encoding", test_index_etag),
+    ("Response compression negotiation", test_response_compression),
+    ("Dashboard payload bounded by catalog and log size", test_dashboard_payload_bounded),
+    ("Row diff by id", test_diff_rows),
+    ("Dashboard delta encoding", test_dashboard_deltas),
+    ("Run history store and queries", test_run_history),
+]
+
+
+def main():
+    """Run all web service tests"""
+    print("=" * 60)
+    print("ORION-EYE Web Services Test Suite")
+    print("=" * 60)
+
+    failed = 0
+    for name, test in TESTS:
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: ERROR {e}")
+            import traceback
+            traceback.print_exc()
+
+    print("=" * 60)
+    if failed:
+        print(f"{failed} of {len(TESTS)} TESTS FAILED")
+        return 1
+    print("ALL TESTS PASSED! ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -11,6 +11,7 @@ import sys
 import platform
 from collections import deque
 from ultralytics import YOLO
+from camera_tracking import KalmanTrackBank
 
 # --- CONFIGURATION ---
 
@@ -19,54 +20,32 @@ from ultralytics import YOLO
 # Use 'best.pt' as a generic default that users should replace
 MODEL_PATH = os.environ.get('YOLO_MODEL_PATH', 'best.pt')
 
-# 2. SMOOTHING SETTINGS (TUNED FOR STABILITY)
-# Lower = Smoother but slower. Higher = Faster but jittery.
-# 0.15 is very smooth (like a cinematic camera).
-SMOOTH_FACTOR = 0.15 
-
-# 3. DEADZONE (Anti-Vibration)
-# If the new position is within 3 pixels of the old one, DON'T MOVE.
-DEADZONE_PIXELS = 3 
-
-# 4. PHYSICS CONSTANTS
+# 2. TRACKING FILTER (KALMAN, TUNED FOR STABILITY)
+# Process noise: how hard a target may accelerate (pixels/frame^2).
+# Lower = Smoother but slower to follow turns. Higher = Faster but jittery.
+PROCESS_NOISE_POS = 0.5
+PROCESS_NOISE_SCALE = 0.1
+# Measurement noise: expected detector jitter in pixels (replaces the deadzone).
+MEASUREMENT_NOISE_PIXELS = 3.0
+# Max distance (pixels) between a prediction and a detection to associate them.
+ASSOCIATION_GATE_PIXELS = 100
+
+# 3. PHYSICS CONSTANTS
 BUFFER_SIZE = 32         
 PREDICTION_FRAMES = 15   
 COLLISION_ZONE = 80      
-GROWTH_THRESHOLD = 0.5   
-MOVEMENT_THRESHOLD = 2
-VELOCITY_CALC_FRAMES = 5  # Number of frames to use for velocity calculation
+GROWTH_THRESHOLD = 0.5    # Radius growth (pixels/frame) that counts as approaching
+INTERCEPT_SIGMA = 1.0     # Prediction uncertainty margin for the intercept test
 
-# 5. ANTI-FLICKER
+# 4. ANTI-FLICKER
 MAX_COAST_FRAMES = 10     
 CONFIDENCE_MIN = 0.25    
 RATIO_MIN = 0.60         
 RATIO_MAX = 1.60         
 
-# 6. CAMERA
+# 5. CAMERA
 EXPOSURE_VAL = -5.0      
 
-def calculate_dynamics(pos_history, radius_history):
-    # Different requirements for velocity vs growth rate:
-    # - Velocity needs VELOCITY_CALC_FRAMES consecutive frames
-    # - Growth rate needs 2*VELOCITY_CALC_FRAMES to avoid overlap (recent vs old)
-    min_frames_for_growth = VELOCITY_CALC_FRAMES * 2
-    if len(pos_history) < VELOCITY_CALC_FRAMES or len(radius_history) < min_frames_for_growth:
-        return (0, 0), 0
-    
-    # Calculate velocity using more frames for stability
-    # Note: deque uses appendleft, so index 0 is newest, higher indices are older
-    # Velocity = (newer_pos - older_pos), i.e., pos_history[i-1] - pos_history[i]
-    dx = int(np.mean([pos_history[i-1][0] - pos_history[i][0] for i in range(1, VELOCITY_CALC_FRAMES)]))
-    dy = int(np.mean([pos_history[i-1][1] - pos_history[i][1] for i in range(1, VELOCITY_CALC_FRAMES)]))
-
-    # Calculate growth rate: recent (newest at index 0) vs old (oldest at end)
-    # Ensure no overlap by requiring 2*VELOCITY_CALC_FRAMES
-    r_now = np.mean(list(radius_history)[:VELOCITY_CALC_FRAMES])  # Most recent frames (index 0 to VELOCITY_CALC_FRAMES-1)
-    r_old = np.mean(list(radius_history)[-VELOCITY_CALC_FRAMES:])  # Oldest frames (last VELOCITY_CALC_FRAMES)
-    growth_rate = r_now - r_old 
-    
-    return (dx, dy), growth_rate
-
 def main():
     # --- INITIALIZATION ---
     print(f"🔄 SYSTEM BOOT: Loading AI from {MODEL_PATH}...")
@@ -99,13 +78,14 @@ def main():
     cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25) 
     cap.set(cv2.CAP_PROP_EXPOSURE, EXPOSURE_VAL) 
     
-    pos_pts = deque(maxlen=BUFFER_SIZE)
-    rad_pts = deque(maxlen=BUFFER_SIZE)
-
-    # VARIABLES FOR SMOOTHING
-    smooth_x, smooth_y, smooth_r = None, None, None
-    coast_count = 0
-    last_dx, last_dy = 0, 0
+    tracks = KalmanTrackBank(
+        process_noise_pos=PROCESS_NOISE_POS,
+        process_noise_scale=PROCESS_NOISE_SCALE,
+        measurement_noise=MEASUREMENT_NOISE_PIXELS,
+        gate_pixels=ASSOCIATION_GATE_PIXELS,
+        max_coast_frames=MAX_COAST_FRAMES,
+    )
+    trails = {}
 
     print("🚀 AADES SENSOR ACTIVE. STABILIZER ENGAGED.")
 
@@ -119,11 +99,9 @@ def main():
         
         results = model(frame, stream=True, verbose=False, conf=CONFIDENCE_MIN)
         
-        target_found = False
-        
-        # --- 1. AI DETECTION & STABILIZATION ---
-        # Note: Processes all detected objects, uses last valid one for tracking
-        # Original design tracks single object (most recent valid detection)
+        # --- 1. AI DETECTION ---
+        # Collect every valid detection as an (x, y, r) measurement
+        measurements = []
         for r in results:
             boxes = r.boxes
             for box in boxes:
@@ -144,90 +122,63 @@ def main():
                 if aspect_ratio < RATIO_MIN or aspect_ratio > RATIO_MAX:
                     continue
 
-                # Raw measurements
-                raw_x = x1 + (obj_w // 2)
-                raw_y = y1 + (obj_h // 2)
-                raw_r = max(obj_w, obj_h) // 2
-
-                # === HEAVY SMOOTHING LOGIC ===
-                if smooth_x is None:
-                    smooth_x, smooth_y, smooth_r = float(raw_x), float(raw_y), float(raw_r)
-                else:
-                    # 1. Calculate how far it moved
-                    dist_moved = np.linalg.norm(np.array((raw_x, raw_y)) - np.array((smooth_x, smooth_y)))
-                    
-                    # 2. Deadzone Check: If it barely moved, ignore the jitter
-                    if dist_moved > DEADZONE_PIXELS:
-                        # 3. Heavy Smoothing (Exponential Moving Average)
-                        smooth_x = (smooth_x * (1 - SMOOTH_FACTOR)) + (raw_x * SMOOTH_FACTOR)
-                        smooth_y = (smooth_y * (1 - SMOOTH_FACTOR)) + (raw_y * SMOOTH_FACTOR)
-                        smooth_r = (smooth_r * (1 - SMOOTH_FACTOR)) + (raw_r * SMOOTH_FACTOR)
-                    # Else: Keep smooth_x exactly the same (Vibration Killer)
-
-                target_found = True
-                coast_count = 0 
-                
-                # Convert to integer for drawing
-                x, y, radius = int(smooth_x), int(smooth_y), int(smooth_r)
-                
-                # Update History
-                pos_pts.appendleft((x, y))
-                rad_pts.appendleft(radius)
-                
-                # Calculate Dynamics
-                (dx, dy), growth_rate = calculate_dynamics(pos_pts, rad_pts)
-                last_dx, last_dy = dx, dy
-                
-                # Draw Box (Green) - Uses smoothed coordinates
-                cv2.rectangle(frame, (x-radius, y-radius), (x+radius, y+radius), (0, 255, 0), 2)
+                measurements.append((x1 + obj_w / 2, y1 + obj_h / 2, max(obj_w, obj_h) / 2))
 
-        # --- 2. COASTING (Momentum) ---
-        if not target_found and coast_count < MAX_COAST_FRAMES and smooth_x is not None:
-            coast_count += 1
-            
-            # Continue moving using last known velocity
-            smooth_x += last_dx
-            smooth_y += last_dy
-            
-            x, y, radius = int(smooth_x), int(smooth_y), int(smooth_r)
-            
-            pos_pts.appendleft((x, y))
-            rad_pts.appendleft(radius)
-            
-            # Visualize "Ghost" (Gray)
-            cv2.rectangle(frame, (x-radius, y-radius), (x+radius, y+radius), (100, 100, 100), 1)
-            cv2.putText(frame, "PREDICTING...", (x, y-20), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (150, 150, 150), 1)
-            
-            target_found = True 
-            dx, dy = last_dx, last_dy
-            growth_rate = 0 
+        # --- 2. KALMAN STABILIZATION & COASTING ---
+        # Unmatched tracks keep moving on their estimated velocity for up to
+        # MAX_COAST_FRAMES before they are dropped
+        tracks.predict()
+        tracks.update(np.array(measurements, dtype=float).reshape(-1, 3))
 
         # --- 3. LOGIC & HUD ---
-        if target_found:
-            pred_x = int(x + (dx * PREDICTION_FRAMES))
-            pred_y = int(y + (dy * PREDICTION_FRAMES))
-            dist_future = np.linalg.norm(np.array((pred_x, pred_y)) - np.array((center_x, center_y)))
-            
-            is_intercept = dist_future < COLLISION_ZONE
-            is_approaching = growth_rate > GROWTH_THRESHOLD
-
-            if is_intercept:
-                status_color = (0, 0, 255)
-                dodge = "LEFT" if dx > 0 else "RIGHT"
-                cv2.putText(frame, f"THRUST {dodge}", (50, h//2 + 50), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 3)
-                cv2.line(frame, (x, y), (center_x, center_y), status_color, 2)
+        is_intercept, predicted, _ = tracks.intercept(
+            (center_x, center_y), COLLISION_ZONE, PREDICTION_FRAMES, INTERCEPT_SIGMA
+        )
+        is_approaching = tracks.velocity[:, 2] > GROWTH_THRESHOLD
+
+        for i, track_id in enumerate(tracks.ids):
+            x, y, radius = (int(v) for v in tracks.position[i])
+            dx, dy = tracks.velocity[i, :2]
+            pred_x, pred_y = int(predicted[i, 0]), int(predicted[i, 1])
+
+            trails.setdefault(track_id, deque(maxlen=BUFFER_SIZE)).appendleft((x, y))
+
+            if tracks.coasting[i]:
+                # Visualize "Ghost" (Gray)
+                cv2.rectangle(frame, (x-radius, y-radius), (x+radius, y+radius), (100, 100, 100), 1)
+                cv2.putText(frame, "PREDICTING...", (x, y-20), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (150, 150, 150), 1)
             else:
-                status_color = (0, 255, 0)
+                # Draw Box (Green) - Uses filtered coordinates
+                cv2.rectangle(frame, (x-radius, y-radius), (x+radius, y+radius), (0, 255, 0), 2)
+                if is_approaching[i]:
+                    # Apparent size growing: the object is closing in depth
+                    cv2.putText(frame, "APPROACHING", (x, y-20), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 165, 255), 1)
+
+            if is_intercept[i]:
+                cv2.line(frame, (x, y), (center_x, center_y), (0, 0, 255), 2)
 
             if abs(dx) > 1 or abs(dy) > 1:
                 cv2.arrowedLine(frame, (x, y), (pred_x, pred_y), (0, 255, 255), 3)
 
+        if is_intercept.any():
+            # One command for the whole frame: dodge the intercepting track
+            # predicted to come closest to the collision zone centre
+            threats = np.flatnonzero(is_intercept)
+            miss = np.linalg.norm(predicted[threats, :2] - (center_x, center_y), axis=1)
+            dodge = "LEFT" if tracks.velocity[threats[np.argmin(miss)], 0] > 0 else "RIGHT"
+            label = f"THRUST {dodge}" + (f" ({len(threats)} THREATS)" if len(threats) > 1 else "")
+            cv2.putText(frame, label, (50, h//2 + 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 3)
+
         # --- 4. TRAILS & HUD ---
-        for i in range(1, len(pos_pts)):
-            if pos_pts[i - 1] is None or pos_pts[i] is None: continue
-            thickness = int(np.sqrt(BUFFER_SIZE / float(i + 1)) * 2.5)
-            cv2.line(frame, pos_pts[i - 1], pos_pts[i], (0, 0, 255), thickness)
+        for track_id in list(trails):
+            if track_id not in tracks.ids:
+                del trails[track_id]
+                continue
+            pos_pts = trails[track_id]
+            for i in range(1, len(pos_pts)):
+                thickness = int(np.sqrt(BUFFER_SIZE / float(i + 1)) * 2.5)
+                cv2.line(frame, pos_pts[i - 1], pos_pts[i], (0, 0, 255), thickness)
 
         cv2.circle(frame, (center_x, center_y), COLLISION_ZONE, (100, 100, 100), 2)
         cv2.putText(frame, "AADES STABILIZED TRACKING", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Test script for ORION-EYE numerics
+Focused behavior checks for the propagator, caches and risk/maneuver engines
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from camera_tracking import KalmanTrackBank
+from orion_eye import (EphemerisCache, OrbitalPropagator, MU_EARTH, SpatialGrid,
+                       Layer1_SpaceSensorSimulator, Layer2_ObjectDetector,
+                       Layer3_Classifier, LogisticClassifier, Layer4_TrajectoryPredictor, Layer5_RiskCalculator,
+                       Layer6_AutonomousDecision, Layer7_ManeuverSimulator, OrionEyeSystem,
+                       Layer10_EdgeCaseHandler, ThreatQueue, j2_acceleration)
+
+
+def circular_states(rng, count, radius=6778.0):
+    """Random circular LEO states (Earth-centred inertial, km and km/s)"""
+    r = rng.normal(size=(count, 3))
+    r *= radius / np.linalg.norm(r, axis=1)[:, None]
+    v = np.cross(r, rng.normal(size=(count, 3)))
+    v *= np.sqrt(MU_EARTH / radius) / np.linalg.norm(v, axis=1)[:, None]
+    return r, v
+
+
+def integrate_j2(r, v, duration, step=1.0):
+    """Reference two-body + J2 states by fixed-step RK4"""
+    def acceleration(pos):
+        r_mag = np.linalg.norm(pos, axis=1, keepdims=True)
+        return -MU_EARTH * pos / r_mag ** 3 + j2_acceleration(pos)
+    for _ in range(int(round(duration / step))):
+        k1r, k1v = v, acceleration(r)
+        k2r, k2v = v + step / 2 * k1v, acceleration(r + step / 2 * k1r)
+        k3r, k3v = v + step / 2 * k2v, acceleration(r + step / 2 * k2r)
+        k4r, k4v = v + step * k3v, acceleration(r + step * k3r)
+        r = r + step / 6 * (k1r + 2 * k2r + 2 * k3r + k4r)
+        v = v + step / 6 * (k1v + 2 * k2v + 2 * k3v + k4v)
+    return r, v
+
+
+def test_propagate_identity():
+    """propagate(t=0) returns the input state, with and without J2"""
+    rng = np.random.default_rng(2)
+    r, v = circular_states(rng, 50)
+    v *= rng.uniform(0.95, 1.05, (50, 1))  # eccentric orbits too
+    for include_j2 in (True, False):
+        pos, vel = OrbitalPropagator(include_j2=include_j2).propagate(r, v, np.zeros(1))
+        assert np.abs(pos[:, 0] - r).max() < 1e-9, "Position changed at t=0"
+        assert np.abs(vel[:, 0] - v).max() < 1e-12, "Velocity changed at t=0"
+
+
+def test_propagate_j2_accuracy():
+    """J2 propagation over the 300 s horizon matches numeric integration"""
+    rng = np.random.default_rng(3)
+    r, v = circular_states(rng, 20, radius=6900.0)
+    v *= rng.uniform(0.97, 1.05, (20, 1))
+    ref_r, ref_v = integrate_j2(r, v, 300.0)
+
+    pos, vel = OrbitalPropagator().propagate(r, v, np.array([300.0]))
+    two_body, _ = OrbitalPropagator(include_j2=False).propagate(r, v, np.array([300.0]))
+    error = np.linalg.norm(pos[:, 0] - ref_r, axis=1).max()
+    assert error < 0.05, f"J2 position error {error:.3f} km at 300 s"
+    assert np.linalg.norm(vel[:, 0] - ref_v, axis=1).max() < 1e-3, "J2 velocity error over 1 m/s"
+    assert error < np.linalg.norm(two_body[:, 0] - ref_r, axis=1).max() / 10, \
+        "J2 should be far closer to the reference than two-body"
+
+
+
+def test_propagate_j2_cost():
+    """J2 adds well under one extra two-body solve for a catalog-sized batch"""
+    rng = np.random.default_rng(4)
+    r, v = circular_states(rng, 100_000)
+    times = np.linspace(0.0, 300.0, 10)
+
+    def best_of(propagator, repeats=3):
+        elapsed = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            propagator.propagate(r, v, times)
+            elapsed.append(time.perf_counter() - start)
+        return min(elapsed)
+
+    two_body = best_of(OrbitalPropagator(include_j2=False))
+    with_j2 = best_of(OrbitalPropagator())
+    assert with_j2 < 2.0 * two_body, \
+        f"J2 took {with_j2:.2f} s vs {two_body:.2f} s two-body for 100k x 10"
+
+
+
+def test_spatial_grid_query():
+    """Grid radius queries return exactly the brute-force neighbours"""
+    rng = np.random.default_rng(11)
+    points = np.vstack([rng.uniform(-500.0, 500.0, (5000, 3)),
+                        rng.normal(0.0, 20.0, (1000, 3))])  # dense cluster, negative cells
+    grid = SpatialGrid(points, cell_size=50.0)
+    assert len(grid) == len(points)
+    for center, radius in [(np.zeros(3), 30.0), (rng.uniform(-500, 500, 3), 100.0),
+                           (np.array([490.0, -490.0, 0.0]), 75.0), (np.array([5e3, 0, 0]), 10.0),
+                           (points[17], 0.0), (np.array([12.5, -3.0, 7.0]), 260.0)]:
+        expected = np.flatnonzero(np.linalg.norm(points - center, axis=1) <= radius)
+        found = grid.query_radius(center, radius)
+        assert np.array_equal(found, expected), f"Radius {radius} about {center}"
+    assert grid.query_radius(points[17], 0.0).tolist() == [17]
+
+    # Layer 1 scans a loaded catalog through the grid: same as testing every object
+    layer1 = Layer1_SpaceSensorSimulator()
+    layer1.load_catalog([{'id': f'C{i}', 'position': (point + layer1.spacecraft_position).tolist()}
+                         for i, point in enumerate(points)])
+    visible = layer1.in_view(points + layer1.spacecraft_position)
+    assert [obj['id'] for obj in layer1.scan_catalog()] == \
+        [f'C{i}' for i in np.flatnonzero(visible)]
+
+def test_detect_batch():
+    """Detection probability falls off beyond sensor range; detected iff over threshold"""
+    detector = Layer2_ObjectDetector()
+    sensor_range = 100.0
+    np.random.seed(5)
+    near = np.zeros((2000, 3))
+    far = np.tile([3.0 * sensor_range, 0.0, 0.0], (2000, 1))
+    detected, confidence = detector.detect_batch(np.vstack([near, far]), np.zeros(3), sensor_range)
+    assert detected.shape == confidence.shape == (4000,)
+    assert np.array_equal(detected, confidence > detector.detection_threshold)
+    spread = detector.confidence_noise
+    assert np.abs(confidence[:2000] - detector.confidence_model_accuracy).max() <= spread
+    # (1/3)^4 of 0.92 is about 0.011, far below the 0.5 threshold
+    assert confidence[2000:].max() < 0.012 + spread and not detected[2000:].any()
+
+    # Without a sensor position every object gets the same probability
+    _, flat = detector.detect_batch(far)
+    assert np.abs(flat - detector.confidence_model_accuracy).max() <= spread
+
+
+def test_detect_objects_copies():
+    """detect_objects leaves sensor data unchanged and stamps one ISO string per call"""
+    sensor_data = [{'id': f'OBJ_{i}', 'position': [float(i), 0.0, 0.0]} for i in range(50)]
+    before = [dict(obj) for obj in sensor_data]
+    np.random.seed(6)
+    detected = Layer2_ObjectDetector().detect_objects(sensor_data)
+    assert sensor_data == before, "Input objects were mutated"
+    assert detected and not {id(obj) for obj in detected} & {id(obj) for obj in sensor_data}
+    assert {type(obj['timestamp']) for obj in detected} == {str}
+    assert len({obj['timestamp'] for obj in detected}) == 1
+    assert all(obj['detection_confidence'] > 0.5 for obj in detected)
+
+
+
+def test_classify_batch():
+    """Rule-based and logistic backends label whole arrays with calibrated confidence"""
+    size = np.array([0.5, 5.0, 2.0, 0.2])
+    velocity = np.array([[7.0, 0.0, 0.0], [0.0, 3.0, 0.0], [4.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    reported = np.array(['satellite', 'debris', 'debris', 'satellite'])
+    np.random.seed(10)
+    predicted, confidence = Layer3_Classifier().classify_batch(size, velocity, reported)
+    assert predicted.tolist() == ['debris', 'satellite', 'debris', 'satellite'], \
+        "Small fast is debris, large slow is satellite, otherwise the reported type"
+    assert 0.85 <= confidence[0] <= 0.95 and 0.80 <= confidence[1] <= 0.95
+    assert (0.75 <= confidence[2:]).all() and (confidence[2:] <= 0.85).all()
+
+    # Binary model loaded from .npz: P(satellite) rises with size, falls with speed
+    speed = np.linalg.norm(velocity, axis=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.npz')
+        np.savez(path, coef=[2.0, -1.0], intercept=0.5, classes=['debris', 'satellite'],
+                 mean=[1.0, 4.0], scale=[2.0, 2.0])
+        layer3 = Layer3_Classifier(LogisticClassifier.load(path))
+    predicted, confidence = layer3.classify_batch(size, velocity, reported)
+    logits = ((size - 1.0) / 2.0) * 2.0 - ((speed - 4.0) / 2.0) + 0.5
+    p = 1.0 / (1.0 + np.exp(-logits))
+    assert predicted.tolist() == np.where(p >= 0.5, 'satellite', 'debris').tolist()
+    assert np.allclose(confidence, np.maximum(p, 1.0 - p))
+
+    # Softmax model: the most probable of three classes and its probability
+    coef = np.array([[1.0, 0.0, -1.0], [-1.0, 0.5, 1.0]])
+    intercept = np.array([0.0, 0.2, -0.1])
+    softmax = LogisticClassifier(coef, intercept, ['debris', 'rocket_body', 'satellite'])
+    predicted, confidence = Layer3_Classifier(softmax).classify_batch(size, velocity, reported)
+    logits = np.column_stack([size, speed]) @ coef + intercept
+    p = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+    assert predicted.tolist() == [softmax.classes[k] for k in p.argmax(axis=1)]
+    assert np.allclose(confidence, p.max(axis=1))
+
+def test_track_bank_convergence():
+    """A constant-velocity track converges to the true velocity and beats raw measurements"""
+    rng = np.random.default_rng(7)
+    bank = KalmanTrackBank(measurement_noise=3.0)
+    velocity = np.array([4.0, -2.0, 0.1])
+    errors = []
+    for frame in range(60):
+        truth = np.array([100.0, 300.0, 20.0]) + velocity * frame
+        bank.predict()
+        bank.update(truth + rng.normal(0.0, 3.0, 3))
+        if frame >= 30:
+            errors.append(np.linalg.norm(bank.position[0, :2] - truth[:2]))
+    assert len(bank) == 1
+    assert np.abs(bank.velocity[0] - velocity).max() < 0.5, f"Velocity {bank.velocity[0]}"
+    # Raw 2D measurement error averages 3 * sqrt(pi / 2) ~ 3.8 px
+    assert np.mean(errors) < 3.0, f"Filtered position error {np.mean(errors):.2f} px"
+
+
+def test_track_bank_association():
+    """Tracks keep their ids, new measurements spawn tracks and lost tracks coast then drop"""
+    bank = KalmanTrackBank(gate_pixels=50.0, max_coast_frames=3)
+    bank.predict()
+    first = bank.update([[100.0, 100.0, 10.0], [400.0, 100.0, 10.0]])
+    assert first.tolist() == [0, 1]
+
+    # Measurements arrive in the opposite order and slightly moved
+    bank.predict()
+    assigned = bank.update([[405.0, 102.0, 10.0], [104.0, 98.0, 10.0], [250.0, 400.0, 8.0]])
+    assert assigned.tolist() == [1, 0, 2], f"Got {assigned}"
+
+    # Track 1 disappears: it coasts for max_coast_frames, then is dropped
+    for frame in range(4):
+        bank.predict()
+        bank.update([[108.0 + 4 * frame, 96.0, 10.0], [250.0, 400.0, 8.0]])
+        if frame < 3:
+            assert 1 in bank.ids and bank.coasting[bank.ids == 1].all()
+    assert bank.ids.tolist() == [0, 2] and not bank.coasting.any()
+
+    # Outside the gate a measurement starts a new track instead of matching
+    bank.predict()
+    assigned = bank.update([[124.0, 96.0, 10.0], [250.0, 480.0, 8.0]])
+    assert assigned.tolist() == [0, 3]
+
+
+def test_track_bank_intercept():
+    """Tracks heading into the collision zone intercept; ones moving away do not"""
+    bank = KalmanTrackBank()
+    center, zone = (320.0, 240.0), 40.0
+    for frame in range(20):
+        bank.predict()
+        bank.update([[120.0 + 8 * frame, 240.0, 10.0],      # heading for the centre
+                     [520.0 + 8 * frame, 100.0, 10.0]])     # moving away
+    # Six frames ahead track 0 is predicted at the zone centre
+    is_intercept, predicted, sigma = bank.intercept(center, zone, frames=6)
+    assert is_intercept.tolist() == [True, False], f"Got {is_intercept}"
+    assert np.abs(predicted[0, :2] - center).max() < 2.0, f"Predicted {predicted[0]}"
+    assert np.all(sigma > 0)
+    # A larger uncertainty margin never clears an intercept
+    assert bank.intercept(center, zone, frames=6, n_sigma=3.0)[0][0]
+
+
+def test_refine_closest_approach():
+    """Refined closest approaches between coarse samples match a dense time scan"""
+    rng = np.random.default_rng(9)
+    propagator = OrbitalPropagator()
+    count = 20
+    sc_r, sc_v = circular_states(rng, 1)
+
+    # Objects cross the spacecraft orbit 0.1-3 km off at times between samples,
+    # then are propagated back to t = 0
+    tca = rng.uniform(20.0, 250.0, count)
+    meet, meet_v = (a[:, 0] for a in propagator.propagate(np.repeat(sc_r, count, axis=0),
+                                                          np.repeat(sc_v, count, axis=0), tca[:, None]))
+    radial = meet / np.linalg.norm(meet, axis=1)[:, None]
+    angle = rng.uniform(0.2, 3.0, count)[:, None]
+    # Rotate the velocity about the radial direction so the orbits cross
+    cross_v = (meet_v * np.cos(angle) + np.cross(radial, meet_v) * np.sin(angle)
+               + radial * np.einsum('ni,ni->n', radial, meet_v)[:, None] * (1.0 - np.cos(angle)))
+    meet = meet + rng.normal(size=(count, 3)) * rng.uniform(0.1, 3.0, (count, 1))
+    r0, v0 = (a[:, 0] for a in propagator.propagate(meet, cross_v, -tca[:, None]))
+
+    layer4 = Layer4_TrajectoryPredictor()
+    layer4.motion_model = 'orbital'
+    objects = [{'id': f'X{i}', 'position': r0[i], 'velocity': v0[i]} for i in range(count)]
+    layer4.predict_all(objects, sc_r[0], sc_v[0])
+
+    times = np.arange(0.0, layer4.prediction_horizon, 0.005)
+    dense = np.linalg.norm(propagator.propagate(r0, v0, times)[0]
+                           - propagator.propagate(sc_r, sc_v, times)[0], axis=2)
+    best = dense.argmin(axis=1)
+    for i, obj in enumerate(objects):
+        approach = obj['closest_approach']
+        coarse = min(point['distance'] for point in obj['predicted_trajectory'])
+        assert approach['distance'] < coarse, f"{obj['id']} was not refined"
+        assert abs(approach['time'] - times[best[i]]) < 0.01, \
+            f"{obj['id']} TCA {approach['time']:.3f} s vs {times[best[i]]:.3f} s"
+        assert abs(approach['distance'] - dense[i, best[i]]) < 2e-3, \
+            f"{obj['id']} miss {approach['distance']:.4f} km vs {dense[i, best[i]]:.4f} km"
+
+def test_ephemeris_cache_eviction():
+    """Hits stay correct when storing the same query's misses evicts their slots"""
+    propagator = OrbitalPropagator()
+    rng = np.random.default_rng(1)
+    times = np.linspace(0.0, 300.0, 11)
+    # 7 nodes cover 300 s at 60 s spacing: room for exactly 10 objects
+    cache = EphemerisCache(memory_budget=10 * 7 * 6 * 4)
+
+    r, v = circular_states(rng, 10)
+    cache.lookup(r, v, times, propagator.propagate)
+    new_r, new_v = circular_states(rng, 5)
+    r, v = np.vstack([r[2:], new_r]), np.vstack([v[2:], new_v])
+    pos, vel = cache.lookup(r, v, times, propagator.propagate)
+    ref_pos, ref_vel = propagator.propagate(r, v, times)
+
+    assert cache.hits == 8 and cache.misses == 15, "Unexpected hit/miss counts"
+    assert cache.evictions == 5 and len(cache) == 10, "Cache should evict down to capacity"
+    assert np.abs(pos - ref_pos).max() < 0.01, "Cached positions differ from propagation"
+    assert np.abs(vel - ref_vel).max() < 1e-4, "Cached velocities differ from propagation"
+
+    # 13 objects cannot all fit: a repeat evicts again and must stay correct
+    again, _ = cache.lookup(r, v, times, propagator.propagate)
+    assert np.abs(again - ref_pos).max() < 0.01, "Repeat query returned wrong states"
+
+
+def assessed(object_id, position, velocity, level='HIGH', score=0.6, distance=8.0,
+             time_to_closest=30.0, confidence=1.0):
+    """Object with a hand-made Layer 5 risk assessment"""
+    return {
+        'id': object_id,
+        'position': np.array(position, dtype=float),
+        'velocity': np.array(velocity, dtype=float),
+        'classification_confidence': confidence,
+        'risk_assessment': {
+            'level': level,
+            'score': score,
+            'distance_at_closest': distance,
+            'time_to_closest': time_to_closest,
+            'requires_maneuver': level in ('CRITICAL', 'HIGH')
+        }
+    }
+
+
+def test_tiered_pc_agreement():
+    """Tiered Pc re-estimates the ambiguous band close to the analytic value, never zero"""
+    layer5 = Layer5_RiskCalculator()
+    layer5.rng = np.random.default_rng(5)
+    # 2 m objects passing 0.3-0.5 km off: analytic Pc from ~3e-4 down to ~6e-6
+    objects = [{'id': f'B{i}', 'position': [-75.0, miss, 0.0], 'velocity': [7.5, 0.0, 0.0],
+                'size': 2.0} for i, miss in enumerate([0.3, 0.35, 0.4, 0.45, 0.5])]
+    analytic = layer5.analytic_pc(objects, np.zeros(3))
+    tiered = layer5.collision_probability(objects, np.zeros(3))
+
+    low, high = layer5.pc_ambiguous_band
+    in_band = (analytic >= low) & (analytic <= high)
+    assert in_band[:4].all() and not in_band[4], "Test objects should straddle the band edge"
+    assert (tiered['pc'] > 0).all(), "Tiered Pc must not zero an ambiguous object"
+    assert (tiered['method'][in_band] == 'monte_carlo').all(), "Band objects should be resampled"
+    assert tiered['method'][4] == 'analytic' and tiered['pc'][4] == analytic[4], \
+        "Objects outside the band keep the analytic Pc"
+    error = np.abs(tiered['pc'] / analytic - 1).max()
+    assert error < 0.2, f"Tiered and analytic Pc differ by {error:.0%}"
+    assert (tiered['samples'] <= layer5.mc_max_samples).all(), "Sample budget exceeded"
+
+
+
+def test_monte_carlo_pc():
+    """Monte Carlo Pc matches the analytic Pc for large Pc and stops early when confident"""
+    layer5 = Layer5_RiskCalculator()
+    layer5.rng = np.random.default_rng(8)
+    # 50-100 m objects passing 0-0.1 km off give Pc of a few percent; the last misses by 30 km
+    objects = [{'id': f'M{i}', 'position': [-75.0, miss, 0.0], 'velocity': [7.5, 0.0, 0.0],
+                'size': size} for i, (miss, size) in enumerate([(0.0, 100.0), (0.05, 100.0),
+                                                                 (0.1, 60.0), (30.0, 2.0)])]
+    analytic = layer5.analytic_pc(objects, np.zeros(3))
+    pc, std_error, samples, compute_ms = layer5.monte_carlo_pc(objects, np.zeros(3))
+
+    assert (analytic[:3] > 0.01).all() and analytic[3] == 0.0
+    assert (np.abs(pc - analytic) <= 4 * std_error + 1e-12).all(), \
+        f"Monte Carlo {pc} vs analytic {analytic} (std error {std_error})"
+    assert pc[3] == 0.0 and std_error[3] == 0.0
+    assert (samples < layer5.mc_max_samples)[[0, 1, 3]].all(), f"No early stop: {samples}"
+    assert (samples % layer5.mc_batch_size == 0).all() and (compute_ms > 0).all()
+
+    layer5.mc_early_stop = False
+    assert (layer5.monte_carlo_pc(objects, np.zeros(3))[2] == layer5.mc_max_samples).all()
+
+def test_burn_never_zero():
+    """An avoidance decision gives a real burn or a MONITOR, never a zero-delta-v burn"""
+    layer6, layer7 = Layer6_AutonomousDecision(), Layer7_ManeuverSimulator()
+
+    # HIGH risk but receding at 8 km: already clears min(10 km, current range)
+    receding = [assessed('R', [8.0, 0.0, 0.0], [1.0, 0.0, 0.0], time_to_closest=0.0)]
+    decision = layer6.make_decision(receding)
+    assert decision['decision'] == 'EXECUTE_AVOIDANCE'
+    maneuver = layer7.calculate_maneuver(decision, receding, np.zeros(3), required_miss_distance=10.0)
+    assert maneuver['maneuver_type'] == 'MONITOR', f"Got {maneuver['maneuver_type']}"
+    assert maneuver['delta_v_magnitude'] == 0 and maneuver['constraint_met']
+
+    # Head-on at 5 km: must burn
+    head_on = [assessed('C', [5.0, 0.0, 0.0], [-7.5, 0.0, 0.0], level='CRITICAL', score=0.95,
+                        distance=0.0, time_to_closest=0.7)]
+    maneuver = layer7.calculate_maneuver(layer6.make_decision(head_on), head_on, np.zeros(3),
+                                         required_miss_distance=10.0)
+    assert maneuver['maneuver_type'] == 'AVOIDANCE_BURN', f"Got {maneuver['maneuver_type']}"
+    assert maneuver['delta_v_magnitude'] > 0, "Avoidance burn with zero delta-v"
+
+
+
+def test_anytime_deadline():
+    """Anytime scoring stops at the deadline, nearest objects first, and covers every object"""
+    np.random.seed(12)
+    system = OrionEyeSystem()
+    spacecraft_pos = system.layer1.spacecraft_position
+    objects = system.layer4.predict_all(
+        system.layer3.classify_all(system.layer1.generate_debris_field(10 * system.ANYTIME_BATCH)),
+        spacecraft_pos)
+    assess_all = system.layer5.assess_all
+
+    def slow_assess_all(batch, position):
+        time.sleep(0.01)
+        return assess_all(batch, position)
+    system.layer5.assess_all = slow_assess_all
+
+    deadline = 0.035
+    threats = ThreatQueue()
+    start = time.perf_counter()
+    ordered, decision, progress = system._assess_anytime(objects, spacecraft_pos,
+                                                         start + deadline, threats)
+    elapsed = time.perf_counter() - start
+
+    scored = progress['objects_fully_assessed']
+    steps = progress['provisional_decisions']
+    assert progress['objects_total'] == len(ordered) == len(threats) == len(objects)
+    assert 2 <= len(steps) < 10 and scored == len(steps) * system.ANYTIME_BATCH, \
+        f"{len(steps)} batches scored"
+    assert all(step['elapsed_ms'] < deadline * 1000 for step in steps[:-1]), \
+        "A batch started after the deadline"
+    assert elapsed < deadline + 0.1, f"Overran the {deadline} s deadline: {elapsed:.3f} s"
+
+    distance = [obj['closest_approach']['distance'] for obj in ordered]
+    assert distance == sorted(distance), "Objects are scored nearest first"
+    assert all('collision_probability' in obj['risk_assessment'] for obj in ordered[:scored])
+    assert not any('collision_probability' in obj['risk_assessment'] for obj in ordered[scored:])
+    assert decision == system.layer6.decide(threats)
+
+    # Even with no time left the nearest batch is scored before deciding
+    _, _, progress = system._assess_anytime(objects, spacecraft_pos, time.perf_counter(),
+                                            ThreatQueue())
+    assert progress['objects_fully_assessed'] == system.ANYTIME_BATCH
+
+def test_threat_queue():
+    """Upserts, removal and top_k keep the queue ordered by risk score"""
+    queue = ThreatQueue()
+    queue.update([assessed(f'T{i}', [10.0 + i, 0, 0], [0, 0, 0], score=0.1 * i,
+                           level='HIGH' if i >= 5 else 'LOW') for i in range(10)])
+    assert len(queue) == 10 and queue.count(queue.requires) == 5
+    assert [obj['id'] for obj in queue.top_k(3)] == ['T9', 'T8', 'T7']
+
+    # Raise T0 to the top, drop the two worst and add a new object
+    queue.update([assessed('T0', [10.0, 0, 0], [0, 0, 0], score=0.99),
+                  assessed('N', [30.0, 0, 0], [0, 0, 0], score=0.75, level='MEDIUM')])
+    queue.remove(['T9', 'T8', 'missing'])
+    assert len(queue) == 9
+    assert [obj['id'] for obj in queue.top_k(3)] == ['T0', 'N', 'T7']
+    assert [obj['id'] for obj in queue.top_k(10, queue.requires)] == ['T0', 'T7', 'T6', 'T5']
+    assert queue.top_k(0) == [] and ThreatQueue().top_k(5) == []
+
+
+def test_edge_case_rules():
+    """Each built-in edge case fires on its condition and stays quiet otherwise"""
+    handler = Layer10_EdgeCaseHandler()
+    decision = {'decision': 'EXECUTE_AVOIDANCE'}
+    objects = [
+        assessed('A', [6.0, 0, 0], [-1.0, 0, 0], score=0.9, time_to_closest=20.0),
+        assessed('B', [-6.0, 0, 0], [1.0, 0, 0], score=0.8),
+        assessed('C', [0, 7.0, 0], [0, -1.0, 0], score=0.7),
+        assessed('D', [0, 0, 9.0], [0, 0, -1.0], score=0.6, confidence=0.5),
+    ]
+    cases = handler.check_edge_cases(objects, decision, {'delta_v_magnitude': 1.8})
+    found = {case['type']: case for case in cases}
+    assert set(found) == {'MULTIPLE_THREATS', 'HIGH_DELTA_V', 'TIME_CRITICAL', 'LOW_CONFIDENCE',
+                          'CONFLICTING_THREATS'}, f"Got {sorted(found)}"
+    assert found['MULTIPLE_THREATS']['description'].startswith('4 ')
+    assert 'A' in found['TIME_CRITICAL']['description']
+
+    # Three threats, all on one side, slow and confidently classified
+    quiet = handler.check_edge_cases(objects[:1] + objects[2:3], decision,
+                                     {'delta_v_magnitude': 0.1})
+    assert [case['type'] for case in quiet] == ['TIME_CRITICAL'], f"Got {quiet}"
+
+
+TESTS = [
+    ("Propagator returns the input state at t=0", test_propagate_identity),
+    ("Propagator J2 matches numeric integration", test_propagate_j2_accuracy),
+    ("Propagator J2 costs under twice two-body", test_propagate_j2_cost),
+    ("Spatial grid radius query vs brute force", test_spatial_grid_query),
+    ("Layer 2 batch detection falls off with range", test_detect_batch),
+    ("Layer 2 detect_objects copies its input", test_detect_objects_copies),
+    ("Layer 3 rule-based and logistic classification", test_classify_batch),
+    ("Kalman track bank converges on constant velocity", test_track_bank_convergence),
+    ("Kalman track bank association, coasting and drop", test_track_bank_association),
+    ("Kalman track bank intercept flag", test_track_bank_intercept),
+    ("Closest-approach refinement vs dense scan", test_refine_closest_approach),
+    ("Ephemeris cache hit/evict correctness", test_ephemeris_cache_eviction),
+    ("Tiered Pc agrees with analytic Pc", test_tiered_pc_agreement),
+    ("Monte Carlo Pc vs analytic, early stop", test_monte_carlo_pc),
+    ("Burn optimizer never returns a zero-delta-v burn", test_burn_never_zero),
+    ("Anytime risk scoring honours its deadline", test_anytime_deadline),
+    ("Threat queue upsert/remove/top-k", test_threat_queue),
+    ("Edge-case rule engine", test_edge_case_rules),
+]
+
+
+def main():
+    """Run all numerics tests"""
+    print("=" * 60)
+    print("ORION-EYE Numerics Test Suite")
+    print("=" * 60)
+
+    failed = 0
+    for name, test in TESTS:
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: ERROR {e}")
+            import traceback
+            traceback.print_exc()
+
+    print("=" * 60)
+    if failed:
+        print(f"{failed} of {len(TESTS)} TESTS FAILED")
+        return 1
+    print("ALL TESTS PASSED! ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
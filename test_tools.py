@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Test script for the ORION-EYE offline tools
+Focused behavior checks for the scenario sweep, pipeline record/replay and
+the load test
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import load_test
+import pipeline_replay
+import scenario_sweep
+from orion_eye import OrionEyeSystem
+from scenario_sweep import FUEL_BINS, OUTCOMES, NpyColumnWriter, SweepStatistics
+
+
+def test_sweep_statistics():
+    """Streaming per-group statistics match the same numbers computed in one pass"""
+    rng = np.random.default_rng(13)
+    groups = [{'scenario': 'safe'}, {'scenario': 'crash'}, {'scenario': 'multi'}]
+    group = rng.integers(0, 2, 500).astype(np.int32)  # group 2 never runs
+    outcome = rng.integers(0, len(OUTCOMES), 500).astype(np.int8)
+    fuel = rng.exponential(60.0, 500)
+    fuel[:5] = 900.0  # overflow bin
+    elapsed = rng.uniform(1.0, 5.0, 500)
+
+    stats = SweepStatistics(groups)
+    for part in np.array_split(np.arange(500), 7):  # several flushes
+        stats.add({'group': group[part], 'outcome': outcome[part],
+                   'fuel_cost': fuel[part], 'elapsed_ms': elapsed[part]})
+    summary = stats.summary()
+
+    for g in (0, 1):
+        rows = group == g
+        entry = summary[g]
+        assert entry['runs'] == rows.sum() and entry['parameters'] == groups[g]
+        rates = [entry['outcome_rates'][name] for name in OUTCOMES]
+        assert np.allclose(rates, np.bincount(outcome[rows], minlength=len(OUTCOMES)) / rows.sum())
+        assert np.isclose(entry['fuel']['mean'], fuel[rows].mean())
+        assert entry['fuel']['max'] == fuel[rows].max()
+        assert sum(entry['fuel']['histogram']) == rows.sum()
+        assert entry['fuel']['histogram'][-1] == (fuel[rows] >= FUEL_BINS[-1]).sum()
+        width = FUEL_BINS[1] - FUEL_BINS[0]
+        for key, q in (('p50', 0.5), ('p95', 0.95)):
+            # Histogram quantiles are lower bin edges, within one bin of the exact value
+            exact = min(np.quantile(fuel[rows], q), FUEL_BINS[-1])
+            assert entry['fuel'][key] <= exact < entry['fuel'][key] + width, f"{key} of group {g}"
+        assert np.isclose(entry['mean_elapsed_ms'], elapsed[rows].mean())
+
+    assert summary[2]['runs'] == 0 and summary[2]['fuel']['p95'] == 0.0
+    assert not any(summary[2]['outcome_rates'].values())
+
+
+def test_npy_column_writer():
+    """Streamed columns load as ordinary .npy arrays"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'fuel.npy')
+        writer = NpyColumnWriter(path, np.float64)
+        writer.append(np.arange(3.0))
+        writer.append([3.5, 4.5])
+        writer.close()
+        loaded = np.load(path, mmap_mode='r')
+        assert loaded.dtype == np.float64 and loaded.tolist() == [0.0, 1.0, 2.0, 3.5, 4.5]
+        del loaded
+
+
+def test_run_sweep():
+    """A small sweep writes one row per run and a summary consistent with the columns"""
+    with tempfile.TemporaryDirectory() as tmp:
+        summary = scenario_sweep.run_sweep({'scenario': ['safe', 'crash']}, range(3), tmp,
+                                           workers=1, chunk_size=2, flush_rows=2)
+        columns = {name: np.load(os.path.join(tmp, f'{name}.npy'))
+                   for name, _ in scenario_sweep.COLUMNS}
+        with open(os.path.join(tmp, 'summary.json')) as f:
+            on_disk = json.load(f)
+
+    assert summary == on_disk and summary['complete']
+    assert summary['runs_completed'] == summary['runs_total'] == 6
+    assert sorted(columns['run'].tolist()) == list(range(6))
+    assert all(len(values) == 6 for values in columns.values())
+    for entry in summary['groups']:
+        rows = columns['group'] == entry['group']
+        assert entry['runs'] == rows.sum() == 3
+        assert sorted(columns['seed'][rows].tolist()) == [0, 1, 2]
+        counts = np.bincount(columns['outcome'][rows], minlength=len(OUTCOMES))
+        assert [entry['outcome_rates'][name] for name in OUTCOMES] == (counts / 3).tolist()
+        assert np.isclose(entry['fuel']['mean'], columns['fuel_cost'][rows].mean())
+    crash = summary['groups'][1]
+    assert crash['parameters'] == {'scenario': 'crash'}
+    assert crash['outcome_rates']['SAFE_PASSAGE'] == 0.0, "Head-on debris always needs a burn"
+    assert crash['fuel']['mean'] > 0.0
+
+
+
+def test_record_replay():
+    """Replayed cycles reproduce the recorded inputs and results; recording appends"""
+    with tempfile.TemporaryDirectory() as tmp:
+        np.random.seed(14)
+        system = OrionEyeSystem()
+        system.layer5.rng = np.random.default_rng(14)
+        system.recorder = pipeline_replay.PipelineRecorder(tmp, segment_cycles=2)
+        live = [system.run_simulation(scenario) for scenario in ('multi', 'crash', 'safe',
+                                                                 'multi', 'crash')]
+        system.recorder.close()
+        assert system.recorder.cycles == 5
+        assert sorted(os.listdir(tmp)) == ['segment_00000', 'segment_00001', 'segment_00002']
+
+        cycles = list(pipeline_replay.load_cycles(tmp))
+        for cycle, result in zip(cycles, live):
+            objects = pipeline_replay.cycle_objects(cycle)
+            assert [obj['id'] for obj in objects] == [obj['id'] for obj in result['objects']]
+            assert np.allclose([obj['position'] for obj in objects],
+                               [obj['position'] for obj in result['objects']])
+            assert cycle['outcome'] == result.get('outcome', result.get('result'))
+
+        replayed = []
+        stats = pipeline_replay.replay(tmp, on_result=lambda cycle, result: replayed.append(result))
+        assert stats['cycles'] == 5 and stats['mismatches'] == [], stats['mismatches']
+        for result, original in zip(replayed, live):
+            assert result['dashboard_data']['summary'] == original['dashboard_data']['summary']
+            untimed = [{key: value for key, value in m.items() if key != 'search_ms'}
+                       for m in (result['maneuver'], original['maneuver'])]
+            assert untimed[0] == untimed[1], "Replayed maneuver differs"
+
+        # A second recording into the same directory continues the segment numbering
+        assert pipeline_replay.record(tmp, 'crash', 3, seed=15, segment_cycles=2) == 3
+        assert sorted(os.listdir(tmp))[3:] == ['segment_00003', 'segment_00004']
+        scenarios = [cycle['scenario'] for cycle in pipeline_replay.load_cycles(tmp)]
+        assert scenarios == ['multi', 'crash', 'safe', 'multi', 'crash'] + ['crash'] * 3
+        stats = pipeline_replay.replay(tmp)
+        assert stats['cycles'] == 8 and stats['mismatches'] == [], stats['mismatches']
+
+        # A changed recorded outcome is reported as a mismatch
+        path = os.path.join(tmp, 'segment_00001', 'cycles.json')
+        with open(path) as f:
+            meta = json.load(f)
+        meta[0]['outcome'] = 'NOT_A_REAL_OUTCOME'
+        with open(path, 'w') as f:
+            json.dump(meta, f)
+        mismatches = pipeline_replay.replay(tmp)['mismatches']
+        assert [m['cycle'] for m in mismatches] == [2]
+
+
+def test_memory_growth_fit():
+    """Sustained RSS growth after warm-up is flagged; a warm-up jump or noise is not"""
+    rng = np.random.default_rng(16)
+    t = np.arange(0.0, 600.0, 5.0)
+    flat = 200.0 + rng.normal(0.0, 0.5, len(t))
+    leaking = flat + 5.0 * t / 60.0
+    jump = flat + np.where(t < 60.0, t, 60.0)  # grows only while warming up
+
+    report = load_test.memory_growth(list(zip(t, leaking)), 60.0, 1.0)
+    assert report['growth_flagged'] and abs(report['slope_mb_per_min'] - 5.0) < 0.2, report
+    assert not load_test.memory_growth(list(zip(t, flat)), 60.0, 1.0)['growth_flagged']
+    assert not load_test.memory_growth(list(zip(t, jump)), 60.0, 1.0)['growth_flagged']
+    assert load_test.memory_growth(list(zip(t, jump)), 0.0, 1.0)['growth_flagged'], \
+        "Without a warm-up window the jump counts"
+    report = load_test.memory_growth([(0.0, 100.0), (5.0, None), (10.0, 101.0)], 0.0, 1.0)
+    assert report == {'samples': 2, 'slope_mb_per_min': None, 'growth_flagged': False}
+
+
+class FakeTarget:
+    """Load-test target that answers after a short delay, optionally leaking memory"""
+
+    def __init__(self, leak_bytes=0, status=200):
+        self.leak_bytes = leak_bytes
+        self.status = status
+        self.retained = []
+
+    def send(self, method, path, body):
+        time.sleep(0.005)
+        if self.leak_bytes:
+            self.retained.append(np.ones(self.leak_bytes, dtype=np.uint8))  # touched pages
+        return self.status
+
+    def diagnostics(self):
+        return {'retained': len(self.retained)}
+
+
+def test_load_test_detects_growth():
+    """run_load flags a target whose memory keeps growing and passes a steady one"""
+    if load_test.read_rss_mb() is None:
+        return  # no RSS source on this platform
+    mix = load_test.parse_mix('simulate:safe=1')
+    options = dict(concurrency=2, duration=1.5, interval=0.1, growth_threshold=60.0,
+                   verbose=False)
+
+    steady = load_test.run_load(FakeTarget(), mix, **options)
+    leaky_target = FakeTarget(leak_bytes=64 * 1024)
+    leaky = load_test.run_load(leaky_target, mix, **options)
+    failing = load_test.run_load(FakeTarget(status=500), mix, concurrency=1, duration=10.0,
+                                 requests=20, interval=0.1, verbose=False)
+    leaked_mb = len(leaky_target.retained) * leaky_target.leak_bytes / 2 ** 20
+    leaky_target.retained.clear()
+
+    assert steady['requests'] > 100 and steady['errors'] == 0
+    assert len(steady['timeline']) >= 10 and 'retained' in steady['timeline'][-1]
+    assert 5.0 <= steady['latency_ms']['p50'] <= 50.0, steady['latency_ms']
+    assert not steady['memory']['growth_flagged'], steady['memory']
+    assert leaky['memory']['growth_flagged'], f"{leaked_mb:.0f} MB leaked: {leaky['memory']}"
+    assert failing['requests'] == failing['errors'] == 20
+
+TESTS = [
+    ("Sweep statistics per parameter group", test_sweep_statistics),
+    ("Streamed .npy column writer", test_npy_column_writer),
+    ("Sweep rows and summary", test_run_sweep),
+    ("Pipeline record/replay round trip and append", test_record_replay),
+    ("Load test memory growth fit", test_memory_growth_fit),
+    ("Load test flags a leaking target", test_load_test_detects_growth),
+]
+
+
+def main():
+    """Run all tool tests"""
+    print("=" * 60)
+    print("ORION-EYE Tools Test Suite")
+    print("=" * 60)
+
+    failed = 0
+    for name, test in TESTS:
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: ERROR {e}")
+            import traceback
+            traceback.print_exc()
+
+    print("=" * 60)
+    if failed:
+        print(f"{failed} of {len(TESTS)} TESTS FAILED")
+        return 1
+    print("ALL TESTS PASSED! ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())